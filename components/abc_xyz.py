@@ -0,0 +1,117 @@
+"""
+Telit Supply Chain - ABC/XYZ Classification
+Revenue Pareto and demand-variability classes over columnar sales history
+"""
+
+import numpy as np
+import pandas as pd
+
+# Cumulative revenue share upper bounds for A and B items
+ABC_THRESHOLDS = (0.80, 0.95)
+
+# Coefficient-of-variation upper bounds for X and Y items
+XYZ_THRESHOLDS = (0.5, 1.0)
+
+
+def abc_classes(revenue: np.ndarray, thresholds: tuple = ABC_THRESHOLDS) -> tuple:
+    """Rank SKUs by revenue and assign A/B/C from the cumulative share"""
+    revenue = np.asarray(revenue, dtype=np.float64)
+    order = np.argsort(-revenue, kind="stable")
+    total = revenue.sum()
+    cumulative = np.empty_like(revenue)
+    cumulative[order] = np.cumsum(revenue[order]) / total if total > 0 else 0.0
+    # An item is classed by the share *before* it is added, so the item
+    # crossing a threshold still belongs to the higher class
+    preceding = cumulative - (revenue / total if total > 0 else 0.0)
+    classes = np.where(preceding < thresholds[0], "A", np.where(preceding < thresholds[1], "B", "C"))
+    rank = np.empty(len(revenue), dtype=np.int64)
+    rank[order] = np.arange(1, len(revenue) + 1)
+    return classes, cumulative, rank
+
+
+def xyz_classes(units_sum: np.ndarray, units_sumsq: np.ndarray, n_periods: int,
+                thresholds: tuple = XYZ_THRESHOLDS) -> tuple:
+    """Assign X/Y/Z from the per-period coefficient of variation"""
+    mean = np.asarray(units_sum, dtype=np.float64) / max(n_periods, 1)
+    var = np.maximum(np.asarray(units_sumsq, dtype=np.float64) / max(n_periods, 1) - mean ** 2, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cv = np.where(mean > 0, np.sqrt(var) / mean, np.inf)
+    classes = np.where(cv < thresholds[0], "X", np.where(cv < thresholds[1], "Y", "Z"))
+    return classes, cv
+
+
+class AbcXyzClassifier:
+    """Incrementally maintained ABC/XYZ classification.
+
+    Sales rows arrive as columnar arrays (sku index, period index,
+    revenue, units); the location dimension is summed away on ingest.
+    Only SKU x period revenue and unit matrices are kept, so rolling the
+    window drops the expired period from both classes alike and a
+    refresh is one sort and a few reductions over n_skus values.
+    """
+
+    def __init__(self, skus: list, n_periods: int):
+        self.skus = list(skus)
+        self.sku_index = {s: i for i, s in enumerate(self.skus)}
+        self.n_periods = n_periods
+        self.period_revenue = np.zeros((len(self.skus), n_periods))
+        self.units = np.zeros((len(self.skus), n_periods))
+        self._result = None
+
+    @property
+    def revenue(self) -> np.ndarray:
+        """Revenue per SKU over the current window"""
+        return self.period_revenue.sum(axis=1)
+
+    def update(self, sku_idx: np.ndarray, period_idx: np.ndarray, revenue: np.ndarray, units: np.ndarray):
+        """Fold a batch of sales rows into the running aggregates"""
+        sku_idx = np.asarray(sku_idx, dtype=np.int64)
+        period_idx = np.asarray(period_idx, dtype=np.int64)
+        n = len(self.skus)
+        cell = sku_idx * self.n_periods + period_idx
+        self.period_revenue += np.bincount(cell, weights=revenue, minlength=n * self.n_periods).reshape(n, -1)
+        self.units += np.bincount(cell, weights=units, minlength=n * self.n_periods).reshape(n, -1)
+        self._result = None
+
+    def roll_period(self):
+        """Drop the oldest period and open an empty one for new sales"""
+        for values in (self.period_revenue, self.units):
+            values[:, :-1] = values[:, 1:]
+            values[:, -1] = 0.0
+        self._result = None
+
+    def classify(self) -> pd.DataFrame:
+        """Return the classification, recomputing only after updates"""
+        if self._result is None:
+            abc, cumulative, rank = abc_classes(self.revenue)
+            xyz, cv = xyz_classes(self.units.sum(axis=1), (self.units ** 2).sum(axis=1), self.n_periods)
+            self._result = pd.DataFrame({
+                "sku": self.skus,
+                "revenue": self.revenue,
+                "rank": rank,
+                "cumulative_pct": cumulative * 100,
+                "abc_class": abc,
+                "cv": cv,
+                "xyz_class": xyz,
+            })
+            self._result["class"] = self._result["abc_class"] + self._result["xyz_class"]
+        return self._result
+
+    def pareto(self, top_n: int = 7) -> pd.DataFrame:
+        """Revenue Pareto of the top SKUs with the remainder grouped as Others"""
+        df = self.classify().sort_values("rank")
+        total = df["revenue"].sum()
+        head = df.head(top_n)[["sku", "revenue", "abc_class"]].copy()
+        rest = df["revenue"].iloc[top_n:].sum()
+        if rest > 0:
+            head = pd.concat([head, pd.DataFrame([{"sku": "Others", "revenue": rest, "abc_class": "C"}])],
+                             ignore_index=True)
+        head["revenue_pct"] = head["revenue"] / total * 100 if total > 0 else 0.0
+        head["cumulative_pct"] = head["revenue_pct"].cumsum()
+        return head
+
+    def matrix(self) -> pd.DataFrame:
+        """Count of SKUs in each ABC x XYZ cell"""
+        df = self.classify()
+        return pd.crosstab(df["abc_class"], df["xyz_class"]).reindex(
+            index=["A", "B", "C"], columns=["X", "Y", "Z"], fill_value=0)
@@ -0,0 +1,134 @@
+"""
+Telit Supply Chain - Forecast Backtesting Harness
+Rolling-origin evaluation with MAPE, WAPE, bias and tracking signal
+"""
+
+import numpy as np
+import pandas as pd
+
+from components.forecasting import MODELS, MODEL_VERSION, fit_model
+
+
+def _forecast_at_origin(Y: np.ndarray, model: str, origin: int, horizon: int, season_length: int) -> np.ndarray:
+    return np.maximum(fit_model(Y[:, :origin], model, horizon, season_length)[1], 0.0)
+
+
+def accuracy_metrics(actual: np.ndarray, forecast: np.ndarray, groups: np.ndarray = None,
+                     n_groups: int = None) -> dict:
+    """Reduce aligned actual/forecast arrays to accuracy metrics.
+
+    Arrays are series x evaluation-point with NaN where no actual exists
+    yet. Metrics are returned per group (or for everything when groups is
+    None) using weighted bincounts, so any grouping costs one pass. The
+    tracking signal (cumulative error / MAD) is per series, averaged.
+    """
+    valid = ~(np.isnan(actual) | np.isnan(forecast))
+    a = np.where(valid, actual, 0.0)
+    e = np.where(valid, forecast - actual, 0.0)
+    ae = np.abs(e)
+    n = valid.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ape = np.where(valid & (a > 0), ae / a, 0.0)
+        series_ts = np.where(ae.sum(axis=1) > 0, e.sum(axis=1) / (ae.sum(axis=1) / np.maximum(n, 1)), 0.0)
+    per_series = {
+        "abs_error": ae.sum(axis=1),
+        "error": e.sum(axis=1),
+        "actual": a.sum(axis=1),
+        "ape": ape.sum(axis=1),
+        "ape_n": (valid & (a > 0)).sum(axis=1),
+        "n": n,
+        "tracking_signal": series_ts,
+        "series": np.ones(len(n)),
+    }
+    if groups is None:
+        totals = {k: np.array([v.sum()]) for k, v in per_series.items()}
+    else:
+        size = n_groups or int(groups.max()) + 1
+        totals = {k: np.bincount(groups, weights=v, minlength=size) for k, v in per_series.items()}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "mape": np.where(totals["ape_n"] > 0, totals["ape"] / totals["ape_n"] * 100, np.nan),
+            "wape": np.where(totals["actual"] > 0, totals["abs_error"] / totals["actual"] * 100, np.nan),
+            "bias": np.where(totals["actual"] > 0, totals["error"] / totals["actual"] * 100, np.nan),
+            "tracking_signal": np.where(totals["series"] > 0, totals["tracking_signal"] / totals["series"], 0.0),
+            "n_forecasts": totals["n"].astype(int),
+        }
+
+
+class BacktestStore:
+    """Rolling-origin backtests cached by (model, model version, origin).
+
+    Forecasts, not errors, are cached: when a new month of actuals lands
+    only the new origin is fitted, and forecasts from earlier origins
+    are simply scored against the extra actuals.
+    """
+
+    def __init__(self, horizon: int = 3, min_train: int = 12, season_length: int = 12,
+                 models: list = None, version: str = MODEL_VERSION):
+        self.horizon = horizon
+        self.min_train = min_train
+        self.season_length = season_length
+        self.models = list(models or MODELS)
+        self.version = version
+        self._forecasts = {}
+        self._history = None
+
+    def _check_history(self, Y: np.ndarray):
+        """Drop the cache if previously seen history was restated"""
+        old = self._history
+        if old is not None and (old.shape[0] != Y.shape[0] or old.shape[1] > Y.shape[1]
+                                or not np.array_equal(old, Y[:, :old.shape[1]])):
+            self._forecasts.clear()
+        self._history = Y.copy()
+
+    def run(self, Y: np.ndarray) -> int:
+        """Fit any origins not yet cached; returns the number fitted"""
+        Y = np.asarray(Y, dtype=np.float64)
+        self._check_history(Y)
+        missing = [(m, o) for m in self.models for o in range(self.min_train, Y.shape[1])
+                   if (m, self.version, o) not in self._forecasts]
+        if not missing:
+            return 0
+        for m, o in missing:
+            self._forecasts[(m, self.version, o)] = _forecast_at_origin(Y, m, o, self.horizon, self.season_length)
+        return len(missing)
+
+    def aligned(self, model: str) -> tuple:
+        """Return (actual, forecast, origin) arrays for every cached evaluation point"""
+        Y = self._history
+        T = Y.shape[1]
+        origins = sorted(o for m, v, o in self._forecasts if m == model and v == self.version)
+        actual, forecast, origin_of = [], [], []
+        for o in origins:
+            fc = self._forecasts[(model, self.version, o)]
+            k = min(self.horizon, T - o)
+            actual.append(Y[:, o:o + k])
+            forecast.append(fc[:, :k])
+            origin_of.extend([o] * k)
+        if not actual:
+            empty = np.empty((len(Y), 0))
+            return empty, empty, np.empty(0, dtype=int)
+        return np.hstack(actual), np.hstack(forecast), np.array(origin_of)
+
+    def summary(self, groups: np.ndarray = None, labels: list = None) -> pd.DataFrame:
+        """Accuracy per model, optionally broken down by a series grouping"""
+        frames = []
+        for model in self.models:
+            actual, forecast, _ = self.aligned(model)
+            metrics = accuracy_metrics(actual, forecast, groups, len(labels) if labels else None)
+            frame = pd.DataFrame(metrics)
+            frame.insert(0, "model", model)
+            if groups is not None:
+                frame.insert(1, "group", labels if labels else np.arange(len(frame)))
+            frames.append(frame)
+        return pd.concat(frames, ignore_index=True)
+
+    def by_origin(self, model: str) -> pd.DataFrame:
+        """Accuracy of one model for each forecast origin"""
+        actual, forecast, origin_of = self.aligned(model)
+        rows = []
+        for o in np.unique(origin_of):
+            cols = origin_of == o
+            metrics = accuracy_metrics(actual[:, cols], forecast[:, cols])
+            rows.append({"origin": int(o), **{k: v[0] for k, v in metrics.items()}})
+        return pd.DataFrame(rows)
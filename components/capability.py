@@ -0,0 +1,179 @@
+"""
+Telit Supply Chain - Process Capability
+Cp, Cpk, Pp, Ppk and percentile-based indices per group in one vectorized pass
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+CAPABILITY_GROUPS = ("parameter", "product", "line", "shift")
+
+HISTOGRAM_BINS = 40
+
+# Quantiles at ±3σ and the median of a normal distribution, used by the percentile (non-normal) indices
+TAIL_QUANTILES = (0.00135, 0.5, 0.99865)
+
+# Groups with fewer measurements get no indices
+MIN_SAMPLES = 30
+
+# d2 for moving ranges of two consecutive measurements
+D2_MR = 1.128
+
+
+def _group_quantiles(values: np.ndarray, counts: np.ndarray, qs: tuple) -> np.ndarray:
+    """Linear-interpolated quantiles within each group of group-contiguous values (groups x qs)"""
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    has = counts > 0
+    g = np.repeat(np.arange(len(counts)), counts)
+    # Sort by group, then value, in one pass: group number plus the value scaled into [0, 1)
+    lo = np.minimum.reduceat(values, starts[has])
+    span = np.maximum.reduceat(values, starts[has]) - lo
+    full_lo, full_span = np.zeros(len(counts)), np.ones(len(counts))
+    full_lo[has], full_span[has] = lo, np.where(span > 0, span, 1.0)
+    v = values[np.argsort(g + (values - full_lo[g]) / full_span[g] * 0.999999)]
+    out = np.full((len(counts), len(qs)), np.nan)
+    for j, q in enumerate(qs):
+        pos = starts[has] + q * (counts[has] - 1)
+        i = np.floor(pos).astype(np.int64)
+        nxt = np.minimum(i + 1, starts[has] + counts[has] - 1)
+        out[has, j] = v[i] + (v[nxt] - v[i]) * (pos - i)
+    return out
+
+
+def capability_indices(values: np.ndarray, groups: np.ndarray, n_groups: int, lsl: np.ndarray,
+                       usl: np.ndarray) -> pd.DataFrame:
+    """Capability per group from time-ordered values and integer group codes.
+
+    Short-term (Cp/Cpk) sigma is the mean moving range between consecutive
+    measurements of a group over d2; long-term (Pp/Ppk) sigma is the
+    overall standard deviation. The percentile indices replace ±3σ with
+    the 0.135% and 99.865% quantiles and the mean with the median, which
+    holds for skewed parameters. lsl and usl are given per group.
+    """
+    n = np.bincount(groups, minlength=n_groups).astype(np.float64)
+    total = np.bincount(groups, weights=values, minlength=n_groups)
+    sumsq = np.bincount(groups, weights=values ** 2, minlength=n_groups)
+    # Stable sort keeps time order inside each group for the moving ranges
+    order = np.argsort(groups, kind="stable")
+    g, v = groups[order], values[order]
+    same = g[1:] == g[:-1]
+    mr_sum = np.bincount(g[1:][same], weights=np.abs(np.diff(v))[same], minlength=n_groups)
+    mr_n = np.bincount(g[1:][same], minlength=n_groups)
+    out_of_spec = np.bincount(groups, weights=((values < lsl[groups]) | (values > usl[groups])).astype(np.float64),
+                              minlength=n_groups)
+    q = _group_quantiles(v, n.astype(np.int64), TAIL_QUANTILES)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = total / n
+        sigma_overall = np.sqrt(np.maximum(sumsq - n * mean ** 2, 0) / (n - 1))
+        sigma_within = mr_sum / mr_n / D2_MR
+        lo, med, hi = q[:, 0], q[:, 1], q[:, 2]
+        frame = pd.DataFrame({
+            "n": n.astype(np.int64),
+            "mean": mean,
+            "sigma_within": sigma_within,
+            "sigma_overall": sigma_overall,
+            "lsl": lsl,
+            "usl": usl,
+            "cp": (usl - lsl) / (6 * sigma_within),
+            "cpk": np.minimum(usl - mean, mean - lsl) / (3 * sigma_within),
+            "pp": (usl - lsl) / (6 * sigma_overall),
+            "ppk": np.minimum(usl - mean, mean - lsl) / (3 * sigma_overall),
+            "pp_percentile": (usl - lsl) / (hi - lo),
+            "ppk_percentile": np.minimum((usl - med) / (hi - med), (med - lsl) / (med - lo)),
+            "ppm_out": out_of_spec / n * 1e6,
+        })
+    indices = ["cp", "cpk", "pp", "ppk", "pp_percentile", "ppk_percentile"]
+    frame.loc[frame["n"] < MIN_SAMPLES, indices] = np.nan
+    return frame
+
+
+class CapabilityService:
+    """Capability tables and pre-binned histograms over time windows of test records.
+
+    Records are held as time-sorted typed arrays (categorical codes, float
+    values, int64 timestamps), which may be the read-only memory maps of a
+    test-result store, so nothing is decoded up front. A window is a
+    searchsorted slice, any grouping is a dense integer key built from the
+    category codes, and each record's histogram bin is taken against its
+    parameter's spec range, so a window's histograms for every group are
+    one bincount and the page receives counts, not samples. Results are
+    cached per (window, grouping).
+    """
+
+    def __init__(self, time: np.ndarray, values: np.ndarray, lsl: np.ndarray, usl: np.ndarray, codes: dict,
+                 categories: dict, bins: int = HISTOGRAM_BINS, cache_size: int = 16):
+        self.time, self.values, self.lsl, self.usl = time, values, lsl, usl
+        self.codes = {col: codes[col] for col in CAPABILITY_GROUPS}
+        self.categories = {col: pd.Index(categories[col]) for col in CAPABILITY_GROUPS}
+        self.bins = bins
+
+        # Histogram range per parameter: the spec window plus a quarter of its width either side
+        n_params = len(self.categories["parameter"])
+        lo = np.full(n_params, np.nan)
+        hi = np.full(n_params, np.nan)
+        first = np.unique(np.asarray(self.codes["parameter"]), return_index=True)
+        lo[first[0]], hi[first[0]] = self.lsl[first[1]], self.usl[first[1]]
+        pad = (hi - lo) / 4
+        self.edges = {self.categories["parameter"][i]: np.linspace(lo[i] - pad[i], hi[i] + pad[i], bins + 1)
+                      for i in range(n_params)}
+        self._bin_lo = lo - pad
+        self._bin_width = (hi - lo + 2 * pad) / bins
+        self._cache = OrderedDict()
+        self.cache_size = cache_size
+
+    @classmethod
+    def from_store(cls, store, **kwargs) -> "CapabilityService":
+        """Service over a TestResultStore's memory-mapped columns and dictionaries"""
+        return cls(store.column("time"), store.column("value"), store.column("lsl"), store.column("usl"),
+                   {col: store.column(col) for col in CAPABILITY_GROUPS},
+                   {col: store.dictionary(col) for col in CAPABILITY_GROUPS}, **kwargs)
+
+    def _slice(self, start=None, end=None) -> slice:
+        lo = 0 if start is None else int(np.searchsorted(self.time, pd.Timestamp(start).value, side="left"))
+        hi = len(self.time) if end is None else int(np.searchsorted(self.time, pd.Timestamp(end).value, side="right"))
+        return slice(lo, hi)
+
+    def compute(self, start=None, end=None, by: tuple = CAPABILITY_GROUPS) -> dict:
+        """Capability table and histograms for every group present in the window.
+
+        by must include 'parameter'. Returns {"table", "histograms"
+        (groups x bins counts aligned to the table rows), "edges"
+        (per parameter)}.
+        """
+        by = tuple(by)
+        if "parameter" not in by:
+            raise ValueError("capability groups must include the parameter")
+        key = (None if start is None else pd.Timestamp(start), None if end is None else pd.Timestamp(end), by)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        window = self._slice(start, end)
+        dims = [len(self.categories[c]) for c in by]
+        dense = np.ravel_multi_index([self.codes[c][window].astype(np.int64) for c in by], dims)
+        # Key spaces here are small (parameters x products x lines x shifts), so renumber with a lookup table
+        present = np.flatnonzero(np.bincount(dense, minlength=int(np.prod(dims))))
+        lookup = np.full(int(np.prod(dims)), -1, dtype=np.int64)
+        lookup[present] = np.arange(len(present))
+        groups = lookup[dense]
+        first = np.full(len(present), len(groups), dtype=np.int64)
+        np.minimum.at(first, groups, np.arange(len(groups)))
+        values = np.asarray(self.values[window], dtype=np.float64)
+        table = capability_indices(values, groups, len(present),
+                                   np.asarray(self.lsl[window][first], dtype=np.float64),
+                                   np.asarray(self.usl[window][first], dtype=np.float64))
+        labels = np.unravel_index(present, dims)
+        for i, col in enumerate(by):
+            table.insert(i, col, np.asarray(self.categories[col])[labels[i]])
+        param = self.codes["parameter"][window].astype(np.int64)
+        bins = np.clip(((values - self._bin_lo[param]) / self._bin_width[param]).astype(np.int64), 0, self.bins - 1)
+        histograms = np.bincount(groups * self.bins + bins,
+                                 minlength=len(present) * self.bins).reshape(len(present), self.bins)
+        result = {"table": table, "histograms": histograms, "edges": self.edges}
+        self._cache[key] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
@@ -309,8 +309,8 @@ def create_control_chart(df: pd.DataFrame, title: str = ""):
     ))
     
     # Values
-    colors = [TELIT_RED if v > df['ucl'].iloc[0] or v < df['lcl'].iloc[0] else TELIT_BLUE 
-              for v in df['value']]
+    colors = [TELIT_RED if v > u or v < l else TELIT_BLUE
+              for v, u, l in zip(df['value'], df['ucl'], df['lcl'])]
     
     fig.add_trace(go.Scatter(
         x=df['date'], y=df['value'],
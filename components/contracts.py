@@ -0,0 +1,147 @@
+"""
+Telit Supply Chain - Contract & Price-Break Evaluation
+Costs a part-level demand plan against tiered supplier contracts under any award split
+"""
+
+import numpy as np
+import pandas as pd
+
+CONTRACT_COLUMNS = ["contract_id", "supplier_id", "part", "start_date", "end_date", "pricing",
+                    "committed_qty", "shortfall_penalty", "payment_days", "early_pay_discount", "early_pay_days"]
+
+# Contract length buckets for the terms summary (upper bound in years)
+TERM_BUCKETS = {"< 1 year": 1, "1-2 years": 2, "2-3 years": 3, "> 3 years": np.inf}
+
+
+class ContractBook:
+    """Price breaks for all contracts in flat arrays sorted by (contract, break quantity).
+
+    Each break gets a composite integer key contract * span + min_qty, so
+    the tier reached by any number of (contract, volume) pairs is one
+    searchsorted call; the cost of buying up to each break under
+    incremental pricing is precomputed. A demand plan is costed for many
+    award splits at once by passing a scenarios x contracts share matrix.
+    """
+
+    def __init__(self, contracts: pd.DataFrame, breaks: pd.DataFrame, cost_of_capital: float = 0.08):
+        self.contracts = contracts[CONTRACT_COLUMNS].reset_index(drop=True)
+        self.ids = pd.Index(self.contracts["contract_id"])
+        self.parts = pd.Index(pd.unique(self.contracts["part"]))
+        self.part_idx = self.parts.get_indexer(self.contracts["part"])
+        self.cost_of_capital = cost_of_capital
+
+        contract = self.ids.get_indexer(breaks["contract_id"])
+        if (contract < 0).any():
+            raise ValueError("price breaks reference unknown contracts")
+        qty = breaks["min_qty"].to_numpy(dtype=np.int64)
+        order = np.lexsort((qty, contract))
+        self.break_contract = contract[order]
+        self.break_qty = qty[order]
+        self.break_price = breaks["unit_price"].to_numpy(dtype=np.float64)[order]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(contract, minlength=len(self.ids)))])
+        first = self.offsets[:-1]
+        if (np.diff(self.offsets) == 0).any() or (self.break_qty[np.minimum(first, len(qty) - 1)] != 0).any():
+            raise ValueError("every contract needs a price break at quantity 0")
+
+        self._span = int(self.break_qty.max()) + 1
+        self._keys = self.break_contract * self._span + self.break_qty
+        # Cost of the units below each break when every band is priced at its own rate
+        band = np.zeros(len(qty))
+        band[1:] = np.diff(self.break_qty) * self.break_price[:-1]
+        band[first] = 0.0
+        cum = np.cumsum(band)
+        self._band_cost = cum - np.repeat(cum[first], np.diff(self.offsets))
+
+        self._all_units = (self.contracts["pricing"] == "all_units").to_numpy()
+        self._committed = self.contracts["committed_qty"].to_numpy(dtype=np.float64)
+        self._penalty = self.contracts["shortfall_penalty"].to_numpy(dtype=np.float64)
+        pay_days = self.contracts["payment_days"].to_numpy(dtype=np.float64)
+        discount = self.contracts["early_pay_discount"].to_numpy(dtype=np.float64) / 100
+        # Best of paying at term (float the cash) or taking the early-payment discount
+        self._terms_rate = np.maximum(cost_of_capital * pay_days / 365,
+                                      discount + cost_of_capital * self.contracts["early_pay_days"].to_numpy() / 365)
+
+    def tier(self, volume: np.ndarray) -> np.ndarray:
+        """Global break index reached by each contract's volume (last axis = contracts)"""
+        # Round first so a split landing exactly on a break is not pushed below it by float error
+        v = np.floor(np.round(np.asarray(volume, dtype=np.float64), 6))
+        v = np.minimum(v, self._span - 1).astype(np.int64)
+        return np.searchsorted(self._keys, np.arange(len(self.ids)) * self._span + v, side="right") - 1
+
+    def purchase_cost(self, volume: np.ndarray) -> np.ndarray:
+        """Invoice value of buying volume under each contract's price breaks"""
+        volume = np.asarray(volume, dtype=np.float64)
+        t = self.tier(volume)
+        all_units = volume * self.break_price[t]
+        incremental = self._band_cost[t] + (volume - self.break_qty[t]) * self.break_price[t]
+        return np.where(self._all_units, all_units, incremental)
+
+    def normalize(self, weights: np.ndarray) -> np.ndarray:
+        """Scale award weights so each part's shares sum to 1 (last axis = contracts)"""
+        weights = np.asarray(weights, dtype=np.float64)
+        flat = weights.reshape(-1, len(self.ids))
+        totals = np.zeros((len(flat), len(self.parts)))
+        np.add.at(totals, (slice(None), self.part_idx), flat)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            shares = np.nan_to_num(flat / totals[:, self.part_idx])
+        return shares.reshape(weights.shape)
+
+    def evaluate(self, shares: np.ndarray, demand: pd.Series) -> dict:
+        """Cost components per contract for one or more award splits.
+
+        shares has the contracts on its last axis; demand is annual units
+        indexed by part. All outputs have the shape of shares.
+        """
+        plan = demand.reindex(self.parts).fillna(0).to_numpy(dtype=np.float64)
+        volume = np.asarray(shares, dtype=np.float64) * plan[self.part_idx]
+        spend = self.purchase_cost(volume)
+        shortfall = np.maximum(self._committed - volume, 0.0) * self._penalty
+        terms = spend * self._terms_rate
+        return {
+            "volume": volume,
+            "tier": self.tier(volume),
+            "spend": spend,
+            "shortfall": shortfall,
+            "terms_savings": terms,
+            "total": spend + shortfall - terms,
+        }
+
+    def total_cost(self, shares: np.ndarray, demand: pd.Series) -> np.ndarray:
+        """Net annual cost per award split"""
+        return self.evaluate(shares, demand)["total"].sum(axis=-1)
+
+    def contract_table(self, shares: np.ndarray, demand: pd.Series) -> pd.DataFrame:
+        """Per-contract volume, tier, effective price and distance to the next break for one split"""
+        result = {k: np.asarray(v).reshape(-1) for k, v in self.evaluate(np.ravel(shares), demand).items()}
+        t = result["tier"]
+        has_next = t + 1 < self.offsets[1:]
+        nxt = np.minimum(t + 1, len(self.break_qty) - 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            unit = np.where(result["volume"] > 0, result["spend"] / result["volume"], self.break_price[t])
+        return pd.DataFrame({
+            "contract_id": self.ids,
+            "supplier_id": self.contracts["supplier_id"],
+            "part": self.contracts["part"],
+            "pricing": self.contracts["pricing"],
+            "volume": result["volume"],
+            "tier": t - self.offsets[:-1] + 1,
+            "tiers": np.diff(self.offsets),
+            "unit_price": unit,
+            "spend": result["spend"],
+            "shortfall_penalty": result["shortfall"],
+            "terms_savings": result["terms_savings"],
+            "net_cost": result["total"],
+            "next_break_qty": np.where(has_next, self.break_qty[nxt], np.nan),
+            "next_break_price": np.where(has_next, self.break_price[nxt], np.nan),
+        })
+
+    def terms_summary(self, spend: np.ndarray) -> pd.DataFrame:
+        """Contract count and annual value by contract length"""
+        years = (pd.to_datetime(self.contracts["end_date"]) - pd.to_datetime(self.contracts["start_date"])).dt.days / 365
+        bucket = np.searchsorted(np.array(list(TERM_BUCKETS.values())), years.to_numpy(), side="right")
+        bucket = np.minimum(bucket, len(TERM_BUCKETS) - 1)
+        return pd.DataFrame({
+            "term": list(TERM_BUCKETS),
+            "contracts": np.bincount(bucket, minlength=len(TERM_BUCKETS)),
+            "annual_value": np.bincount(bucket, weights=np.ravel(spend), minlength=len(TERM_BUCKETS)),
+        })
@@ -0,0 +1,117 @@
+"""
+Telit Supply Chain - Demand Cube Tiling
+Bounded-size, level-of-detail views of large SKU x week demand cubes for heatmaps and surfaces
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+# Default payload bounds (rows x columns) sent to the browser per chart
+HEATMAP_MAX_CELLS = (60, 52)
+SURFACE_MAX_CELLS = (40, 52)
+
+
+def _bin_edges(start: int, stop: int, max_bins: int) -> np.ndarray:
+    """Contiguous bin edges over [start, stop) splitting it into as many near-equal bins as the budget allows"""
+    n = max(stop - start, 0)
+    bins = min(n, max(int(max_bins), 1))
+    return np.unique(np.round(np.linspace(start, stop, bins + 1)).astype(np.int64))
+
+
+class CubeTiler:
+    """Level-of-detail aggregation over a rows x periods demand matrix.
+
+    A summed-area table is built once, so the total of any rectangular
+    block costs four lookups. A view of any zoom window is binned to at
+    most max_rows x max_cols cells of near-equal width, using the whole
+    budget, which keeps the payload bounded whatever the cube size.
+    Views are cached by window and resolution, so panning back or
+    re-rendering fetches nothing new.
+    """
+
+    def __init__(self, values: np.ndarray, row_labels: list, col_labels: list, row_groups: list = None,
+                 cache_size: int = 64):
+        values = np.nan_to_num(np.asarray(values, dtype=np.float64))
+        n_rows, n_cols = values.shape
+        self.shape = values.shape
+        self.row_labels = np.asarray(row_labels, dtype=object)
+        self.col_labels = np.asarray(col_labels, dtype=object)
+        self.row_groups = np.asarray(row_groups if row_groups is not None else [""] * n_rows, dtype=object)
+        self._sat = np.zeros((n_rows + 1, n_cols + 1))
+        self._sat[1:, 1:] = values.cumsum(axis=0).cumsum(axis=1)
+        self._cache = OrderedDict()
+        self.cache_size = cache_size
+
+    def block_sums(self, row_edges: np.ndarray, col_edges: np.ndarray) -> np.ndarray:
+        """Totals of the blocks delimited by the given row and column edges"""
+        s = self._sat[np.ix_(row_edges, col_edges)]
+        return s[1:, 1:] - s[:-1, 1:] - s[1:, :-1] + s[:-1, :-1]
+
+    def _row_bin_labels(self, edges: np.ndarray) -> np.ndarray:
+        starts, stops = edges[:-1], edges[1:] - 1
+        single = stops == starts
+        same_group = self.row_groups[starts] == self.row_groups[stops]
+        ranged = np.char.add(np.char.add(self.row_labels[starts].astype(str), " … "),
+                             self.row_labels[stops].astype(str))
+        grouped = np.char.add(np.char.add(self.row_groups[starts].astype(str), ": "), ranged)
+        return np.where(single, self.row_labels[starts], np.where(same_group & (self.row_groups[starts] != ""),
+                                                                  grouped, ranged)).astype(object)
+
+    def view(self, rows: tuple = None, cols: tuple = None, max_cells: tuple = HEATMAP_MAX_CELLS,
+             agg: str = "sum") -> dict:
+        """Aggregate a zoom window to at most max_cells; agg is "sum" or "mean" per cell"""
+        r0, r1 = rows or (0, self.shape[0])
+        c0, c1 = cols or (0, self.shape[1])
+        r0, r1 = max(0, int(r0)), min(self.shape[0], int(r1))
+        c0, c1 = max(0, int(c0)), min(self.shape[1], int(c1))
+        key = (r0, r1, c0, c1, tuple(max_cells), agg)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        row_edges = _bin_edges(r0, r1, max_cells[0])
+        col_edges = _bin_edges(c0, c1, max_cells[1])
+        z = self.block_sums(row_edges, col_edges)
+        counts = np.diff(row_edges)[:, None] * np.diff(col_edges)[None, :]
+        if agg == "mean":
+            z = z / np.maximum(counts, 1)
+        elif agg != "sum":
+            raise ValueError(f"Unknown aggregation: {agg}")
+        result = {
+            "z": z,
+            "row_labels": self._row_bin_labels(row_edges),
+            "col_labels": self.col_labels[col_edges[:-1]],
+            "row_edges": row_edges,
+            "col_edges": col_edges,
+            "rows_per_bin": (r1 - r0) / max(len(row_edges) - 1, 1),
+            "cols_per_bin": (c1 - c0) / max(len(col_edges) - 1, 1),
+            "cells": counts,
+        }
+        self._cache[key] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def drill(self, view: dict, row_bin: int, col_bin: int = None, max_cells: tuple = HEATMAP_MAX_CELLS,
+              agg: str = "sum") -> dict:
+        """Zoom into one bin of an earlier view (and optionally one column bin)"""
+        rows = (view["row_edges"][row_bin], view["row_edges"][row_bin + 1])
+        cols = None if col_bin is None else (view["col_edges"][col_bin], view["col_edges"][col_bin + 1])
+        return self.view(rows, cols, max_cells, agg)
+
+    def group_ranges(self) -> dict:
+        """Row range covered by each row group (rows are sorted by group), for drill-down"""
+        groups, first = np.unique(self.row_groups, return_index=True)
+        order = np.argsort(first)
+        starts = first[order]
+        stops = np.append(starts[1:], self.shape[0])
+        return {groups[i]: (int(a), int(b)) for i, a, b in zip(order, starts, stops)}
+
+    def customdata(self, view: dict) -> np.ndarray:
+        """Per-cell hover payload (row label, column label, cells aggregated) as one array"""
+        z = view["z"]
+        return np.stack([
+            np.broadcast_to(view["row_labels"][:, None], z.shape),
+            np.broadcast_to(view["col_labels"][None, :], z.shape),
+            view["cells"].astype(object),
+        ], axis=-1)
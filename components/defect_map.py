@@ -0,0 +1,125 @@
+"""
+Telit Supply Chain - Defect Aggregation
+AOI defect events rolled up per shift into Pareto counts and PCB-location grids
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFECT_TYPES = [
+    "Solder Bridge", "Missing Component", "Misalignment", "Cold Solder",
+    "Tombstone", "Component Damage", "Wrong Component", "PCB Defect",
+]
+
+# Spatial grid cells per board (columns, rows)
+GRID_SHAPE = (24, 24)
+
+
+class DefectAggregator:
+    """Per-shift defect counts by line, product and type, plus per-shift location grids.
+
+    Events are binned on ingest into two dense arrays with a leading shift
+    axis: Pareto counts (shift x line x product x type) and a board-relative
+    grid (shift x line x product x cell rows x cell columns) where each
+    product's x/y is scaled by its board design's outline. Ingesting a shift
+    touches only that shift's slices; a Pareto or heatmap for any date
+    range, line set and product set is a slice-sum over small arrays.
+    """
+
+    def __init__(self, lines: list, products: list, product_design: dict, designs: dict,
+                 shift_starts: tuple = (6, 14, 22), grid: tuple = GRID_SHAPE, defect_types: list = None):
+        self.lines = pd.Index(lines)
+        self.products = pd.Index(products)
+        self.defect_types = pd.Index(defect_types or DEFECT_TYPES)
+        self.designs = dict(designs)
+        self.product_design = np.array([product_design[p] for p in self.products], dtype=object)
+        size = np.array([self.designs[d] for d in self.product_design], dtype=np.float64)
+        self._width, self._height = size[:, 0], size[:, 1]
+        self.grid = grid
+        self.shift_starts = np.asarray(shift_starts)
+        self.shift_ids = np.empty(0, dtype=np.int64)
+        self.counts = np.zeros((0, len(self.lines), len(self.products), len(self.defect_types)), dtype=np.int64)
+        self.cells = np.zeros((0, len(self.lines), len(self.products), grid[1], grid[0]), dtype=np.int32)
+
+    def shift_id(self, times) -> np.ndarray:
+        """Consecutive shift number for each timestamp (shifts per day x day + shift of day)"""
+        times = pd.DatetimeIndex(pd.to_datetime(times))
+        hour = np.asarray(times.hour)
+        of_day = np.searchsorted(self.shift_starts, hour, side="right") - 1
+        day = times.to_numpy().astype("datetime64[D]").astype(np.int64)
+        # Hours before the first shift start belong to the previous day's last shift
+        day = np.where(of_day < 0, day - 1, day)
+        return day * len(self.shift_starts) + of_day % len(self.shift_starts)
+
+    def shift_start(self, shift_ids: np.ndarray) -> pd.DatetimeIndex:
+        day, of_day = np.divmod(np.asarray(shift_ids), len(self.shift_starts))
+        return pd.to_datetime(day * 86_400 + self.shift_starts[of_day] * 3600, unit="s")
+
+    def _shift_rows(self, ids: np.ndarray) -> np.ndarray:
+        """Row of each shift id in the arrays, adding rows for unseen shifts"""
+        new = np.setdiff1d(ids, self.shift_ids)
+        if len(new):
+            merged = np.union1d(self.shift_ids, new)
+            old_rows = np.searchsorted(merged, self.shift_ids)
+            counts = np.zeros((len(merged),) + self.counts.shape[1:], dtype=self.counts.dtype)
+            cells = np.zeros((len(merged),) + self.cells.shape[1:], dtype=self.cells.dtype)
+            counts[old_rows], cells[old_rows] = self.counts, self.cells
+            self.shift_ids, self.counts, self.cells = merged, counts, cells
+        return np.searchsorted(self.shift_ids, ids)
+
+    def ingest(self, events: pd.DataFrame) -> int:
+        """Add AOI defect events (time, line, product, defect_type, x_mm, y_mm).
+        Returns the number skipped for unknown line, product or type."""
+        line = self.lines.get_indexer(events["line"])
+        product = self.products.get_indexer(events["product"])
+        kind = self.defect_types.get_indexer(events["defect_type"])
+        keep = (line >= 0) & (product >= 0) & (kind >= 0)
+        if not keep.any():
+            return int((~keep).sum())
+        line, product, kind = line[keep], product[keep], kind[keep]
+        row = self._shift_rows(self.shift_id(events["time"].to_numpy()[keep]))
+        np.add.at(self.counts, (row, line, product, kind), 1)
+        # Board-relative coordinates, so every unit of a design lands on the same grid
+        x = events["x_mm"].to_numpy(dtype=np.float64)[keep] / self._width[product]
+        y = events["y_mm"].to_numpy(dtype=np.float64)[keep] / self._height[product]
+        cx = np.clip((x * self.grid[0]).astype(np.int64), 0, self.grid[0] - 1)
+        cy = np.clip((y * self.grid[1]).astype(np.int64), 0, self.grid[1] - 1)
+        np.add.at(self.cells, (row, line, product, cy, cx), 1)
+        return int((~keep).sum())
+
+    def _select(self, start=None, end=None, lines=None, products=None) -> tuple:
+        lo = 0 if start is None else int(np.searchsorted(self.shift_ids, self.shift_id([start])[0], side="left"))
+        hi = len(self.shift_ids) if end is None else int(np.searchsorted(self.shift_ids, self.shift_id([end])[0],
+                                                                          side="right"))
+        line_idx = np.arange(len(self.lines)) if lines is None else self.lines.get_indexer(np.atleast_1d(lines))
+        prod_idx = np.arange(len(self.products)) if products is None else \
+            self.products.get_indexer(np.atleast_1d(products))
+        return slice(lo, hi), line_idx[line_idx >= 0], prod_idx[prod_idx >= 0]
+
+    def pareto(self, start=None, end=None, lines=None, products=None) -> pd.DataFrame:
+        """Defect counts by type, largest first, with cumulative share"""
+        shifts, line_idx, prod_idx = self._select(start, end, lines, products)
+        totals = self.counts[shifts][:, line_idx][:, :, prod_idx].sum(axis=(0, 1, 2))
+        frame = pd.DataFrame({"defect_type": self.defect_types, "count": totals})
+        frame = frame.sort_values("count", ascending=False, ignore_index=True)
+        frame["cumulative_pct"] = frame["count"].cumsum() / max(frame["count"].sum(), 1) * 100
+        return frame
+
+    def heatmap(self, design: str, start=None, end=None, lines=None, products=None) -> dict:
+        """Defect counts per board cell for one design, with cell edges in mm"""
+        shifts, line_idx, prod_idx = self._select(start, end, lines, products)
+        prod_idx = prod_idx[self.product_design[prod_idx] == design]
+        counts = self.cells[shifts][:, line_idx][:, :, prod_idx].sum(axis=(0, 1, 2))
+        width, height = self.designs[design]
+        return {
+            "counts": counts,
+            "x_edges": np.linspace(0, width, self.grid[0] + 1),
+            "y_edges": np.linspace(0, height, self.grid[1] + 1),
+        }
+
+    def trend(self, start=None, end=None, lines=None, products=None, freq: str = "D") -> pd.DataFrame:
+        """Defect totals per shift, rolled up to a pandas frequency"""
+        shifts, line_idx, prod_idx = self._select(start, end, lines, products)
+        totals = self.counts[shifts][:, line_idx][:, :, prod_idx].sum(axis=(1, 2, 3))
+        series = pd.Series(totals, index=self.shift_start(self.shift_ids[shifts]))
+        return series.resample(freq).sum().rename_axis("date").reset_index(name="defects")
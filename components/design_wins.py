@@ -0,0 +1,120 @@
+"""
+Telit Supply Chain - Design-Win Demand Model
+Converts the design-win pipeline into expected unit demand per SKU-month
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# Pipeline stages in order, with the default probability of reaching production
+STAGE_PROBABILITY = {
+    "Lead": 0.10,
+    "Design-In": 0.30,
+    "Qualification": 0.60,
+    "Sampling": 0.80,
+    "Production": 0.95,
+}
+
+# Stages whose volumes already show in shipment history (not added to the statistical forecast)
+IN_HISTORY_STAGES = {"Production"}
+
+PIPELINE_COLUMNS = ["opportunity_id", "customer", "sku", "stage", "probability", "annual_volume",
+                    "sop_month", "ramp_months", "lifetime_months"]
+
+
+def ramp_profile(months_since_sop: np.ndarray, ramp_months: np.ndarray) -> np.ndarray:
+    """Fraction of run-rate reached, as a logistic ramp centred on half the ramp length"""
+    ramp = np.maximum(np.asarray(ramp_months, dtype=np.float64), 1.0)
+    t = np.asarray(months_since_sop, dtype=np.float64)
+    # Steepness chosen so the curve goes from ~5% to ~95% over the ramp
+    curve = 1 / (1 + np.exp(-(t + 0.5 - ramp / 2) * (5.9 / ramp)))
+    return np.where(t >= 0, curve, 0.0)
+
+
+def score_pipeline(pipeline: pd.DataFrame, skus: list, months: int) -> dict:
+    """Expected and unweighted units per SKU-month for every opportunity in one pass.
+
+    sop_month is the start of production relative to the first forecast
+    month (negative for programmes already ramping); volumes stop after
+    lifetime_months. A probability overrides the stage default where set.
+    Returns SKU x month matrices (incremental excludes stages already in
+    shipment history) plus per-opportunity totals in pipeline row order.
+    """
+    sku_index = pd.Index(skus)
+    sku_idx = sku_index.get_indexer(pipeline["sku"])
+    stage_prob = pipeline["stage"].map(STAGE_PROBABILITY).to_numpy(dtype=np.float64)
+    prob = pipeline["probability"].to_numpy(dtype=np.float64) if "probability" in pipeline else stage_prob
+    prob = np.where(np.isnan(prob), stage_prob, prob)
+    prob = np.nan_to_num(prob)
+    sop = pipeline["sop_month"].to_numpy(dtype=np.float64)
+    life = pipeline["lifetime_months"].to_numpy(dtype=np.float64)
+    run_rate = pipeline["annual_volume"].to_numpy(dtype=np.float64) / 12
+
+    t = np.arange(months)[None, :] - sop[:, None]
+    units = run_rate[:, None] * ramp_profile(t, pipeline["ramp_months"].to_numpy()[:, None])
+    units = np.where(t < life[:, None], units, 0.0)
+    units[sku_idx < 0] = 0.0
+    expected = units * prob[:, None]
+
+    rows = np.maximum(sku_idx, 0)
+    unweighted_by_sku = np.zeros((len(sku_index), months))
+    expected_by_sku = np.zeros((len(sku_index), months))
+    np.add.at(unweighted_by_sku, rows, units)
+    np.add.at(expected_by_sku, rows, expected)
+    # Wins already shipping are in the history the statistical forecast saw
+    new = ~pipeline["stage"].isin(IN_HISTORY_STAGES).to_numpy()
+    incremental_by_sku = np.zeros((len(sku_index), months))
+    np.add.at(incremental_by_sku, rows[new], expected[new])
+    return {
+        "expected": expected_by_sku,
+        "unweighted": unweighted_by_sku,
+        "incremental": incremental_by_sku,
+        "opportunity_expected": expected.sum(axis=1),
+        "probability": prob,
+        "unmatched": int((sku_idx < 0).sum()),
+    }
+
+
+class DesignWinModel:
+    """Pipeline-to-demand scoring cached per pipeline snapshot.
+
+    A snapshot is identified by an explicit id (e.g. the CRM extract
+    timestamp) or by a content hash of the pipeline frame, so re-rendering
+    a page with an unchanged pipeline costs a hash and a dictionary lookup.
+    The hash depends on row order, because per-opportunity results are
+    positional.
+    """
+
+    def __init__(self, skus: list, months: int, cache_size: int = 8):
+        self.skus = list(skus)
+        self.months = months
+        self.cache_size = cache_size
+        self._cache = {}
+
+    @staticmethod
+    def snapshot_key(pipeline: pd.DataFrame) -> str:
+        """Content hash of the scored pipeline columns, sensitive to row order"""
+        rows = pd.util.hash_pandas_object(pipeline[PIPELINE_COLUMNS], index=False).to_numpy()
+        return hashlib.blake2b(rows.tobytes(), digest_size=16).hexdigest()
+
+    def score(self, pipeline: pd.DataFrame, snapshot: str = None) -> dict:
+        """Score a pipeline snapshot, reusing the cached result when unchanged"""
+        key = snapshot if snapshot is not None else self.snapshot_key(pipeline)
+        if key not in self._cache:
+            if len(self._cache) >= self.cache_size:
+                self._cache.pop(next(iter(self._cache)))
+            result = score_pipeline(pipeline, self.skus, self.months)
+            result["by_stage"] = (pd.DataFrame({
+                "stage": pipeline["stage"].to_numpy(),
+                "opportunities": 1,
+                "annual_volume": pipeline["annual_volume"].to_numpy(),
+                "expected_units": result["opportunity_expected"],
+            }).groupby("stage").sum().reindex(list(STAGE_PROBABILITY)).fillna(0))
+            self._cache[key] = result
+        return self._cache[key]
+
+    def adjusted_forecast(self, base: np.ndarray, pipeline: pd.DataFrame, snapshot: str = None) -> np.ndarray:
+        """Add expected demand from wins not yet in shipment history to a SKU x month forecast"""
+        return np.asarray(base, dtype=np.float64) + self.score(pipeline, snapshot)["incremental"]
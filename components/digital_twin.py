@@ -0,0 +1,250 @@
+"""
+Telit Supply Chain - Multi-Plant Digital Twin
+Site layouts with a uniform-grid spatial index for zones and equipment
+"""
+
+import numpy as np
+import random
+import zlib
+
+# =============================================================================
+# SITE LAYOUTS
+# =============================================================================
+
+# Manufacturing sites, matching the What-If "Manufacturing Site" options
+FACTORY_SITES = [
+    {"id": "trieste", "name": "Trieste", "operator": "Telit", "country": "Italy", "width": 700, "height": 480},
+    {"id": "shanghai", "name": "Shanghai", "operator": "Telit", "country": "China", "width": 700, "height": 480},
+    {"id": "foxconn", "name": "Foxconn CM", "operator": "Foxconn", "country": "Taiwan", "width": 700, "height": 480},
+    {"id": "flex", "name": "Flex CM", "operator": "Flex", "country": "Malaysia", "width": 700, "height": 480},
+]
+
+# Reference plant layout; every site shares the same floor template
+ZONE_LAYOUT = [
+    {"id": "receiving", "name": "Receiving", "x": 50, "y": 50, "width": 150, "height": 100},
+    {"id": "warehouse", "name": "Warehouse", "x": 50, "y": 170, "width": 150, "height": 120},
+    {"id": "smt1", "name": "SMT Line 1", "x": 220, "y": 50, "width": 180, "height": 100},
+    {"id": "smt2", "name": "SMT Line 2", "x": 420, "y": 50, "width": 180, "height": 100},
+    {"id": "testing", "name": "Testing", "x": 220, "y": 170, "width": 180, "height": 120},
+    {"id": "packaging", "name": "Packaging", "x": 420, "y": 170, "width": 180, "height": 120},
+    {"id": "quality", "name": "Quality Lab", "x": 220, "y": 310, "width": 180, "height": 100},
+    {"id": "shipping", "name": "Shipping", "x": 420, "y": 310, "width": 180, "height": 100},
+]
+
+# Equipment types found in each zone
+ZONE_EQUIPMENT_TYPES = {
+    "receiving": ["Dock Door", "Scale"],
+    "warehouse": ["Rack", "AGV"],
+    "smt1": ["Pick & Place", "Printer", "Reflow Oven"],
+    "smt2": ["Pick & Place", "Printer", "Reflow Oven"],
+    "testing": ["RF Tester", "Functional Tester"],
+    "packaging": ["Tray Loader", "Labeler"],
+    "quality": ["AOI", "X-Ray"],
+    "shipping": ["Dock Door", "Wrapper"],
+}
+
+
+def get_site(site: str) -> dict:
+    """Look up a site by id or display name"""
+    for s in FACTORY_SITES:
+        if site in (s["id"], s["name"]):
+            return s
+    raise KeyError(f"Unknown factory site: {site}")
+
+
+# =============================================================================
+# SPATIAL INDEX
+# =============================================================================
+
+class SpatialGrid:
+    """Uniform grid over rectangles (zones) and points (equipment).
+
+    Rectangles are registered in every cell they overlap and points are
+    bucketed by cell and stored sorted by cell id, so a viewport query
+    only visits the cells it covers and then filters those candidates
+    exactly with one vectorized comparison.
+    """
+
+    def __init__(self, width: float, height: float, cell_size: float = 25.0):
+        self.cell_size = float(cell_size)
+        self.nx = max(1, int(np.ceil(width / cell_size)))
+        self.ny = max(1, int(np.ceil(height / cell_size)))
+        self.rect_ids = []
+        self.rects = np.empty((0, 4))
+        self.rect_cells = {}
+        self.point_ids = np.empty(0, dtype=object)
+        self.points = np.empty((0, 2))
+        self._order = np.empty(0, dtype=np.int64)
+        self._offsets = np.zeros(self.nx * self.ny + 1, dtype=np.int64)
+
+    def _cell_range(self, x0, y0, x1, y1):
+        cx0 = int(np.clip(x0 // self.cell_size, 0, self.nx - 1))
+        cy0 = int(np.clip(y0 // self.cell_size, 0, self.ny - 1))
+        cx1 = int(np.clip(x1 // self.cell_size, 0, self.nx - 1))
+        cy1 = int(np.clip(y1 // self.cell_size, 0, self.ny - 1))
+        return cx0, cy0, cx1, cy1
+
+    def insert_rects(self, ids: list, rects: np.ndarray):
+        """Index rectangles given as (x, y, width, height) rows"""
+        rects = np.asarray(rects, dtype=float).reshape(-1, 4)
+        base = len(self.rect_ids)
+        self.rect_ids.extend(ids)
+        self.rects = np.vstack([self.rects, rects])
+        for i, (x, y, w, h) in enumerate(rects):
+            cx0, cy0, cx1, cy1 = self._cell_range(x, y, x + w, y + h)
+            for cy in range(cy0, cy1 + 1):
+                for cx in range(cx0, cx1 + 1):
+                    self.rect_cells.setdefault(cy * self.nx + cx, []).append(base + i)
+
+    def load_points(self, ids, xy: np.ndarray):
+        """Bulk-load points, replacing any previously indexed ones"""
+        self.point_ids = np.asarray(ids, dtype=object)
+        self.points = np.asarray(xy, dtype=float).reshape(-1, 2)
+        cx = np.clip((self.points[:, 0] // self.cell_size).astype(np.int64), 0, self.nx - 1)
+        cy = np.clip((self.points[:, 1] // self.cell_size).astype(np.int64), 0, self.ny - 1)
+        cells = cy * self.nx + cx
+        self._order = np.argsort(cells, kind="stable")
+        counts = np.bincount(cells, minlength=self.nx * self.ny)
+        self._offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    def rects_at(self, x: float, y: float) -> list:
+        """Return ids of rectangles containing the point"""
+        cx0, cy0, _, _ = self._cell_range(x, y, x, y)
+        hits = []
+        for i in self.rect_cells.get(cy0 * self.nx + cx0, []):
+            rx, ry, rw, rh = self.rects[i]
+            if rx <= x <= rx + rw and ry <= y <= ry + rh:
+                hits.append(self.rect_ids[i])
+        return hits
+
+    def rects_in(self, x0: float, y0: float, x1: float, y1: float) -> list:
+        """Return ids of rectangles intersecting the viewport"""
+        cx0, cy0, cx1, cy1 = self._cell_range(x0, y0, x1, y1)
+        candidates = sorted({i for cy in range(cy0, cy1 + 1) for cx in range(cx0, cx1 + 1)
+                             for i in self.rect_cells.get(cy * self.nx + cx, ())})
+        if not candidates:
+            return []
+        r = self.rects[candidates]
+        mask = (r[:, 0] <= x1) & (r[:, 0] + r[:, 2] >= x0) & (r[:, 1] <= y1) & (r[:, 1] + r[:, 3] >= y0)
+        return [self.rect_ids[candidates[i]] for i in np.flatnonzero(mask)]
+
+    def points_in(self, x0: float, y0: float, x1: float, y1: float) -> np.ndarray:
+        """Return row indices of points inside the viewport"""
+        if not len(self.points):
+            return np.empty(0, dtype=np.int64)
+        cx0, cy0, cx1, cy1 = self._cell_range(x0, y0, x1, y1)
+        rows = np.arange(cy0, cy1 + 1) * self.nx
+        starts = self._offsets[rows + cx0]
+        ends = self._offsets[rows + cx1 + 1]
+        candidates = np.concatenate([self._order[s:e] for s, e in zip(starts, ends)])
+        p = self.points[candidates]
+        mask = (p[:, 0] >= x0) & (p[:, 0] <= x1) & (p[:, 1] >= y0) & (p[:, 1] <= y1)
+        return np.sort(candidates[mask])
+
+
+# =============================================================================
+# SITE TWIN
+# =============================================================================
+
+class SiteTwin:
+    """Digital twin of one plant: zone rectangles plus equipment positions"""
+
+    def __init__(self, site: dict, zones: list, equipment: dict, cell_size: float = 25.0):
+        self.site = site
+        self.zones = zones
+        self.equipment = equipment
+        self._zone_by_id = {z["id"]: z for z in zones}
+        self.index = SpatialGrid(site["width"], site["height"], cell_size)
+        self.index.insert_rects(
+            [z["id"] for z in zones],
+            [(z["x"], z["y"], z["width"], z["height"]) for z in zones],
+        )
+        self.index.load_points(equipment["id"], np.column_stack([equipment["x"], equipment["y"]]))
+
+    def hit_test(self, x: float, y: float) -> dict:
+        """Return the zone under a point, with the nearest equipment item"""
+        zone_ids = self.index.rects_at(x, y)
+        zone = self._zone_by_id[zone_ids[0]] if zone_ids else None
+        r = self.index.cell_size
+        near = self.index.points_in(x - r, y - r, x + r, y + r)
+        item = None
+        if len(near):
+            d = np.hypot(self.equipment["x"][near] - x, self.equipment["y"][near] - y)
+            item = self.equipment_record(near[np.argmin(d)])
+        return {"zone": zone, "equipment": item}
+
+    def visible(self, x0: float, y0: float, x1: float, y1: float) -> dict:
+        """Cull zones and equipment to a viewport"""
+        return {
+            "zones": [self._zone_by_id[z] for z in self.index.rects_in(x0, y0, x1, y1)],
+            "equipment": self.index.points_in(x0, y0, x1, y1),
+        }
+
+    def equipment_in_zone(self, zone_id: str) -> np.ndarray:
+        """Return row indices of equipment located inside a zone"""
+        z = self._zone_by_id[zone_id]
+        return self.index.points_in(z["x"], z["y"], z["x"] + z["width"], z["y"] + z["height"])
+
+    def equipment_record(self, row: int) -> dict:
+        """Materialise one equipment row as a dict"""
+        return {k: (v[row].item() if isinstance(v[row], np.generic) else v[row]) for k, v in self.equipment.items()}
+
+
+def _generate_equipment(site_id: str, zones: list, per_zone: int, rng: np.random.Generator) -> dict:
+    """Scatter equipment inside each zone, below the zone header"""
+    ids, names, types, zone_ids, xs, ys = [], [], [], [], [], []
+    for z in zones:
+        kinds = ZONE_EQUIPMENT_TYPES.get(z["id"], ["Station"])
+        xs.append(rng.uniform(z["x"] + 4, z["x"] + z["width"] - 4, per_zone))
+        ys.append(rng.uniform(z["y"] + 32, z["y"] + z["height"] - 4, per_zone))
+        for i in range(per_zone):
+            kind = kinds[i % len(kinds)]
+            ids.append(f"{site_id.upper()}-{z['id'].upper()}-{i + 1:04d}")
+            names.append(f"{kind} {i // len(kinds) + 1}")
+            types.append(kind)
+            zone_ids.append(z["id"])
+    n = len(ids)
+    health = rng.uniform(65, 99, n).round(1)
+    return {
+        "id": np.array(ids, dtype=object),
+        "name": np.array(names, dtype=object),
+        "type": np.array(types, dtype=object),
+        "zone": np.array(zone_ids, dtype=object),
+        "x": np.concatenate(xs) if xs else np.empty(0),
+        "y": np.concatenate(ys) if ys else np.empty(0),
+        "health_score": health,
+        "status": np.where(health < 70, "Critical", np.where(health < 85, "Warning", "Good")).astype(object),
+    }
+
+
+def get_site_zones(site: str = "Trieste") -> list:
+    """Generate zone data for one site's digital twin"""
+    s = get_site(site)
+    rnd = random.Random(s["id"])
+    zones = []
+    for layout in ZONE_LAYOUT:
+        zones.append({
+            **layout,
+            "site": s["name"],
+            "status": rnd.choice(["active", "active", "active", "warning", "idle"]),
+            "utilization": rnd.randint(45, 98),
+            "workers": rnd.randint(2, 12),
+            "units_today": rnd.randint(500, 5000),
+            "temperature": round(rnd.uniform(20, 28), 1),
+            "humidity": rnd.randint(35, 55),
+        })
+    return zones
+
+
+def build_site_twin(site: str = "Trieste", equipment_per_zone: int = 500) -> SiteTwin:
+    """Build a spatially indexed twin for one site"""
+    s = get_site(site)
+    zones = get_site_zones(s["id"])
+    rng = np.random.default_rng(zlib.crc32(s["id"].encode()))
+    equipment = _generate_equipment(s["id"], zones, equipment_per_zone, rng)
+    return SiteTwin(s, zones, equipment)
+
+
+def build_multi_site_twin(equipment_per_zone: int = 500) -> dict:
+    """Build twins for every manufacturing site, keyed by site name"""
+    return {s["name"]: build_site_twin(s["id"], equipment_per_zone) for s in FACTORY_SITES}
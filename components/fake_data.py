@@ -3,10 +3,40 @@ Telit Supply Chain - Fake Data Generators
 Generates realistic fake data for all dashboards
 """
 
+import os
+import tempfile
+import threading
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import random
+from statistics import NormalDist
+
+from components.digital_twin import FACTORY_SITES, build_site_twin, get_site, get_site_zones
+from components.forecasting import forecast_series
+from components.abc_xyz import AbcXyzClassifier
+from components.backtesting import BacktestStore
+from components.capability import CapabilityService, CAPABILITY_GROUPS
+from components.contracts import ContractBook
+from components.cube_tiles import CubeTiler
+from components.defect_map import DefectAggregator, DEFECT_TYPES
+from components.design_wins import DesignWinModel, STAGE_PROBABILITY
+from components.demand_sensing import DemandSensor, week_index
+from components.genealogy import GenealogyStore
+from components.incoming_inspection import InspectionPlanner, INSPECTION_LEVELS
+from components.inventory_engine import InventoryPosition
+from components.lead_time_sketch import LeadTimeSketches
+from components.ncr_store import NcrStore
+from components.reconciliation import Hierarchy, reconcile
+from components.scenarios import ScenarioStore
+from components.sourcing_exposure import SourcingExposure
+from components.spc import SpcMonitor
+from components.sop_plans import PlanStore
+from components.supplier_scorecard import SupplierScorecard
+from components.supplier_risk import SupplierRiskModel
+from components.test_store import TestResultStore
+from components.safety_stock import optimize_safety_stock, safety_stock_plan
+from components.yield_rollup import YieldRollup, PROCESS_ROUTE
 
 # Seed for reproducibility
 np.random.seed(42)
@@ -64,6 +94,31 @@ SUPPLIERS = [
     {"id": "SUP-008", "name": "Amphenol", "country": "USA", "category": "Connectors", "tier": 2},
 ]
 
+# Approved second sources by component category (not scorecarded)
+ALTERNATE_SUPPLIERS = [
+    {"id": "ALT-001", "name": "UNISOC", "country": "China", "category": "Chipsets"},
+    {"id": "ALT-002", "name": "Micron Technology", "country": "USA", "category": "Memory"},
+    {"id": "ALT-003", "name": "Fenghua Advanced", "country": "China", "category": "Passives"},
+    {"id": "ALT-004", "name": "MediaTek", "country": "Taiwan", "category": "Modems"},
+    {"id": "ALT-005", "name": "Qorvo", "country": "USA", "category": "RF Components"},
+    {"id": "ALT-006", "name": "Sunlord Electronics", "country": "China", "category": "Inductors"},
+    {"id": "ALT-007", "name": "Walsin Technology", "country": "Taiwan", "category": "Resistors"},
+    {"id": "ALT-008", "name": "Luxshare Precision", "country": "China", "category": "Connectors"},
+]
+
+# Primary component supplier gating each product category
+CATEGORY_SUPPLIER = {
+    "Cellular LPWA": "SUP-004",
+    "Cellular 5G": "SUP-004",
+    "Cellular LTE": "SUP-004",
+    "Positioning": "SUP-001",
+    "Wi-Fi & Bluetooth": "SUP-003",
+    "Smart Modules": "SUP-001",
+}
+
+# Regional distribution hubs replenished directly from manufacturing
+REGIONAL_HUBS = {"EMEA": "WH-IT-TS", "Americas": "WH-US-CA", "APAC": "WH-CN-SH"}
+
 # Telit Cinterion Key Customers by Industry Vertical
 CUSTOMERS = [
     # Smart Energy & Utilities (Smart Meters)
@@ -84,6 +139,42 @@ CUSTOMERS = [
     "Johnson Controls", "Honeywell Building Tech"
 ]
 
+# End-market segment of each key customer
+CUSTOMER_SEGMENTS = {
+    "Landis+Gyr": "Smart Energy", "Itron Inc": "Smart Energy", "Honeywell Elster": "Smart Energy",
+    "Continental AG": "Telematics", "Geotab": "Telematics", "CalAmp": "Telematics",
+    "BMW Group": "Automotive", "Stellantis": "Automotive", "Volvo Trucks": "Automotive",
+    "Medtronic": "Healthcare", "Philips Healthcare": "Healthcare",
+    "ChargePoint": "EV Charging", "ABB E-mobility": "EV Charging",
+    "John Deere": "Agriculture", "AGCO Corporation": "Agriculture",
+    "Ingenico": "Retail", "NCR Corporation": "Retail",
+    "Johnson Controls": "Smart Buildings", "Honeywell Building Tech": "Smart Buildings",
+}
+
+# Headquarters region of each key customer
+CUSTOMER_REGIONS = {
+    "Landis+Gyr": "EMEA", "Itron Inc": "Americas", "Honeywell Elster": "Americas",
+    "Continental AG": "EMEA", "Geotab": "Americas", "CalAmp": "Americas",
+    "BMW Group": "EMEA", "Stellantis": "EMEA", "Volvo Trucks": "EMEA",
+    "Medtronic": "Americas", "Philips Healthcare": "EMEA",
+    "ChargePoint": "Americas", "ABB E-mobility": "EMEA",
+    "John Deere": "Americas", "AGCO Corporation": "Americas",
+    "Ingenico": "EMEA", "NCR Corporation": "Americas",
+    "Johnson Controls": "Americas", "Honeywell Building Tech": "Americas",
+}
+
+# Headquarters country of each key customer
+CUSTOMER_COUNTRIES = {
+    "Landis+Gyr": "Switzerland", "Itron Inc": "USA", "Honeywell Elster": "USA",
+    "Continental AG": "Germany", "Geotab": "Canada", "CalAmp": "USA",
+    "BMW Group": "Germany", "Stellantis": "Netherlands", "Volvo Trucks": "Sweden",
+    "Medtronic": "USA", "Philips Healthcare": "Netherlands",
+    "ChargePoint": "USA", "ABB E-mobility": "Switzerland",
+    "John Deere": "USA", "AGCO Corporation": "USA",
+    "Ingenico": "France", "NCR Corporation": "USA",
+    "Johnson Controls": "USA", "Honeywell Building Tech": "USA",
+}
+
 # =============================================================================
 # EXECUTIVE DASHBOARD DATA
 # =============================================================================
@@ -138,26 +229,102 @@ def get_active_alerts():
 # INVENTORY DATA
 # =============================================================================
 
+def build_inventory_position(history_months=12):
+    """Build the inventory position engine for all warehouses and products.
+
+    Daily demand per SKU x warehouse is the SKU demand history's recent monthly
+    mean split by warehouse capacity, as in the safety stock plan; stock
+    levels and reorder points are drawn as days of that demand.
+    """
+    rng = np.random.default_rng(89)
+    share = np.array([w["capacity"] for w in WAREHOUSES], dtype=np.float64)
+    share /= share.sum()
+    demand = get_sku_demand_history()[:, -history_months:].mean(axis=1)[:, None] / 30 * share[None, :]
+    cover = lambda lo, hi: np.round(demand * rng.uniform(lo, hi, demand.shape))
+    position = InventoryPosition(
+        [p["sku"] for p in TELIT_PRODUCTS],
+        [w["id"] for w in WAREHOUSES],
+        daily_demand=demand,
+        reorder_point=cover(7, 14),
+    )
+    position.load(
+        on_hand=cover(3, 60),
+        on_order=cover(0, 25),
+        allocated=cover(0, 2),
+        in_transit=cover(0, 12),
+    )
+    return position
+
+_INVENTORY = {}
+_INVENTORY_LOCK = threading.Lock()
+
+def get_inventory_position():
+    """Shared inventory position engine; each new day ships that day's modelled demand and
+    receives up to as much from in-transit, posted as incremental movements"""
+    today = np.datetime64(datetime.now().date(), "D")
+    with _INVENTORY_LOCK:
+        if "position" not in _INVENTORY:
+            _INVENTORY["position"] = build_inventory_position()
+        position = _INVENTORY["position"]
+        elapsed = int((today - position.as_of).astype(np.int64))
+        if elapsed > 0:
+            position.as_of = today
+            skus = np.repeat(position.skus, len(position.warehouses))
+            warehouses = np.tile(position.warehouses, len(position.skus))
+            demand = position.daily_demand * elapsed
+            position.receive(skus, warehouses, np.minimum(position.qty["in_transit"], demand).ravel())
+            position.post_movements(skus, warehouses, -np.minimum(position.qty["on_hand"], demand).ravel())
+        return position
+
 def get_inventory_levels():
     """Generate inventory levels by warehouse and product"""
-    data = []
-    for wh in WAREHOUSES:
-        for prod in TELIT_PRODUCTS:
-            stock = random.randint(100, 5000)
-            reorder_point = random.randint(200, 800)
-            data.append({
-                "warehouse_id": wh["id"],
-                "warehouse_name": wh["name"],
-                "region": wh["region"],
-                "sku": prod["sku"],
-                "product_name": prod["name"],
-                "category": prod["category"],
-                "current_stock": stock,
-                "reorder_point": reorder_point,
-                "status": "Low Stock" if stock < reorder_point else "OK",
-                "days_of_supply": round(stock / random.randint(20, 100), 1),
-            })
-    return pd.DataFrame(data)
+    df = get_inventory_position().to_frame()
+    warehouses = pd.DataFrame(WAREHOUSES).set_index("id")
+    products = pd.DataFrame(TELIT_PRODUCTS).set_index("sku")
+    df["warehouse_name"] = df["warehouse_id"].map(warehouses["name"])
+    df["region"] = df["warehouse_id"].map(warehouses["region"])
+    df["product_name"] = df["sku"].map(products["name"])
+    df["category"] = df["sku"].map(products["category"])
+    df["current_stock"] = df["on_hand"].astype(int)
+    df["reorder_point"] = df["reorder_point"].astype(int)
+    df["status"] = np.where(df["low_stock"], "Low Stock", "OK")
+    df["days_of_supply"] = df["days_of_supply"].round(1)
+    return df
+
+_SALES_HISTORY = {}
+
+def get_sales_history(months=12):
+    """Monthly sales history per SKU x warehouse as columnar arrays (generated once per session)"""
+    if months not in _SALES_HISTORY:
+        rng = np.random.default_rng(29)
+        n_sku, n_wh = len(TELIT_PRODUCTS), len(WAREHOUSES)
+        sku_idx, wh_idx, period_idx = [a.ravel() for a in np.meshgrid(
+            np.arange(n_sku), np.arange(n_wh), np.arange(months), indexing="ij")]
+        base = rng.lognormal(8.5, 1.0, n_sku)
+        volatility = rng.uniform(0.1, 1.2, n_sku)
+        share = np.array([w["capacity"] for w in WAREHOUSES]) / sum(w["capacity"] for w in WAREHOUSES)
+        shock = rng.gamma(1 / volatility[:, None] ** 2, volatility[:, None] ** 2, (n_sku, months))
+        units = np.round(base[sku_idx] * share[wh_idx] * shock[sku_idx, period_idx])
+        price = np.array([p["price"] for p in TELIT_PRODUCTS])
+        _SALES_HISTORY[months] = {
+            "sku_idx": sku_idx,
+            "warehouse_idx": wh_idx,
+            "period_idx": period_idx,
+            "units": units,
+            "revenue": units * price[sku_idx],
+        }
+    return _SALES_HISTORY[months]
+
+_ABC_CLASSIFIERS = {}
+
+def get_abc_classification(months=12):
+    """Classify the product catalogue by revenue (ABC) and demand variability (XYZ), built once per window"""
+    if months not in _ABC_CLASSIFIERS:
+        history = get_sales_history(months)
+        classifier = AbcXyzClassifier([p["sku"] for p in TELIT_PRODUCTS], months)
+        classifier.update(history["sku_idx"], history["period_idx"], history["revenue"], history["units"])
+        _ABC_CLASSIFIERS[months] = classifier
+    return _ABC_CLASSIFIERS[months]
 
 def get_warehouse_summary():
     """Generate warehouse summary data"""
@@ -209,108 +376,1253 @@ def get_active_shipments():
 # DEMAND FORECASTING DATA
 # =============================================================================
 
-def get_demand_forecast(months=12):
-    """Generate demand forecast with predictions"""
-    dates = [datetime.now() + timedelta(days=30*x) for x in range(-6, months)]
+_DEMAND_HISTORY = {}
+
+def get_demand_history(periods=36):
+    """Monthly demand history for every product as a SKU x month matrix (generated once per session)"""
+    if periods not in _DEMAND_HISTORY:
+        rng = np.random.default_rng(3)
+        n = len(TELIT_PRODUCTS)
+        base = rng.integers(3000, 15000, n).astype(float)
+        t = np.arange(periods)
+        seasonality = np.sin(t * np.pi / 6)[None, :] * base[:, None] * 0.2
+        trend = t[None, :] * base[:, None] * 0.01
+        noise = rng.normal(0, 1, (n, periods)) * base[:, None] * 0.05
+        history = np.maximum(0, base[:, None] + seasonality + trend + noise).round()
+        history.flags.writeable = False
+        _DEMAND_HISTORY[periods] = history
+    return _DEMAND_HISTORY[periods]
+
+def get_sku_demand_history(periods=36):
+    """SKU x month history rolled up from the customer series the forecast cube is built on"""
+    series, sku_idx, _ = get_customer_demand_history(periods)
+    history = np.zeros((len(TELIT_PRODUCTS), series.shape[1]))
+    np.add.at(history, sku_idx, series)
+    return history
+
+def get_sku_forecast(months=12):
+    """Reconciled forecast cube rolled up to SKU x month"""
+    cube = get_forecast_cube("mint", months)
+    _, sku_idx, _ = get_customer_demand_history()
+    forecast = np.zeros((len(TELIT_PRODUCTS), months))
+    np.add.at(forecast, sku_idx, np.maximum(cube["forecast"], 0))
+    return forecast
+
+def get_demand_forecast(months=12, history_months=6, level=0.95):
+    """Product demand history and forecast from the SKU roll-up of the reconciled forecast cube,
+    with a two-sided prediction interval at the given confidence level"""
+    history = get_sku_demand_history()
+    forecast = get_sku_forecast(months)
+    # Interval width and model label come from a direct fit at SKU level
+    fit = forecast_series(history, months)
+    z = NormalDist().inv_cdf((1 + level) / 2)
+    dates = [datetime.now() + timedelta(days=30*x) for x in range(-history_months, months)]
+    steps = np.sqrt(np.arange(1, months + 1))
     data = []
     
-    for prod in TELIT_PRODUCTS[:6]:
-        base_demand = random.randint(3000, 15000)
+    for p, prod in enumerate(TELIT_PRODUCTS):
+        past = history[p, -history_months:]
+        band = z * fit["residual_std"][p] * steps
         for i, date in enumerate(dates):
-            is_forecast = i >= 6
-            seasonality = np.sin(i * np.pi / 6) * base_demand * 0.2
-            trend = i * base_demand * 0.01
-            noise = np.random.normal(0, base_demand * 0.05) if not is_forecast else 0
-            
-            demand = max(0, base_demand + seasonality + trend + noise)
-            
+            is_forecast = i >= history_months
+            h = i - history_months
+            demand = forecast[p, h] if is_forecast else past[i]
             data.append({
                 "date": date,
                 "product": prod["name"],
                 "sku": prod["sku"],
                 "demand": int(demand),
-                "lower_bound": int(demand * 0.85) if is_forecast else None,
-                "upper_bound": int(demand * 1.15) if is_forecast else None,
+                "lower_bound": int(max(0, demand - band[h])) if is_forecast else None,
+                "upper_bound": int(demand + band[h]) if is_forecast else None,
                 "is_forecast": is_forecast,
+                "model": fit["model"][p],
             })
     
     return pd.DataFrame(data)
 
+_CUSTOMER_HISTORY = {}
+
+def get_customer_demand_history(periods=36):
+    """Split product demand history into SKU x customer series (generated once per session)"""
+    if periods in _CUSTOMER_HISTORY:
+        return _CUSTOMER_HISTORY[periods]
+    rng = np.random.default_rng(31)
+    history = get_demand_history(periods)
+    n_sku, n_cust = len(TELIT_PRODUCTS), len(CUSTOMERS)
+    shares = rng.dirichlet(np.ones(n_cust) * 0.5, n_sku)
+    noise = rng.gamma(8, 1 / 8, (n_sku, n_cust, periods))
+    series = np.round(history[:, None, :] * shares[:, :, None] * noise).reshape(n_sku * n_cust, periods)
+    sku_idx, cust_idx = np.divmod(np.arange(n_sku * n_cust), n_cust)
+    _CUSTOMER_HISTORY[periods] = (series, sku_idx, cust_idx)
+    return _CUSTOMER_HISTORY[periods]
+
+_BACKTESTS = BacktestStore(horizon=3)
+
+def get_forecast_accuracy(group_by=None):
+    """Backtest forecasting models across SKU x customer series"""
+    series, sku_idx, cust_idx = get_customer_demand_history()
+    _BACKTESTS.run(series)
+    if group_by == "customer":
+        return _BACKTESTS.summary(cust_idx, CUSTOMERS)
+    if group_by == "product":
+        return _BACKTESTS.summary(sku_idx, [p["name"] for p in TELIT_PRODUCTS])
+    if group_by == "region":
+        regions = sorted(set(CUSTOMER_REGIONS.values()))
+        region_idx = np.array([regions.index(CUSTOMER_REGIONS[c]) for c in CUSTOMERS])[cust_idx]
+        return _BACKTESTS.summary(region_idx, regions)
+    return _BACKTESTS.summary()
+
+def get_forecast_accuracy_trend(model="ses"):
+    """Backtest accuracy of one model for each forecast origin"""
+    series, _, _ = get_customer_demand_history()
+    _BACKTESTS.run(series)
+    return _BACKTESTS.by_origin(model)
+
+_FORECAST_CUBES = {}
+
+def get_forecast_cube(method="mint", months=12):
+    """Reconciled SKU x customer forecast cube, cached per method and horizon"""
+    key = (method, months)
+    if key not in _FORECAST_CUBES:
+        series, sku_idx, cust_idx = get_customer_demand_history()
+        customers = np.array(CUSTOMERS, dtype=object)[cust_idx]
+        leaves = pd.DataFrame({
+            "sku": [TELIT_PRODUCTS[i]["sku"] for i in sku_idx],
+            "product": [TELIT_PRODUCTS[i]["name"] for i in sku_idx],
+            "customer": customers,
+            "country": [CUSTOMER_COUNTRIES[c] for c in customers],
+            "region": [CUSTOMER_REGIONS[c] for c in customers],
+        })
+        hierarchy = Hierarchy(leaves, ["region", "country", "customer"])
+        fits = [forecast_series(level, months) for level in hierarchy.aggregate_all(series)]
+        base = [f["forecast"] for f in fits]
+        variances = [f["residual_std"] ** 2 for f in fits]
+        coherent = reconcile(hierarchy, base, method, history=series, variances=variances)
+        _FORECAST_CUBES[key] = {"leaves": leaves, "hierarchy": hierarchy, "forecast": coherent[-1], "levels": coherent}
+    return _FORECAST_CUBES[key]
+
+_SCENARIO_INPUTS = {}
+
+def get_scenario_store(months=12):
+    """New scenario store over the reconciled forecast cube; the base inputs are cached per horizon"""
+    if months not in _SCENARIO_INPUTS:
+        cube = get_forecast_cube("mint", months)
+        leaves = cube["leaves"].copy()
+        products = pd.DataFrame(TELIT_PRODUCTS).set_index("sku")
+        leaves["category"] = leaves["sku"].map(products["category"])
+        leaves["segment"] = leaves["customer"].map(CUSTOMER_SEGMENTS)
+        prices = leaves["sku"].map(products["price"]).to_numpy()
+        base = np.maximum(cube["forecast"], 0)
+        for array in (base, prices):
+            array.flags.writeable = False
+        _SCENARIO_INPUTS[months] = (base, leaves, prices, prices * 0.6)
+    return ScenarioStore(*_SCENARIO_INPUTS[months])
+
+# Typical application of each product category in design-win opportunities
+CATEGORY_APPLICATIONS = {
+    "Cellular LPWA": "Smart Metering",
+    "Cellular 5G": "V2X Telematics",
+    "Cellular LTE": "Fleet Management",
+    "Positioning": "Asset Tracking",
+    "Wi-Fi & Bluetooth": "Smart Buildings",
+    "Smart Modules": "EV Charging",
+}
+
+_DESIGN_WIN_PIPELINES = {}
+
+def get_design_win_pipeline(n_opportunities=3000):
+    """Generate the design-win pipeline snapshot (generated once per session)"""
+    if n_opportunities not in _DESIGN_WIN_PIPELINES:
+        rng = np.random.default_rng(23)
+        stages = list(STAGE_PROBABILITY)
+        stage = rng.choice(stages, n_opportunities, p=[0.35, 0.25, 0.18, 0.10, 0.12])
+        product = rng.integers(0, len(TELIT_PRODUCTS), n_opportunities)
+        stage_rank = np.array([stages.index(s) for s in stage])
+        # Later stages are closer to (or past) start of production
+        sop = np.round(rng.normal(12 - stage_rank * 4, 3)).astype(int)
+        _DESIGN_WIN_PIPELINES[n_opportunities] = pd.DataFrame({
+            "opportunity_id": [f"DW-{2024 + i % 3}-{i:05d}" for i in range(n_opportunities)],
+            "customer": rng.choice(CUSTOMERS, n_opportunities),
+            "application": [CATEGORY_APPLICATIONS[TELIT_PRODUCTS[p]["category"]] for p in product],
+            "sku": [TELIT_PRODUCTS[p]["sku"] for p in product],
+            "stage": stage,
+            "probability": np.where(rng.random(n_opportunities) < 0.2, rng.uniform(0.05, 0.95, n_opportunities), np.nan),
+            "annual_volume": np.round(rng.lognormal(9.5, 1.0, n_opportunities), -2),
+            "sop_month": sop,
+            "ramp_months": rng.choice([3, 6, 9, 12], n_opportunities),
+            "lifetime_months": rng.choice([36, 48, 60, 84], n_opportunities),
+        })
+    return _DESIGN_WIN_PIPELINES[n_opportunities]
+
+_DESIGN_WIN_MODELS = {}
+
+def get_design_win_demand(months=12):
+    """Expected design-win demand per product and month for the current pipeline snapshot"""
+    if months not in _DESIGN_WIN_MODELS:
+        _DESIGN_WIN_MODELS[months] = DesignWinModel([p["sku"] for p in TELIT_PRODUCTS], months)
+    return _DESIGN_WIN_MODELS[months].score(get_design_win_pipeline())
+
+def get_design_win_forecast(months=12):
+    """SKU x month reconciled forecast plus expected demand from wins not yet in shipment history"""
+    get_design_win_demand(months)
+    return _DESIGN_WIN_MODELS[months].adjusted_forecast(get_sku_forecast(months), get_design_win_pipeline())
+
+_PLAN_STORES = {}
+
+def get_sop_plan_store(months=12):
+    """S&OP plan versions over the reconciled SKU x customer cube, seeded with sample branches"""
+    if months not in _PLAN_STORES:
+        cube = get_forecast_cube("mint", months)
+        leaves = cube["leaves"]
+        demand = np.maximum(cube["forecast"], 0).round()
+        # Level-loaded supply plan and the inventory it projects
+        supply = np.repeat(demand.mean(axis=1, keepdims=True), months, axis=1).round()
+        inventory = demand[:, :1] * 0.5 + np.cumsum(supply - demand, axis=1)
+        store = PlanStore(leaves["sku"] + " | " + leaves["customer"], [f"M+{m + 1}" for m in range(months)],
+                          {"demand": demand, "supply": supply, "inventory": inventory}, chunk_rows=32)
+        first_half = np.arange(months // 2)
+        fiveg = np.flatnonzero(leaves["sku"].isin([p["sku"] for p in TELIT_PRODUCTS if p["category"] == "Cellular 5G"]))
+        auto = np.flatnonzero(leaves["customer"].map(CUSTOMER_SEGMENTS) == "Automotive")
+        store.branch("Sales Consensus", author="Sales", message="Automotive upside from BMW and Stellantis")
+        rows, cols = np.meshgrid(auto, first_half, indexing="ij")
+        store.adjust("Sales Consensus", "demand", rows.ravel(), cols.ravel(), 1.10)
+        store.branch("Ops Constrained", author="Operations", message="5G chipset allocation")
+        rows, cols = np.meshgrid(fiveg, np.arange(months), indexing="ij")
+        store.adjust("Ops Constrained", "supply", rows.ravel(), cols.ravel(), 0.85)
+        store.merge("Sales Consensus", "Ops Constrained", into="Consensus v1", author="S&OP")
+        _PLAN_STORES[months] = store
+    return _PLAN_STORES[months]
+
+_CUBE_TILERS = {}
+
+def get_demand_cube_tiler(months=12):
+    """Tiled view over the SKU x customer demand cube: history then reconciled forecast, per month"""
+    if months not in _CUBE_TILERS:
+        cube = get_forecast_cube("mint", months)
+        series, _, _ = get_customer_demand_history()
+        leaves = cube["leaves"].assign(category=cube["leaves"]["sku"].map({p["sku"]: p["category"] for p in TELIT_PRODUCTS}))
+        order = np.lexsort((leaves["customer"], leaves["sku"], leaves["category"]))
+        values = np.hstack([series, np.maximum(cube["forecast"], 0)])[order]
+        first = pd.Timestamp(datetime.now()).to_period("M") - series.shape[1]
+        periods = pd.period_range(first, periods=values.shape[1], freq="M").strftime("%Y-%m")
+        col_labels = [f"{p} F" if i >= series.shape[1] else p for i, p in enumerate(periods)]
+        labels = (leaves["sku"] + " | " + leaves["customer"]).to_numpy()[order]
+        _CUBE_TILERS[months] = CubeTiler(values, labels, col_labels, leaves["category"].to_numpy()[order])
+    return _CUBE_TILERS[months]
+
+# Share of weekly demand each signal source observes, and its events per week
+SIGNAL_PROFILE = {
+    "Customer EDI": (0.55, 320),
+    "Design Win Pipeline": (0.15, 32),
+    "Distributor POS": (0.10, 704),
+    "Market Intelligence": (0.05, 16),
+    "Carrier Activations": (0.15, 20000),
+}
+
+def get_signal_batches(weeks=26, surge_weeks=3, surge_category="Cellular 5G", surge=1.25):
+    """Generate one batch of demand signal events per week, ending today"""
+    rng = np.random.default_rng(7)
+    weekly = get_sku_demand_history()[:, -1] / 4.33
+    skus = np.array([p["sku"] for p in TELIT_PRODUCTS])
+    surging = np.array([p["category"] == surge_category for p in TELIT_PRODUCTS])
+    now = datetime.now()
+    start = now - timedelta(weeks=weeks - 1)
+    for w in range(weeks):
+        level = weekly * np.where(surging & (w >= weeks - surge_weeks), surge, 1.0)
+        frames = []
+        for source, (share, n_events) in SIGNAL_PROFILE.items():
+            # Every source reports on every SKU, spreading its share of each
+            # SKU's volume over that SKU's events
+            sku_idx = np.arange(n_events) % len(skus)
+            per_sku = np.bincount(sku_idx, minlength=len(skus))
+            quantity = rng.gamma(16, 1 / 16, n_events) * (level * share / per_sku)[sku_idx]
+            frames.append(pd.DataFrame({
+                "source": source,
+                "sku": skus[sku_idx],
+                "date": start + timedelta(weeks=w) + pd.to_timedelta(rng.integers(0, 7, n_events), unit="D"),
+                "quantity": quantity,
+            }))
+        batch = pd.concat(frames, ignore_index=True)
+        # Nothing is reported for days that have not happened yet
+        yield batch[batch["date"] <= now]
+
+_DEMAND_SENSORS = {}
+
+def get_demand_sensor(weeks=26):
+    """Demand sensor fed with the generated signal streams (built once per session)"""
+    if weeks not in _DEMAND_SENSORS:
+        first = week_index([datetime.now() - timedelta(weeks=weeks - 1)])[0]
+        sensor = DemandSensor([p["sku"] for p in TELIT_PRODUCTS], first - 1)
+        sensor.consume(get_signal_batches(weeks))
+        # Keep the current week open: only complete weeks feed the sensed lift
+        sensor.advance(week_index([datetime.now()])[0])
+        _DEMAND_SENSORS[weeks] = sensor
+    return _DEMAND_SENSORS[weeks]
+
+def get_sensed_forecast(horizon_weeks=8):
+    """Short-horizon weekly forecast per product before and after demand sensing"""
+    sensor = get_demand_sensor()
+    base = get_sku_forecast()[:, 0] / 4.33
+    base_weekly = np.repeat(base[:, None], horizon_weeks, axis=1)
+    sensed = sensor.sensed_forecast(base_weekly)
+    return pd.DataFrame({
+        "sku": [p["sku"] for p in TELIT_PRODUCTS],
+        "product": [p["name"] for p in TELIT_PRODUCTS],
+        "base_units": base_weekly.sum(axis=1).round(),
+        "sensed_units": sensed.sum(axis=1).round(),
+        "lift_pct": (sensor.lift() - 1) * 100,
+    })
+
 # =============================================================================
 # SUPPLIER PERFORMANCE DATA
 # =============================================================================
 
-def get_supplier_performance():
-    """Generate supplier performance metrics"""
+def get_po_history(years=5, lines_per_month=40):
+    """Generate PO-line and receipt event tables for every supplier"""
+    rng = np.random.default_rng(31)
+    n_sup = len(SUPPLIERS)
+    # Per-supplier behaviour: late probability, lead time, defect rate and price drift
+    p_late = rng.uniform(0.02, 0.15, n_sup)
+    lead_mean = rng.uniform(14, 45, n_sup)
+    defect_rate = rng.uniform(0.0005, 0.01, n_sup)
+    price_drift = rng.uniform(-0.05, 0.08, n_sup)
+    n = n_sup * years * 12 * lines_per_month
+    sup = rng.integers(0, n_sup, n)
+    order_date = pd.Timestamp(datetime.now().date()) - pd.to_timedelta(rng.integers(0, years * 365, n), unit="D")
+    promised = order_date + pd.to_timedelta(np.round(lead_mean[sup]), unit="D")
+    quantity = rng.integers(1, 50, n) * 100
+    price = np.round(rng.uniform(0.05, 12.0, n), 2)
+    po_lines = pd.DataFrame({
+        "po_line_id": [f"PO-{i // 4:06d}-{i % 4 + 1}" for i in range(n)],
+        "supplier_id": np.array([s["id"] for s in SUPPLIERS])[sup],
+        "order_date": order_date,
+        "promised_date": promised,
+        "quantity": quantity,
+        "unit_price": price,
+        "ack_hours": rng.gamma(2, 12, n) * (1 + p_late[sup] * 5),
+    })
+    delay = np.where(rng.random(n) < p_late[sup], rng.integers(1, 15, n), -rng.integers(0, 4, n))
+    receipt_date = promised + pd.to_timedelta(delay, unit="D")
+    received = receipt_date <= pd.Timestamp(datetime.now())
+    # Each supplier ships a handful of part numbers to every factory site
+    po_lines["part"] = [f"{SUPPLIERS[i]['category'][:4].upper()}-{SUPPLIERS[i]['id'][-3:]}-{k:02d}"
+                        for i, k in zip(sup, rng.integers(0, 6, n))]
+    po_lines["site"] = np.array([f["name"] for f in FACTORY_SITES])[rng.integers(0, len(FACTORY_SITES), n)]
+    receipts = pd.DataFrame({
+        "po_line_id": po_lines["po_line_id"],
+        "receipt_date": receipt_date,
+        "quantity_received": quantity,
+        "quantity_rejected": rng.binomial(quantity, defect_rate[sup]),
+        "invoice_price": price * (1 + price_drift[sup] + rng.normal(0, 0.01, n)),
+    })[received]
+    return po_lines, receipts
+
+_SCORECARDS = {}
+
+def get_supplier_scorecard():
+    """Supplier scorecard engine loaded with the PO history (built once per session)"""
+    if "engine" not in _SCORECARDS:
+        engine = SupplierScorecard([s["id"] for s in SUPPLIERS])
+        po_lines, receipts = get_po_history()
+        engine.ingest_po_lines(po_lines)
+        engine.ingest_receipts(receipts)
+        _SCORECARDS["engine"] = engine
+    return _SCORECARDS["engine"]
+
+_LEAD_TIME_SKETCHES = {}
+
+def get_lead_time_sketches():
+    """Per supplier, part and site lead-time sketches fed from the receipt history"""
+    if "sketches" not in _LEAD_TIME_SKETCHES:
+        po_lines, receipts = get_po_history()
+        lines = po_lines.set_index("po_line_id").loc[receipts["po_line_id"]]
+        sketches = LeadTimeSketches()
+        sketches.record_batch(pd.DataFrame({
+            "supplier": lines["supplier_id"].to_numpy(),
+            "part": lines["part"].to_numpy(),
+            "site": lines["site"].to_numpy(),
+            "lead_days": (receipts["receipt_date"].to_numpy() - lines["order_date"].to_numpy()) / np.timedelta64(1, "D"),
+        }))
+        _LEAD_TIME_SKETCHES["sketches"] = sketches
+    return _LEAD_TIME_SKETCHES["sketches"]
+
+def get_lead_time_quantiles(by="supplier", **filters):
+    """P50/P90/P99 lead times grouped by supplier, part and/or site"""
+    table = get_lead_time_sketches().quantiles(by, **filters)
+    if "supplier" in table:
+        names = {s["id"]: s["name"] for s in SUPPLIERS}
+        table.insert(1, "name", table["supplier"].map(names))
+    return table
+
+def get_supplier_contracts():
+    """Generate primary and second-source contracts with price breaks for every purchased part"""
+    rng = np.random.default_rng(47)
+    po_lines, _ = get_po_history()
+    annual = get_part_demand_plan()
+    part_supplier = po_lines.groupby("part")["supplier_id"].first()
+    alternates = {s["id"]: a["id"] for s, a in zip(SUPPLIERS, ALTERNATE_SUPPLIERS)}
+    today = pd.Timestamp(datetime.now().date())
+    contracts, breaks = [], []
+    for part, supplier in part_supplier.items():
+        base = float(np.round(rng.lognormal(1.0, 0.8), 2))
+        volume = annual.get(part, 0)
+        for role, sup in [("P", supplier), ("A", alternates[supplier])]:
+            cid = f"CTR-{part}-{role}"
+            primary = role == "P"
+            start = today - pd.Timedelta(days=int(rng.integers(30, 700)))
+            contracts.append({
+                "contract_id": cid,
+                "supplier_id": sup,
+                "part": part,
+                "start_date": start,
+                "end_date": start + pd.Timedelta(days=int(365 * rng.choice([0.5, 1, 2, 3, 4] if primary else [0.5, 1, 2]))),
+                "pricing": rng.choice(["all_units", "incremental"]),
+                "committed_qty": round(volume * rng.uniform(0.5, 0.7), -2) if primary else 0,
+                "shortfall_penalty": round(base * 0.05, 3) if primary else 0.0,
+                "payment_days": int(rng.choice([30, 45, 60, 90])),
+                "early_pay_discount": float(rng.choice([0, 1, 2])),
+                "early_pay_days": 10,
+            })
+            # Primary contracts reward volume with deeper tiers; second sources price higher
+            steps = [(0, 0.0), (0.25, 0.03), (0.5, 0.06), (1.0, 0.10)] if primary else [(0, 0.0), (0.2, 0.02), (0.5, 0.04)]
+            premium = 1.0 if primary else rng.uniform(1.02, 1.08)
+            breaks.extend({"contract_id": cid, "min_qty": int(round(volume * f, -2)),
+                           "unit_price": round(base * premium * (1 - d), 4)} for f, d in steps)
+    return pd.DataFrame(contracts), pd.DataFrame(breaks).drop_duplicates(["contract_id", "min_qty"])
+
+def get_part_demand_plan(growth=1.0):
+    """Annual units per purchased part: trailing-year PO volume scaled by a growth factor"""
+    po_lines, _ = get_po_history()
+    recent = po_lines[po_lines["order_date"] >= pd.Timestamp(datetime.now()) - pd.Timedelta(days=365)]
+    return recent.groupby("part")["quantity"].sum() * growth
+
+_CONTRACTS = {}
+
+def get_contract_book():
+    """Contract book loaded with every supplier contract (built once per session)"""
+    if "book" not in _CONTRACTS:
+        _CONTRACTS["book"] = ContractBook(*get_supplier_contracts())
+    return _CONTRACTS["book"]
+
+def get_award_shares(primary_share):
+    """Award split giving primary_share of each part to its primary supplier (scalar or array of splits)"""
+    book = get_contract_book()
+    primary = book.contracts["contract_id"].str.endswith("-P").to_numpy()
+    share = np.asarray(primary_share, dtype=np.float64)[..., None]
+    return book.normalize(np.where(primary, share, 1 - share))
+
+def get_contract_evaluation(primary_share=0.8, growth=1.0):
+    """Per-contract cost of the demand plan under an award split"""
+    book = get_contract_book()
+    table = book.contract_table(get_award_shares(primary_share), get_part_demand_plan(growth))
+    names = {s["id"]: s["name"] for s in SUPPLIERS + ALTERNATE_SUPPLIERS}
+    table.insert(2, "supplier", table["supplier_id"].map(names))
+    return table
+
+def get_award_split_curve(growth=1.0, steps=21):
+    """Net annual cost of the plan across primary-supplier award shares, costed in one pass"""
+    splits = np.linspace(0, 1, steps)
+    cost = get_contract_book().total_cost(get_award_shares(splits), get_part_demand_plan(growth))
+    return pd.DataFrame({"primary_share": splits, "net_cost": cost})
+
+def get_supplier_financials():
+    """Latest financial-health feed per supplier (Altman Z-score)"""
+    rng = np.random.default_rng(43)
+    return pd.DataFrame({"altman_z": np.round(rng.uniform(1.5, 4.5, len(SUPPLIERS)), 2)},
+                        index=[s["id"] for s in SUPPLIERS])
+
+_SUPPLIER_RISK = SupplierRiskModel(pd.DataFrame(SUPPLIERS))
+
+def get_supplier_risk(months=12):
+    """Composite supplier risk, refreshed from the financial, scorecard and lead-time feeds"""
+    start = datetime.now() - timedelta(days=30 * (months - 1))
+    card = get_supplier_scorecard().scorecard(start=start)
+    tails = get_lead_time_quantiles("supplier").set_index("supplier")
+    feed = get_supplier_financials().join(card[["on_time_delivery", "quality_ppm"]]).join(
+        tails[["p50", "p90"]].rename(columns={"p50": "lead_time_p50", "p90": "lead_time_p90"}))
+    # Only suppliers whose inputs moved since the last call are rescored
+    _SUPPLIER_RISK.update_suppliers(feed)
+    return _SUPPLIER_RISK.scores()
+
+def get_supplier_performance(months=12):
+    """Supplier scorecard metrics over the trailing window"""
+    start = datetime.now() - timedelta(days=30 * (months - 1))
+    card = get_supplier_scorecard().scorecard(start=start)
+    tails = get_lead_time_quantiles("supplier").set_index("supplier")
+    risk = get_supplier_risk(months)
     data = []
     for sup in SUPPLIERS:
+        row = card.loc[sup["id"]]
         data.append({
             **sup,
-            "on_time_delivery": round(random.uniform(0.85, 0.99), 3) * 100,
-            "quality_score": round(random.uniform(0.90, 0.995), 3) * 100,
-            "lead_time_days": random.randint(14, 45),
-            "cost_variance": round(random.uniform(-5, 8), 1),
-            "responsiveness": round(random.uniform(0.80, 0.98), 2) * 100,
-            "risk_score": round(random.uniform(0.1, 0.4), 2),
-            "spend_ytd": random.randint(500000, 5000000),
-            "orders_ytd": random.randint(50, 200),
+            "on_time_delivery": round(row["on_time_delivery"], 1),
+            "quality_score": round(row["quality_score"], 2),
+            "quality_ppm": round(row["quality_ppm"]),
+            "lead_time_days": int(round(row["lead_time_days"])),
+            "lead_time_std": round(row["lead_time_std"], 1),
+            "lead_time_p90": round(tails.loc[sup["id"], "p90"], 1),
+            "cost_variance": round(row["cost_variance"], 1),
+            "responsiveness": round(row["responsiveness"], 1),
+            "risk_score": round(risk.loc[sup["id"], "risk_score"], 2),
+            "spend_ytd": int(row["spend"]),
+            "orders_ytd": int(row["orders"]),
         })
     return pd.DataFrame(data)
 
+def get_supplier_trend(metric="on_time_delivery", months=12):
+    """Monthly scorecard metric per supplier"""
+    start = datetime.now() - timedelta(days=30 * (months - 1))
+    trend = get_supplier_scorecard().trend(metric, start=start)
+    trend.index = [s["name"] for s in SUPPLIERS]
+    return trend
+
+# =============================================================================
+# SAFETY STOCK PLANNING DATA
+# =============================================================================
+
+def get_transfer_days():
+    """Estimate hub-to-warehouse transfer days from great-circle distance"""
+    wh = pd.DataFrame(WAREHOUSES)
+    hub = wh.set_index("id").loc[wh["region"].map(REGIONAL_HUBS)]
+    lat1, lon1 = np.radians(wh["lat"].to_numpy()), np.radians(wh["lon"].to_numpy())
+    lat2, lon2 = np.radians(hub["lat"].to_numpy()), np.radians(hub["lon"].to_numpy())
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    km = 6371 * 2 * np.arcsin(np.sqrt(a))
+    return (2 + km / 1500).round(1)
+
+def get_safety_stock_plan(service_level=0.95, current_weeks=4, history_months=12):
+    """Optimize safety stock across the warehouse network for forecasted SKUs"""
+    history = get_sku_demand_history()[:, -history_months:]
+    stats = pd.DataFrame({"mean": history.mean(axis=1), "std": history.std(axis=1, ddof=1)},
+                         index=[p["sku"] for p in TELIT_PRODUCTS])
+    products = pd.DataFrame(TELIT_PRODUCTS).set_index("sku").loc[stats.index]
+    suppliers = get_supplier_performance().set_index("id")
+    supplier = suppliers.loc[products["category"].map(CATEGORY_SUPPLIER)]
+
+    wh = pd.DataFrame(WAREHOUSES)
+    share = (wh["capacity"] / wh["capacity"].sum()).to_numpy()
+    hub_ids = wh["region"].map(REGIONAL_HUBS)
+    position = {w: i for i, w in enumerate(wh["id"])}
+    hub_of = np.array([-1 if h == w else position[h] for w, h in zip(wh["id"], hub_ids)])
+
+    mean_daily = stats["mean"].to_numpy()[:, None] / 30 * share[None, :]
+    std_daily = stats["std"].to_numpy()[:, None] / np.sqrt(30) * np.sqrt(share[None, :])
+    tails = get_lead_time_quantiles("supplier").set_index("supplier").loc[supplier.index]
+    lead = tails["p50"].to_numpy()
+    # Normal-equivalent spread that reproduces the sketched P90 lead time
+    lead_std = (tails["p90"] - tails["p50"]).to_numpy() / 1.2816
+
+    result = optimize_safety_stock(mean_daily, std_daily, hub_of, get_transfer_days(), lead, lead_std, service_level)
+    current = np.round(result["cover_demand"] * 7 * current_weeks)
+    return safety_stock_plan(list(stats.index), list(wh["id"]), result, current, products["price"].to_numpy() * 0.6)
+
+def get_safety_stock_by_supplier(service_level=0.95):
+    """Safety stock cover per supplier's SKUs: current policy vs optimized, with working-capital change"""
+    plan = get_safety_stock_plan(service_level)
+    category = {p["sku"]: p["category"] for p in TELIT_PRODUCTS}
+    names = {s["id"]: s["name"] for s in SUPPLIERS}
+    supplier = plan["sku"].map(category).map(CATEGORY_SUPPLIER)
+    cover = plan["current_ss"] / plan["current_weeks"].where(plan["current_weeks"] > 0)
+    frame = plan.assign(supplier_id=supplier, weekly_demand=cover).groupby("supplier_id").agg(
+        skus=("sku", "nunique"),
+        current_ss=("current_ss", "sum"),
+        optimized_ss=("optimized_ss", "sum"),
+        weekly_demand=("weekly_demand", "sum"),
+        working_capital_change=("working_capital_change", "sum"),
+    )
+    frame["current_weeks"] = (frame["current_ss"] / frame["weekly_demand"]).round(1)
+    frame["optimized_weeks"] = (frame["optimized_ss"] / frame["weekly_demand"]).round(1)
+    frame.insert(0, "supplier", frame.index.map(names))
+    return frame.drop(columns="weekly_demand").reset_index().sort_values("working_capital_change", ascending=False,
+                                                                          key=abs, ignore_index=True)
+
 # =============================================================================
 # QUALITY CONTROL DATA
 # =============================================================================
 
-def get_quality_metrics():
-    """Generate quality control metrics"""
+# Labour and test time for one rework-and-retest loop (USD)
+REWORK_COST = 4.0
+
+def get_quality_metrics(days=7, line=None):
+    """Quality control metrics from the route yield roll-up.
+
+    The defect rate is first-attempt failures per 100 units started, and the
+    cost of poor quality prices scrap at unit cost (60% of list) plus every
+    rework loop at REWORK_COST.
+    """
+    stations = get_station_yield(days, line)
+    started = max(stations["entered"].iloc[0], 1)
+    retests = (stations["attempts"] - stations["entered"]).sum()
+    scrap_cost = sum(get_station_yield(days, line, p["sku"])["scrapped"].sum() * p["price"] * 0.6
+                     for p in TELIT_PRODUCTS)
     return {
-        "first_pass_yield": 98.7,
-        "defect_rate": 0.8,
-        "scrap_rate": 0.3,
-        "rework_rate": 0.5,
-        "customer_returns": 0.12,
-        "quality_cost": 145000,
+        "rolled_throughput_yield": round(float(stations["rty_cumulative"].iloc[-1]) * 100, 1),
+        "defect_rate": round(float((stations["entered"] - stations["first_pass"]).sum() / started) * 100, 2),
+        "scrap_rate": round(float(stations["scrapped"].sum() / started) * 100, 2),
+        "rework_rate": round(float((stations["passed"] - stations["first_pass"]).sum() / started) * 100, 1),
+        "quality_cost": round(float(scrap_cost + retests * REWORK_COST)),
     }
 
-def get_defect_data():
-    """Generate defect pareto data"""
-    defect_types = [
-        "Solder Bridge", "Missing Component", "Misalignment", "Cold Solder",
-        "Tombstone", "Component Damage", "Wrong Component", "PCB Defect"
-    ]
-    data = []
-    total = 0
-    for i, defect in enumerate(defect_types):
-        count = int(1000 * (0.5 ** (i * 0.7)))
-        total += count
-        data.append({"defect_type": defect, "count": count})
-    
-    cumulative = 0
-    for d in data:
-        cumulative += d["count"]
-        d["cumulative_pct"] = cumulative / total * 100
-    
-    return pd.DataFrame(data)
+# Board outline (width, height in mm) of each module design
+BOARD_DESIGNS = {
+    "xE310 LGA": (15.0, 18.0),
+    "M.2 3052": (30.0, 52.0),
+    "xE910 LGA": (28.2, 28.2),
+    "SE86x LGA": (11.0, 11.0),
+    "WE310 LGA": (15.0, 18.0),
+    "SE920 LGA": (40.5, 40.5),
+}
 
-def get_control_chart_data(days=30):
-    """Generate SPC control chart data"""
-    dates = [datetime.now() - timedelta(days=x) for x in range(days, 0, -1)]
-    mean = 2.5
-    ucl = 3.5
-    lcl = 1.5
-    
-    values = [mean + np.random.normal(0, 0.3) for _ in range(days)]
-    # Add some out-of-control points
-    values[10] = 3.8
-    values[22] = 1.2
-    
-    return pd.DataFrame({
-        "date": dates,
-        "value": values,
-        "mean": [mean] * days,
-        "ucl": [ucl] * days,
-        "lcl": [lcl] * days,
+CATEGORY_DESIGN = {
+    "Cellular LPWA": "xE310 LGA",
+    "Cellular 5G": "M.2 3052",
+    "Cellular LTE": "xE910 LGA",
+    "Positioning": "SE86x LGA",
+    "Wi-Fi & Bluetooth": "WE310 LGA",
+    "Smart Modules": "SE920 LGA",
+}
+
+# Extra solder-bridge calls per hour on SMT Line 2 once its stencil is worn, and how long before
+# the AOI history was first generated the wear set in
+STENCIL_WEAR_CALLS = 10
+STENCIL_WEAR_DAYS = 5
+
+def get_aoi_defect_events(days=30, units_per_hour=300, call_rate=0.05, end=None, wear_since=None):
+    """AOI defect calls with board coordinates for every line over the days before end (default the
+    current hour). Each hour of each line draws from its own seeded generator, so any window reads the
+    same calls; SMT Line 2 adds worn-stencil solder bridges from wear_since (default STENCIL_WEAR_DAYS before end)."""
+    rng = np.random.default_rng(61)
+    design_of = {p["sku"]: CATEGORY_DESIGN[p["category"]] for p in TELIT_PRODUCTS}
+    # Each design has a few hotspots (relative x, y); each defect type favours one of them
+    hotspots = {d: rng.uniform(0.15, 0.85, (3, 2)) for d in BOARD_DESIGNS}
+    type_share = 0.5 ** (np.arange(len(DEFECT_TYPES)) * 0.7)
+    type_share /= type_share.sum()
+    bridge = DEFECT_TYPES.index("Solder Bridge")
+    end = data_hour() if end is None else pd.Timestamp(end).floor("h")
+    wear_since = end - pd.Timedelta(days=STENCIL_WEAR_DAYS) if wear_since is None else pd.Timestamp(wear_since)
+    hour_ns = 3600 * 10**9
+    first = (end - pd.Timedelta(days=days)).value // hour_ns
+    frames = []
+    for i, line in enumerate(PRODUCTION_LINES):
+        options = np.array(LINE_PRODUCTS[line])
+        for hour in range(first, end.value // hour_ns):
+            hrng = np.random.default_rng([61, i, hour])
+            kind = hrng.choice(len(DEFECT_TYPES), hrng.poisson(units_per_hour * call_rate), p=type_share)
+            if line == "SMT Line 2" and hour * hour_ns >= wear_since.value:
+                kind = np.append(kind, np.full(hrng.poisson(STENCIL_WEAR_CALLS), bridge))
+            n = len(kind)
+            products = options[hrng.integers(0, len(options), n)]
+            design = [design_of[p] for p in products]
+            size = np.array([BOARD_DESIGNS[d] for d in design]).reshape(n, 2)
+            spot = np.array([hotspots[d][k % 3] for d, k in zip(design, kind)]).reshape(n, 2)
+            clustered = hrng.random(n) < 0.7
+            rel = np.where(clustered[:, None], spot + hrng.normal(0, 0.06, (n, 2)), hrng.random((n, 2)))
+            rel = np.clip(rel, 0, 0.999)
+            frames.append(pd.DataFrame({
+                "time": (hour * hour_ns + hrng.integers(0, hour_ns, n)).astype("datetime64[ns]"),
+                "line": line, "product": products, "defect_type": np.array(DEFECT_TYPES)[kind],
+                "x_mm": rel[:, 0] * size[:, 0], "y_mm": rel[:, 1] * size[:, 1]}))
+    return pd.concat(frames, ignore_index=True).sort_values("time", ignore_index=True)
+
+# Days of AOI calls the defect aggregator starts from
+DEFECT_HISTORY_DAYS = 30
+
+_DEFECT_AGGREGATORS = {}
+_DEFECT_AGGREGATOR_LOCK = threading.Lock()
+
+def get_defect_aggregator():
+    """Defect aggregator shared by every session: seeded shift by shift with the trailing
+    DEFECT_HISTORY_DAYS of AOI calls, then fed each new hour's calls as the hour rolls over"""
+    end = data_hour()
+    with _DEFECT_AGGREGATOR_LOCK:
+        if "aggregator" not in _DEFECT_AGGREGATORS:
+            _DEFECT_AGGREGATORS.update(
+                aggregator=DefectAggregator(
+                    PRODUCTION_LINES, [p["sku"] for p in TELIT_PRODUCTS],
+                    {p["sku"]: CATEGORY_DESIGN[p["category"]] for p in TELIT_PRODUCTS}, BOARD_DESIGNS,
+                    shift_starts=tuple(SHIFTS.values())),
+                through=end - pd.Timedelta(days=DEFECT_HISTORY_DAYS),
+                wear_since=end - pd.Timedelta(days=STENCIL_WEAR_DAYS))
+        aggregator = _DEFECT_AGGREGATORS["aggregator"]
+        through = _DEFECT_AGGREGATORS["through"]
+        if through < end:
+            events = get_aoi_defect_events((end - through) / pd.Timedelta(days=1), end=end,
+                                           wear_since=_DEFECT_AGGREGATORS["wear_since"])
+            for _, shift_events in events.groupby(aggregator.shift_id(events["time"]), sort=True):
+                aggregator.ingest(shift_events)
+            _DEFECT_AGGREGATORS["through"] = end
+        return aggregator
+
+def _defect_window(days, line, product):
+    end = pd.Timestamp(datetime.now())
+    return {"start": end - pd.Timedelta(days=days), "end": end,
+            "lines": None if line in (None, "All Lines") else line,
+            "products": None if product in (None, "All Products") else product}
+
+def get_defect_data(days=30, line=None, product=None):
+    """Defect Pareto (type, count, cumulative %) for a line and product over the trailing days"""
+    return get_defect_aggregator().pareto(**_defect_window(days, line, product))
+
+def get_defect_trend(days=30, line=None, product=None):
+    """Daily defect totals"""
+    return get_defect_aggregator().trend(**_defect_window(days, line, product))
+
+def get_defect_heatmap(design, days=30, line=None, product=None):
+    """Defect counts by board location for one design"""
+    return get_defect_aggregator().heatmap(design, **_defect_window(days, line, product))
+
+# Measured test parameters with their specification limits
+SPC_PARAMETERS = {
+    "RF Sensitivity": {"unit": "dBm", "target": -107.5, "sigma": 0.3, "lsl": -109.0, "usl": -106.0},
+    "TX Power": {"unit": "dBm", "target": 23.0, "sigma": 0.25, "lsl": 22.0, "usl": 24.0},
+    "Current Draw": {"unit": "mA", "target": 185.0, "sigma": 3.0, "lsl": 170.0, "usl": 200.0},
+    "Solder Paste Height": {"unit": "µm", "target": 120.0, "sigma": 4.0, "lsl": 100.0, "usl": 140.0},
+}
+
+PRODUCTION_LINES = ["SMT Line 1", "SMT Line 2", "Assembly Line"]
+
+RF_PARAMETERS = ["RF Sensitivity", "TX Power", "Current Draw"]
+
+def line_code(line):
+    """Short station prefix for a line, e.g. SMT Line 2 -> SL2"""
+    return "".join(w[0] for w in line.split() if not w.isdigit()) + "".join(filter(str.isdigit, line))
+
+def get_spc_streams(rf_testers=4):
+    """Measurement streams: solder paste inspection on the SMT lines, RF testers on every line"""
+    rows = []
+    for line in PRODUCTION_LINES:
+        code = line_code(line)
+        if line.startswith("SMT"):
+            rows.append({"line": line, "station": f"SPI-{code}", "parameter": "Solder Paste Height"})
+        for k in range(1, rf_testers + 1):
+            rows.extend({"line": line, "station": f"RFT-{code}-{k}", "parameter": p} for p in RF_PARAMETERS)
+    return pd.DataFrame(rows)
+
+def get_spc_measurements(hours=168, subgroup_size=5):
+    """Hourly measurement subgroups per stream as (streams, times, values[stream, hour, unit]):
+    the first units each station measured in each hour, scanned from the test-result store"""
+    store = get_test_store()
+    streams = get_spc_streams()
+    end = pd.Timestamp(datetime.now()).floor("h")
+    times = pd.date_range(end=end - pd.Timedelta(hours=1), periods=hours, freq="h")
+    # Stream number per (station, parameter) code pair
+    dims = (len(store.dictionary("station")), len(store.dictionary("parameter")))
+    station = store.codes("station", streams["station"])
+    parameter = store.codes("parameter", streams["parameter"])
+    known = (station >= 0) & (parameter >= 0)
+    lookup = np.full(max(int(np.prod(dims)), 1), -1, dtype=np.int64)
+    lookup[np.ravel_multi_index((station[known], parameter[known]), dims)] = np.flatnonzero(known)
+    values = np.full((len(streams), hours, subgroup_size), np.nan)
+    taken = np.zeros(len(streams) * hours, dtype=np.int64)
+    for chunk in store.scan(["time", "station", "parameter", "value"], times[0], end - pd.Timedelta(1, unit="ns")):
+        stream = lookup[np.ravel_multi_index((chunk["station"].astype(np.int64), chunk["parameter"].astype(np.int64)),
+                                             dims)]
+        hour = (chunk["time"] - times[0].value) // (3600 * 10**9)
+        ok = stream >= 0
+        key = stream[ok] * hours + hour[ok]
+        # Rank of each measurement within its stream-hour (rows are time-ordered), after earlier chunks
+        order = np.argsort(key, kind="stable")
+        k = key[order]
+        starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+        rank = np.arange(len(k)) - np.repeat(starts, np.diff(np.r_[starts, len(k)])) + taken[k]
+        keep = rank < subgroup_size
+        values.reshape(-1, subgroup_size)[k[keep], rank[keep]] = chunk["value"][ok][order][keep]
+        taken += np.bincount(key, minlength=len(taken))
+    return streams, times, values
+
+# Shifts by starting hour
+SHIFTS = {"Day": 6, "Swing": 14, "Night": 22}
+
+# Products built on each line
+LINE_PRODUCTS = {
+    "SMT Line 1": ["ME310G1-W1", "ME310G1-WW", "NE310H2-W1", "LE910C4-NF", "LE910C1-NA", "SE868K3-A"],
+    "SMT Line 2": ["FN990A28-WW", "FN990A40-WW", "FN980-NA", "LM960A18", "SE873Q5-A", "SE869K5-DR"],
+    "Assembly Line": ["WE310F5", "WE310F6", "BlueMod+S50", "SE920A9"],
+}
+
+def shift_of(hours):
+    """Shift name for each hour of day"""
+    starts = np.array(list(SHIFTS.values()))
+    names = np.array(list(SHIFTS))
+    return names[(np.searchsorted(starts, np.asarray(hours), side="right") - 1) % len(starts)]
+
+_TEST_RECORDS = {}
+
+def get_test_records(days=30, rf_testers=4):
+    """Per-unit test measurements for every line, station and parameter (time-ordered, categorical).
+
+    Units and serials are the genealogy's: paste height is measured as a unit
+    leaves SMT and the RF parameters at RF calibration, at the route's offsets.
+    """
+    end = pd.Timestamp(datetime.now()).floor("h")
+    key = (days, rf_testers, end)
+    if key in _TEST_RECORDS:
+        return _TEST_RECORDS[key]
+    rng = np.random.default_rng(59)
+    start = end - pd.Timedelta(days=days)
+    offset = dict(zip(PROCESS_ROUTE, STATION_OFFSET_MIN))
+    frames = []
+    # A day's margin picks up units started before the window but tested inside it
+    for line, units in get_production_units(days + 1).items():
+        code = line_code(line)
+        n = len(units)
+        products = LINE_PRODUCTS[line]
+        product = pd.Index(products).get_indexer(units["product"])
+        tester = rng.integers(0, rf_testers, n)
+        testers = np.array([f"RFT-{code}-{k + 1}" for k in range(rf_testers)])
+        params = list(RF_PARAMETERS) + (["Solder Paste Height"] if line.startswith("SMT") else [])
+        for param in params:
+            spec = SPC_PARAMETERS[param]
+            station_name = "SMT" if param == "Solder Paste Height" else "RF Calibration"
+            time = units["started"].to_numpy() + offset[station_name] * 60 * 10**9
+            night = np.isin(time // (3600 * 10**9) % 24, [22, 23, 0, 1, 2, 3, 4, 5])
+            age_h = (end.value - time) / 3.6e12
+            # Per-product and per-station offsets, night shift a little noisier
+            prod_bias = rng.normal(0, 0.4, len(products)) * spec["sigma"]
+            noise = rng.normal(0, 1, n) * spec["sigma"] * np.where(night, 1.15, 1.0)
+            if param == "Current Draw":
+                # Supply current is right-skewed rather than normal
+                noise = (rng.lognormal(0, 0.35, n) - np.exp(0.35 ** 2 / 2)) / 0.37 * spec["sigma"]
+            if param == "Solder Paste Height":
+                station = np.full(n, f"SPI-{code}")
+                station_bias = rng.normal(0, 0.3) * spec["sigma"]
+            else:
+                station = testers[tester]
+                station_bias = rng.normal(0, 0.3, rf_testers)[tester] * spec["sigma"]
+            # Process upsets: RF calibration drift on one SMT Line 2 tester over the last two days,
+            # a paste-height step on SMT Line 1 and a noisy current-draw tester on the Assembly Line
+            if line == "SMT Line 2" and param == "RF Sensitivity":
+                noise = noise + np.where(tester == 0, np.clip(48 - age_h, 0, None) / 48 * 2.5 * spec["sigma"], 0)
+            if line == "SMT Line 1" and param == "Solder Paste Height":
+                noise = noise + np.where(age_h < 30, 2 * spec["sigma"], 0)
+            if line == "Assembly Line" and param == "Current Draw":
+                noise = noise * np.where((tester == 2) & (age_h < 60), 1.8, 1.0)
+            value = spec["target"] + prod_bias[product] + station_bias + noise
+            keep = (time >= start.value) & (time < end.value)
+            frames.append(pd.DataFrame({
+                "time": time[keep].astype("datetime64[ns]"),
+                "serial": units["serial"].to_numpy()[keep],
+                "line": line,
+                "station": station[keep],
+                "product": units["product"].to_numpy()[keep],
+                "parameter": param,
+                "value": value[keep],
+                "lsl": spec["lsl"],
+                "usl": spec["usl"],
+            }))
+    records = pd.concat(frames, ignore_index=True).sort_values("time", kind="stable", ignore_index=True)
+    records["shift"] = shift_of(records["time"].dt.hour)
+    for col in ["line", "station", "product", "parameter", "shift"]:
+        records[col] = records[col].astype("category")
+    # Only the latest hour's records are kept
+    _TEST_RECORDS.clear()
+    _TEST_RECORDS[key] = records
+    return records
+
+# Test-result store location (column files are memory-mapped from here)
+TEST_STORE_DIR = os.environ.get("TELIT_TEST_STORE", os.path.join(tempfile.gettempdir(), "telit-test-results"))
+
+SERIAL_PREFIX = "TC"
+
+def format_serial(serial):
+    return f"{SERIAL_PREFIX}{int(serial):09d}"
+
+def parse_serial(text):
+    """Unit number from a serial such as TC000012345 (None if malformed)"""
+    digits = str(text).strip().upper().removeprefix(SERIAL_PREFIX)
+    return int(digits) if digits.isdigit() else None
+
+def data_hour():
+    """Hour the generated shop-floor data runs up to"""
+    return pd.Timestamp(datetime.now()).floor("h")
+
+_TEST_STORES = {}
+_TEST_STORE_LOCK = threading.Lock()
+
+def get_test_store():
+    """Columnar test-result store, reloaded from the generated test records when the hour rolls over"""
+    with _TEST_STORE_LOCK:
+        if "store" not in _TEST_STORES:
+            _TEST_STORES["store"] = TestResultStore(TEST_STORE_DIR)
+        store = _TEST_STORES["store"]
+        source = f"generated through {data_hour()}"
+        if store.attrs.get("source") != source:
+            store.clear()
+            records = get_test_records()
+            for lo in range(0, len(records), 500_000):
+                store.append(records.iloc[lo:lo + 500_000])
+            store.set_attrs(source=source)
+        return store
+
+def get_test_summary(by=("station", "parameter"), days=7, **filters):
+    """Tested, failed and pass rate per group over the trailing days"""
+    end = pd.Timestamp(datetime.now()).floor("h")
+    return get_test_store().summary(by, end - pd.Timedelta(days=days), end, **filters)
+
+def get_unit_test_results(serial):
+    """Every measurement recorded for one unit"""
+    unit = parse_serial(serial)
+    if unit is None:
+        return pd.DataFrame()
+    return get_test_store().frame(["time", "line", "station", "parameter", "value", "lsl", "usl", "passed"],
+                                  serial=unit)
+
+_CAPABILITY = {}
+
+def get_capability(days=7, by=CAPABILITY_GROUPS):
+    """Capability table and pre-binned histograms over the trailing days of test results"""
+    store = get_test_store()
+    # The service reads the store's memory maps, so it is rebuilt whenever the store is reloaded
+    if _CAPABILITY.get("source") != store.attrs["source"]:
+        _CAPABILITY["service"] = CapabilityService.from_store(store)
+        _CAPABILITY["source"] = store.attrs["source"]
+    end = pd.Timestamp(datetime.now()).floor("h")
+    return _CAPABILITY["service"].compute(end - pd.Timedelta(days=days), end, by)
+
+_SPC_MONITORS = {}
+
+def get_spc_monitor(subgroup_size=5):
+    """SPC monitor fed hour by hour from every stream (subgroup_size 1 charts individual units),
+    rebuilt whenever the test-result store is reloaded"""
+    source = get_test_store().attrs["source"]
+    if _SPC_MONITORS.get("source") != source:
+        _SPC_MONITORS.clear()
+        _SPC_MONITORS["source"] = source
+    if subgroup_size not in _SPC_MONITORS:
+        streams, times, values = get_spc_measurements()
+        monitor = SpcMonitor(streams, subgroup_size=subgroup_size, window=25 if subgroup_size > 1 else 50)
+        everyone = np.arange(len(streams))
+        units = values.shape[2]
+        for h, hour in enumerate(times):
+            if subgroup_size == 1:
+                for u in range(units):
+                    monitor.ingest(everyone, values[:, h, u], hour + pd.Timedelta(minutes=60 * u // units))
+            else:
+                monitor.ingest(everyone, values[:, h, :subgroup_size], hour)
+        _SPC_MONITORS[subgroup_size] = monitor
+    return _SPC_MONITORS[subgroup_size]
+
+# First-attempt pass rate per route station, and the chance a retest passes by attempt
+STATION_FPY = {
+    "SMT": 0.998, "Reflow": 0.999, "AOI": 0.99, "Programming": 0.998,
+    "RF Calibration": 0.985, "Functional Test": 0.993, "Final QC": 0.999,
+}
+RETEST_PASS = (0.75, 0.6)
+
+# Minutes from a unit's SMT start to each station
+STATION_OFFSET_MIN = (0, 8, 20, 45, 70, 95, 130)
+
+# Longest a unit spends on the route, retests and rework included
+ROUTE_SPAN = pd.Timedelta(days=1)
+
+def _line_station_fpy():
+    """First-attempt pass rate per (line, route station)"""
+    fpy = {}
+    for i, line in enumerate(PRODUCTION_LINES):
+        rng = np.random.default_rng([67, i])
+        for station in PROCESS_ROUTE:
+            # Lines differ a little; SMT Line 2's worn stencil shows up at AOI
+            fpy[line, station] = STATION_FPY[station] * rng.uniform(0.997, 1.0)
+            if line == "SMT Line 2" and station == "AOI":
+                fpy[line, station] -= 0.01
+    return fpy
+
+def get_lot_route_events(lots):
+    """Unit-level test events along the process route for every unit of the given genealogy lots
+    (time-ordered, categorical). Each lot draws from a generator seeded by its first serial, so a
+    unit's history is the same whichever window it is read through."""
+    step = 3600 * 10**9 // UNITS_PER_HOUR
+    fpy = _line_station_fpy()
+    cols = {k: [np.empty(0, dtype=d)] for k, d in
+            [("time", np.int64), ("serial", np.int64), ("line", object), ("product", object),
+             ("station", object), ("result", object)]}
+    for lot in lots.itertuples(index=False):
+        rng = np.random.default_rng([67, lot.serial_first])
+        t0 = pd.Timestamp(lot.produced).value + np.arange(lot.quantity) * step
+        alive = np.ones(lot.quantity, dtype=bool)
+        for station, offset in zip(PROCESS_ROUTE, STATION_OFFSET_MIN):
+            units = np.flatnonzero(alive)
+            t = t0[units] + offset * 60 * 10**9
+            passed = rng.random(len(units)) < fpy[lot.line, station]
+            rows = [(units, t, np.where(passed, "pass", "fail"))]
+            pending = units[~passed]
+            t_retry = t[~passed]
+            for p in RETEST_PASS:
+                # Rework and retest within a few hours
+                t_retry = t_retry + rng.integers(20, 240, len(pending)) * 60 * 10**9
+                ok = rng.random(len(pending)) < p
+                rows.append((pending, t_retry, np.where(ok, "pass", "fail")))
+                pending, t_retry = pending[~ok], t_retry[~ok]
+            rows.append((pending, t_retry + 30 * 60 * 10**9, np.full(len(pending), "scrap")))
+            alive[pending] = False
+            idx = np.concatenate([r[0] for r in rows])
+            cols["time"].append(np.concatenate([r[1] for r in rows]))
+            cols["serial"].append(lot.serial_first + idx)
+            cols["line"].append(np.full(len(idx), lot.line, dtype=object))
+            cols["product"].append(np.full(len(idx), lot.product, dtype=object))
+            cols["station"].append(np.full(len(idx), station, dtype=object))
+            cols["result"].append(np.concatenate([r[2] for r in rows]).astype(object))
+    events = pd.DataFrame({k: np.concatenate(v) for k, v in cols.items()})
+    events["time"] = events["time"].to_numpy().astype("datetime64[ns]")
+    events = events.sort_values("time", kind="stable", ignore_index=True)
+    for col in ["line", "product", "station", "result"]:
+        events[col] = events[col].astype("category")
+    return events
+
+def _route_events(units_from, start, end):
+    """Route events timed in [start, end) of the genealogy units started from units_from"""
+    lots = get_genealogy_store().lots
+    step = 3600 * 10**9 // UNITS_PER_HOUR
+    began = lots["produced"].to_numpy().astype("datetime64[ns]").astype(np.int64)
+    qty = lots["quantity"].to_numpy()
+    lo = max(units_from, start - ROUTE_SPAN).value
+    live = lots[(began + qty * step > lo) & (began < end.value)]
+    events = get_lot_route_events(live)
+    # Serials run in lot order, so each event's lot is found by its serial
+    first = live["serial_first"].to_numpy()
+    serial = events["serial"].to_numpy()
+    k = np.searchsorted(first, serial, side="right") - 1
+    started = live["produced"].to_numpy().astype("datetime64[ns]").astype(np.int64)[k] + (serial - first[k]) * step
+    time = events["time"].to_numpy().astype("datetime64[ns]").astype(np.int64)
+    keep = (started >= units_from.value) & (time >= start.value) & (time < end.value)
+    return events[keep].reset_index(drop=True)
+
+_ROUTE_EVENTS = {}
+_ROUTE_EVENTS_LOCK = threading.Lock()
+
+def get_route_events(days=30):
+    """Route events of the genealogy's units started over the trailing days, up to the current hour
+    (cached per hour, shared by every session)"""
+    end = data_hour()
+    with _ROUTE_EVENTS_LOCK:
+        if _ROUTE_EVENTS.get("hour") != end:
+            _ROUTE_EVENTS.clear()
+            _ROUTE_EVENTS["hour"] = end
+        if days not in _ROUTE_EVENTS:
+            start = end - pd.Timedelta(days=days)
+            _ROUTE_EVENTS[days] = _route_events(start, start, end)
+        return _ROUTE_EVENTS[days]
+
+# Days of route events the yield roll-up starts from
+YIELD_HISTORY_DAYS = 30
+
+_YIELD_ROLLUPS = {}
+_YIELD_ROLLUP_LOCK = threading.Lock()
+
+def get_yield_rollup():
+    """Yield roll-up shared by every session: seeded with the trailing YIELD_HISTORY_DAYS of route
+    events, then fed the events of each new hour, day by day, as the hour rolls over"""
+    end = data_hour()
+    with _YIELD_ROLLUP_LOCK:
+        if "rollup" not in _YIELD_ROLLUPS:
+            origin = end - pd.Timedelta(days=YIELD_HISTORY_DAYS)
+            _YIELD_ROLLUPS.update(rollup=YieldRollup(PRODUCTION_LINES, [p["sku"] for p in TELIT_PRODUCTS]),
+                                  origin=origin, through=origin)
+        rollup = _YIELD_ROLLUPS["rollup"]
+        if _YIELD_ROLLUPS["through"] < end:
+            events = _route_events(_YIELD_ROLLUPS["origin"], _YIELD_ROLLUPS["through"], end)
+            day = events["time"].to_numpy().astype("datetime64[D]")
+            bounds = np.flatnonzero(np.r_[True, day[1:] != day[:-1], True])
+            for lo, hi in zip(bounds[:-1], bounds[1:]):
+                rollup.ingest(events.iloc[lo:hi])
+            _YIELD_ROLLUPS["through"] = end
+        return rollup
+
+def _yield_window(days, line, product):
+    end = pd.Timestamp(datetime.now())
+    return {"start": end - pd.Timedelta(days=days), "end": end,
+            "lines": None if line in (None, "All Lines") else line,
+            "products": None if product in (None, "All Products") else product}
+
+def get_station_yield(days=7, line=None, product=None):
+    """FPY, final yield, rework and cumulative RTY per route station"""
+    return get_yield_rollup().station_yield(**_yield_window(days, line, product))
+
+def get_yield_trend(days=30, line=None, product=None, by_line=True):
+    """Daily rolled throughput yield per line"""
+    return get_yield_rollup().trend(**_yield_window(days, line, product), by_line=by_line)
+
+# NCR/CAPA database location
+NCR_DB_PATH = os.environ.get("TELIT_NCR_DB", os.path.join(tempfile.gettempdir(), "telit-ncr.sqlite"))
+
+NCR_ISSUES = {
+    "Equipment": ["RF tester drift", "Placement nozzle wear", "Reflow zone out of profile", "Stencil damage"],
+    "Material/Supplier": ["Component out of tolerance", "Wrong part shipped", "Moisture-sensitive exposure",
+                          "PCB plating defect", "Counterfeit suspect"],
+    "Method/Process": ["Solder void >5%", "Solder bridge cluster", "Underfill incomplete", "Firmware load failure"],
+    "Operator": ["Handling damage", "ESD damage", "Wrong revision loaded"],
+    "Design": ["RF sensitivity OOS", "TX power drift", "Thermal margin low"],
+    "Measurement": ["Fixture contact issue", "Calibration expired", "Golden unit out of spec"],
+}
+NCR_DISPOSITIONS = ["Rework", "Scrap", "Use As-Is", "Return to Supplier", "Engineering Eval"]
+NCR_OWNERS = ["Quality Eng", "RF Eng", "Process Eng", "Supplier Quality", "Prod Mgr"]
+CAPA_ACTIONS = {
+    "Equipment": "Preventive maintenance interval revised",
+    "Material/Supplier": "Supplier corrective action request",
+    "Method/Process": "Process window re-validated",
+    "Operator": "Training and work instruction update",
+    "Design": "Design change request",
+    "Measurement": "Calibration and MSA refresh",
+}
+
+def get_ncr_history(years=5, per_day=22):
+    """Historical NCRs and the CAPAs raised from them (plus audit and customer CAPAs)"""
+    rng = np.random.default_rng(71)
+    now = pd.Timestamp(datetime.now()).normalize()
+    n = int(years * 365 * per_day)
+    # Volume grows with production over the years
+    opened = now - pd.to_timedelta(np.sort(years * 365 * (1 - np.sqrt(rng.random(n))))[::-1].round(), unit="D")
+    causes = list(NCR_ISSUES)
+    cause = np.array(causes)[rng.choice(len(causes), n, p=[0.18, 0.3, 0.24, 0.1, 0.08, 0.1])]
+    issue = np.array([NCR_ISSUES[c][k % len(NCR_ISSUES[c])] for c, k in zip(cause, rng.integers(0, 100, n))])
+    supplier_caused = cause == "Material/Supplier"
+    supplier_ids = np.array([s["id"] for s in SUPPLIERS])
+    skus = np.array([p["sku"] for p in TELIT_PRODUCTS])
+    closure = rng.gamma(2.0, 7.0, n).round() + 1
+    closed = opened + pd.to_timedelta(closure, unit="D")
+    is_open = closed > now
+    status = np.where(is_open, np.array(["Open", "MRB Review", "In Progress"])[rng.integers(0, 3, n)], "Closed")
+    seq = pd.Series(np.ones(n, dtype=np.int64)).groupby(opened.year.to_numpy()).cumsum().to_numpy()
+    ncr = pd.DataFrame({
+        "ncr_id": [f"NCR-{y}-{k:05d}" for y, k in zip(opened.year, seq)],
+        "opened": opened,
+        "product": skus[rng.integers(0, len(skus), n)],
+        "supplier_id": np.where(supplier_caused, supplier_ids[rng.integers(0, len(supplier_ids), n)], None),
+        "line": np.where(supplier_caused, "Incoming Inspection",
+                         np.array(PRODUCTION_LINES)[rng.integers(0, len(PRODUCTION_LINES), n)]),
+        "issue": issue,
+        "root_cause": cause,
+        "qty_affected": np.ceil(rng.lognormal(4, 1.2, n)).astype(np.int64),
+        "disposition": np.where(supplier_caused & (rng.random(n) < 0.6), "Return to Supplier",
+                                np.array(NCR_DISPOSITIONS)[rng.integers(0, len(NCR_DISPOSITIONS), n)]),
+        "owner": np.where(supplier_caused, "Supplier Quality", np.array(NCR_OWNERS)[rng.integers(0, 4, n)]),
+        "status": status,
+        "due_date": opened + pd.Timedelta(days=30),
+        "closed": closed.where(~is_open),
+    })
+
+    # Larger or repeat issues get a CAPA; audits and customer complaints raise a few more
+    raised = np.flatnonzero((ncr["qty_affected"].to_numpy() > 150) | (rng.random(n) < 0.08))
+    c_opened = ncr["opened"].iloc[raised] + pd.to_timedelta(rng.integers(1, 10, len(raised)), unit="D")
+    raised, c_opened = raised[c_opened <= now], c_opened[c_opened <= now].reset_index(drop=True)
+    m = len(raised)
+    base = ncr.iloc[raised].reset_index(drop=True)
+    c_closure = rng.gamma(3.0, 12.0, m).round() + 7
+    c_closed = c_opened + pd.to_timedelta(c_closure, unit="D")
+    c_open = c_closed > now
+    c_seq = pd.Series(np.ones(m, dtype=np.int64)).groupby(c_opened.dt.year.to_numpy()).cumsum().to_numpy()
+    source = np.where(rng.random(m) < 0.85, base["ncr_id"], np.array(["Audit", "Customer"])[rng.integers(0, 2, m)])
+    capa = pd.DataFrame({
+        "capa_id": [f"CAPA-{y}-{k:04d}" for y, k in zip(c_opened.dt.year, c_seq)],
+        "ncr_id": np.where(source == base["ncr_id"], base["ncr_id"], None),
+        "opened": c_opened,
+        "source": np.where(source == base["ncr_id"], "NCR", source),
+        "product": base["product"],
+        "supplier_id": base["supplier_id"],
+        "issue": base["issue"],
+        "root_cause": base["root_cause"],
+        "action": base["root_cause"].map(CAPA_ACTIONS),
+        "owner": base["owner"],
+        "status": np.where(c_open, np.array(["Open", "In Progress", "Verify"])[rng.integers(0, 3, m)], "Closed"),
+        "due_date": c_opened + pd.Timedelta(days=60),
+        "closed": c_closed.where(~c_open),
+        "effectiveness": np.where(c_open, np.nan, np.clip(rng.normal(92, 6, m), 60, 100).round()),
     })
+    return ncr, capa
+
+# Incoming-inspection AQL (% defective) by supplier category; anything else uses 1.0
+CATEGORY_AQL = {"Chipsets": 0.65, "Modems": 0.65, "RF Components": 1.0, "Memory": 1.0, "Passives": 1.5,
+                "Connectors": 1.5, "Inductors": 1.5, "Resistors": 1.5}
+
+def get_incoming_lots(days=None):
+    """Received PO lines as inspection lots, with the defective units each lot really contains"""
+    po_lines, receipts = get_po_history()
+    lines = po_lines.set_index("po_line_id").loc[receipts["po_line_id"]]
+    lots = pd.DataFrame({
+        "lot_id": receipts["po_line_id"].str.replace("PO-", "LOT-", regex=False).to_numpy(),
+        "receipt_date": receipts["receipt_date"].to_numpy(),
+        "supplier_id": lines["supplier_id"].to_numpy(),
+        "part": lines["part"].to_numpy(),
+        "lot_size": receipts["quantity_received"].to_numpy(),
+        "defective": receipts["quantity_rejected"].to_numpy(),
+    }).sort_values(["receipt_date", "lot_id"], ignore_index=True)
+    if days is not None:
+        lots = lots[lots["receipt_date"] >= pd.Timestamp(datetime.now().date()) - pd.Timedelta(days=days)]
+    return lots
+
+# Days a held supplier-part waits on its corrective action before it is released back to tightened
+HOLD_RELEASE_DAYS = 30
+
+_INSPECTION = {}
+
+def get_inspection_planner():
+    """Inspection planner replayed day by day over the receiving history (built once per session)"""
+    if "planner" not in _INSPECTION:
+        rng = np.random.default_rng(73)
+        planner = InspectionPlanner()
+        lots = get_incoming_lots()
+        category = {s["id"]: s["category"] for s in SUPPLIERS}
+        keys = lots[["supplier_id", "part"]].drop_duplicates()
+        planner.set_aql(keys["supplier_id"], keys["part"],
+                        keys["supplier_id"].map(category).map(CATEGORY_AQL).fillna(1.0).to_numpy())
+        today = pd.Timestamp(datetime.now().date())
+        history = lots[lots["receipt_date"] < today].reset_index(drop=True)
+        rows = planner.rows(history["supplier_id"], history["part"])
+        lot_size, defective = history["lot_size"].to_numpy(), history["defective"].to_numpy()
+        days = history["receipt_date"].to_numpy()
+        bounds = np.flatnonzero(np.r_[True, days[1:] != days[:-1], True])
+        held_since = {}
+        judged = {col: np.zeros(len(history), dtype=dtype) for col, dtype in
+                  [("level", np.int64), ("aql", np.float64), ("sample_size", np.int64), ("accept_number", np.int64),
+                   ("skipped", bool), ("defects_found", np.int64), ("accepted", bool)]}
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            plans = planner.sample_plans(rows[lo:hi], lot_size[lo:hi])
+            found = rng.hypergeometric(defective[lo:hi], lot_size[lo:hi] - defective[lo:hi], plans["sample_size"])
+            judged["accepted"][lo:hi] = planner.judge(rows[lo:hi], lot_size[lo:hi], plans, found)
+            judged["defects_found"][lo:hi] = found
+            for col, values in plans.items():
+                judged[col][lo:hi] = values
+            # Held sources come back once their corrective action has had time to be verified
+            day = days[lo]
+            held = set(np.flatnonzero(planner.level == INSPECTION_LEVELS.index("hold")))
+            held_since = {k: held_since.get(k, day) for k in held}
+            due = [k for k, since in held_since.items() if day - since >= np.timedelta64(HOLD_RELEASE_DAYS, "D")]
+            if due:
+                planner.release(planner.keys.get_level_values(0)[due], planner.keys.get_level_values(1)[due])
+        judged["level"] = np.asarray(INSPECTION_LEVELS)[judged["level"]]
+        _INSPECTION["planner"] = planner
+        _INSPECTION["results"] = history.assign(**judged)
+    return _INSPECTION["planner"]
+
+def get_inspection_results(days=30):
+    """Judged lots over the trailing days"""
+    get_inspection_planner()
+    results = _INSPECTION["results"]
+    return results[results["receipt_date"] >= pd.Timestamp(datetime.now().date()) - pd.Timedelta(days=days)]
+
+def get_inspection_queue():
+    """Today's receipts with the sampling plan each needs"""
+    planner = get_inspection_planner()
+    lots = get_incoming_lots(days=0)
+    return planner.plan(lots.drop(columns=["defective"]))
+
+_NCR_STORES = {}
+_NCR_STORE_LOCK = threading.Lock()
+
+def get_ncr_store():
+    """NCR/CAPA database, reloaded from the generated history when the day rolls over"""
+    with _NCR_STORE_LOCK:
+        if "store" not in _NCR_STORES:
+            _NCR_STORES["store"] = NcrStore(NCR_DB_PATH)
+        store = _NCR_STORES["store"]
+        source = f"generated through {pd.Timestamp(datetime.now()).normalize():%Y-%m-%d}"
+        if store.get_attr("source") != source:
+            store.clear()
+            ncr, capa = get_ncr_history()
+            store.add_ncrs(ncr)
+            store.add_capas(capa)
+            store.set_attr("source", source)
+        return store
 
 # =============================================================================
 # LOGISTICS DATA
@@ -350,47 +1662,254 @@ def get_delivery_kpis():
 # COMPONENT TRACEABILITY DATA
 # =============================================================================
 
-def get_component_genealogy(batch_id="BATCH-2024-001"):
-    """Generate component genealogy tree data"""
+# Units of each supplier's part fitted per module
+BOM_QUANTITY = {"SUP-001": 1, "SUP-002": 1, "SUP-003": 40, "SUP-004": 1, "SUP-005": 3, "SUP-006": 6,
+                "SUP-007": 25, "SUP-008": 1}
+
+# Lookup types offered on the traceability page -> genealogy identifier kinds
+TRACE_SEARCH_TYPES = {
+    "Serial Number": "serial",
+    "Lot ID": "lot",
+    "Work Order": "work_order",
+    "Customer PO": "customer_po",
+    "Shipment": "shipment",
+    "Component Lot": "component_lot",
+    "Supplier Lot": "supplier_lot",
+}
+
+def get_product_bom():
+    """Part number used from each supplier in each product (one part per supplier)"""
+    rng = np.random.default_rng(79)
+    return {p["sku"]: {f"{s['category'][:4].upper()}-{s['id'][-3:]}-{k:02d}": BOM_QUANTITY[s["id"]]
+                       for s, k in zip(SUPPLIERS, rng.integers(0, 6, len(SUPPLIERS)))}
+            for p in TELIT_PRODUCTS}
+
+# Every line builds modules continuously at this rate, from a fixed start so that the lot
+# schedule (and with it every serial) only ever grows forward
+UNITS_PER_HOUR = 300
+PRODUCTION_START = pd.Timestamp("2021-11-15")
+
+# Lots drawn at a time when extending a line's schedule
+SCHEDULE_BLOCK = 1024
+
+def get_lot_schedule(until):
+    """Module lots started before until: each line runs lots back to back from PRODUCTION_START,
+    and serials are allocated in order of lot start, one contiguous range per lot.
+
+    Each line draws from its own seeded generator in fixed-size blocks, so a
+    later until only appends lots and never renumbers earlier ones.
+    """
+    until = pd.Timestamp(until).value
+    step = 3600 * 10**9 // UNITS_PER_HOUR
+    frames = []
+    for i, line in enumerate(PRODUCTION_LINES):
+        rng = np.random.default_rng([83, i])
+        options = np.array(LINE_PRODUCTS[line])
+        quantity, product = [], []
+        while PRODUCTION_START.value + sum(q.sum() for q in quantity) * step < until:
+            quantity.append(rng.integers(4, 21, SCHEDULE_BLOCK) * 500)
+            product.append(options[rng.integers(0, len(options), SCHEDULE_BLOCK)])
+        quantity = np.concatenate(quantity)
+        started = PRODUCTION_START.value + (np.cumsum(quantity) - quantity) * step
+        keep = started < until
+        frames.append(pd.DataFrame({"product": np.concatenate(product)[keep], "line": line,
+                                    "started": started[keep], "quantity": quantity[keep]}))
+    lots = pd.concat(frames).sort_values("started", kind="stable", ignore_index=True)
+    produced = pd.DatetimeIndex(lots.pop("started").to_numpy().astype("datetime64[ns]"))
+    day = produced.normalize()
+    lots.insert(0, "lot_id", [f"ML{d:%y%m%d}-{k:03d}" for d, k in
+                              zip(day, pd.Series(day).groupby(day).cumcount() + 1)])
+    lots.insert(1, "work_order", [f"WO-{i + 100000:07d}" for i in range(len(lots))])
+    lots.insert(4, "produced", produced)
+    lots["serial_first"] = np.cumsum(lots["quantity"].to_numpy()) - lots["quantity"].to_numpy()
+    return lots
+
+def get_genealogy_data(until=None):
+    """Module lots started before until (default now), component lots, lot consumption and shipment lines.
+
+    Every random draw indexed by lot comes from its own generator, so lots
+    keep their consumption and shipments when the history is extended.
+    """
+    today = pd.Timestamp(datetime.now().date())
+    incoming = get_incoming_lots()
+    names = {s["id"]: s["name"] for s in SUPPLIERS}
+    seq = incoming.groupby(["supplier_id", incoming["receipt_date"].dt.year]).cumcount() + 1
+    components = pd.DataFrame({
+        "component_lot": incoming["lot_id"].to_numpy(),
+        "part": incoming["part"].to_numpy(),
+        "supplier_id": incoming["supplier_id"].to_numpy(),
+        "supplier": incoming["supplier_id"].map(names).to_numpy(),
+        "supplier_lot": [f"{names[s][:2].upper()}{y % 100:02d}-{k:05d}" for s, y, k in
+                         zip(incoming["supplier_id"], incoming["receipt_date"].dt.year, seq)],
+        "po_line_id": incoming["lot_id"].str.replace("LOT-", "PO-", regex=False).to_numpy(),
+        "received": incoming["receipt_date"].to_numpy(),
+        "lot_size": incoming["lot_size"].to_numpy(),
+    })
+
+    lots = get_lot_schedule(until if until is not None else datetime.now())
+    n = len(lots)
+    product = lots["product"].to_numpy()
+    produced = pd.DatetimeIndex(lots["produced"])
+    day = produced.normalize()
+    quantity = lots["quantity"].to_numpy()
+    serial_first = lots["serial_first"].to_numpy()
+
+    # Each lot draws every BOM part from the latest lot received at least two days earlier,
+    # and about a quarter of the time finishes off the lot before it too
+    bom = get_product_bom()
+    split_draw = np.random.default_rng([83, 11]).random((n, len(SUPPLIERS)))
+    edges = []
+    by_part = {part: grp.sort_values("received") for part, grp in components.reset_index().groupby("part")}
+    for sku, parts in bom.items():
+        rows = np.flatnonzero(product == sku)
+        for k, (part, per_unit) in enumerate(parts.items()):
+            received = by_part[part]
+            pos = np.searchsorted(received["received"].to_numpy(), produced[rows] - pd.Timedelta(days=2), side="right") - 1
+            ok = pos >= 0
+            need = quantity[rows][ok] * per_unit
+            split = (split_draw[rows[ok], k] < 0.25) & (pos[ok] > 0)
+            lot_ids = lots["lot_id"].to_numpy()[rows][ok]
+            comp = received["component_lot"].to_numpy()
+            edges.append(pd.DataFrame({"lot_id": lot_ids, "component_lot": comp[pos[ok]],
+                                       "quantity": np.where(split, need // 2, need)}))
+            edges.append(pd.DataFrame({"lot_id": lot_ids[split], "component_lot": comp[pos[ok][split] - 1],
+                                       "quantity": need[split] - need[split] // 2}))
+    consumption = pd.concat(edges, ignore_index=True)
+
+    # Lots ship in one to three consignments; each customer raises one PO per month
+    parts = np.random.default_rng([83, 12]).integers(1, 4, n)
+    line_lot = np.repeat(np.arange(n), parts)
+    j = np.arange(len(line_lot)) - np.repeat(np.cumsum(parts) - parts, parts)
+    size = quantity[line_lot] // parts[line_lot]
+    line_qty = np.where(j == parts[line_lot] - 1, quantity[line_lot] - size * (parts[line_lot] - 1), size)
+    shipped = day[line_lot] + pd.to_timedelta(np.random.default_rng([83, 13]).integers(3, 15, len(line_lot)) + j * 7,
+                                              unit="D")
+    customer = np.random.default_rng([83, 14]).integers(0, len(CUSTOMERS), len(line_lot))
+    shipments = pd.DataFrame({
+        "shipment_id": [f"SHP-{i + 1:07d}" for i in range(len(line_lot))],
+        "lot_id": lots["lot_id"].to_numpy()[line_lot],
+        "serial_first": serial_first[line_lot] + j * size,
+        "quantity": line_qty,
+        "shipped": shipped,
+        "customer": np.array(CUSTOMERS)[customer],
+        "customer_po": [f"45{c:02d}{d:%y%m}" for c, d in zip(customer, shipped)],
+    })[shipped <= today]
+    return lots, components, consumption, shipments
+
+_GENEALOGY = {}
+_GENEALOGY_LOCK = threading.Lock()
+
+def get_genealogy_store():
+    """Genealogy store shared by every session, rebuilt over the lots started through the current
+    hour whenever the hour rolls over (the same hour the test-result store is loaded through)"""
+    hour = data_hour()
+    with _GENEALOGY_LOCK:
+        if _GENEALOGY.get("hour") != hour:
+            _GENEALOGY["store"] = GenealogyStore(*get_genealogy_data(hour))
+            _GENEALOGY["hour"] = hour
+        return _GENEALOGY["store"]
+
+def get_production_units(days=30):
+    """Units started on each line over the trailing days, cut from the genealogy lots:
+    {line: frame of serial, product and start time (ns)} in start order"""
+    lots = get_genealogy_store().lots
+    end = data_hour()
+    start = (end - pd.Timedelta(days=days)).value
+    step = 3600 * 10**9 // UNITS_PER_HOUR
+    units = {}
+    for line in PRODUCTION_LINES:
+        on = lots[lots["line"] == line]
+        began = on["produced"].to_numpy().astype("datetime64[ns]").astype(np.int64)
+        qty = on["quantity"].to_numpy()
+        live = np.flatnonzero((began + qty * step > start) & (began < end.value))
+        lot = np.repeat(live, qty[live])
+        k = np.arange(len(lot)) - np.repeat(np.cumsum(qty[live]) - qty[live], qty[live])
+        t = began[lot] + k * step
+        keep = (t >= start) & (t < end.value)
+        units[line] = pd.DataFrame({
+            "serial": on["serial_first"].to_numpy()[lot][keep] + k[keep],
+            "product": on["product"].to_numpy()[lot][keep],
+            "started": t[keep],
+        })
+    return units
+
+def get_component_genealogy(identifier=None, search_type="Lot ID"):
+    """Genealogy for a serial, lot, work order, customer PO, shipment, component lot or supplier lot"""
+    store = get_genealogy_store()
+    if identifier is None:
+        identifier, search_type = store.lots["lot_id"].iloc[-1], "Lot ID"
+    kind = TRACE_SEARCH_TYPES[search_type]
+    started = datetime.now()
+    query = parse_serial(identifier) if kind == "serial" else str(identifier).strip().upper()
+    trace = store.trace(query, kind) if query is not None else {
+        "found": False, "lots": store.lots.iloc[:0], "components": store.components.iloc[:0],
+        "shipments": store.shipments.iloc[:0]}
+    elapsed_ms = (datetime.now() - started).total_seconds() * 1000
+    lots, shipments = trace["lots"], trace["shipments"]
+    quantity = 1 if kind == "serial" else int(lots["quantity"].sum())
     return {
-        "batch_id": batch_id,
-        "product": "ME310G1-W1",
-        "production_date": "2024-12-15",
-        "quantity": 5000,
+        "query": identifier,
+        "search_type": search_type,
+        "found": trace["found"],
+        "lookup_ms": elapsed_ms,
+        "batch_id": lots["lot_id"].iloc[0] if len(lots) == 1 else f"{len(lots):,} lots",
+        "product": ", ".join(pd.unique(lots["product"])[:3]) + ("…" if lots["product"].nunique() > 3 else ""),
+        "production_date": f"{lots['produced'].min():%Y-%m-%d}" if len(lots) else "—",
+        "quantity": quantity,
+        "lots": lots,
         "components": [
-            {
-                "name": "Qualcomm MDM9206",
-                "supplier": "Qualcomm",
-                "lot": "QC-2024-8847",
-                "quantity": 5000,
-            },
-            {
-                "name": "Samsung K4B4G16",
-                "supplier": "Samsung Electronics",
-                "lot": "SS-2024-1122",
-                "quantity": 5000,
-            },
-            {
-                "name": "Murata LQH32CN",
-                "supplier": "Murata Manufacturing",
-                "lot": "MU-2024-3344",
-                "quantity": 25000,
-            },
-            {
-                "name": "TDK MLZ2012",
-                "supplier": "TDK Corporation",
-                "lot": "TDK-2024-5566",
-                "quantity": 15000,
-            },
+            {"name": c["part"], "supplier": c["supplier"], "lot": c["component_lot"], "supplier_lot": c["supplier_lot"],
+             "received": f"{c['received']:%Y-%m-%d}", "quantity": int(c.get("quantity_used", c["lot_size"]))}
+            for c in trace["components"].to_dict("records")
         ],
-        "test_results": {
-            "passed": 4987,
-            "failed": 13,
-            "yield": 99.74,
-        },
-        "shipped_to": ["Automotive OEM Alpha", "Fleet Management Inc"],
+        "test_results": get_lot_test_results(lots, query if kind == "serial" else None),
+        "shipments": shipments,
+        "shipped_to": list(pd.unique(shipments["customer"])),
     }
 
+def get_lot_test_results(lots, serial=None):
+    """Route outcome of the units of genealogy lots (or of one serial in them) up to the current hour:
+    units through Final QC, scrapped and still on the route, with the yield over the finished units"""
+    events = get_lot_route_events(lots)
+    events = events[events["time"] < data_hour()]
+    if serial is not None:
+        events = events[events["serial"] == serial]
+    passed = events.loc[(events["station"] == "Final QC") & (events["result"] == "pass"), "serial"].nunique()
+    failed = events.loc[events["result"] == "scrap", "serial"].nunique()
+    units = 1 if serial is not None else int(lots["quantity"].sum())
+    return {
+        "passed": passed,
+        "failed": failed,
+        "in_process": units - passed - failed,
+        "yield": round((1 - failed / max(passed + failed, 1)) * 100, 2),
+    }
+
+def get_supplier_part_lots(component_lot, start, end):
+    """Component lots of the same part from the same supplier as component_lot, received between
+    start and end (inclusive)"""
+    components = get_genealogy_store().components
+    lot = components[components["component_lot"] == str(component_lot).strip().upper()]
+    if lot.empty:
+        return []
+    received = components["received"]
+    same = ((components["part"] == lot["part"].iloc[0]) & (components["supplier_id"] == lot["supplier_id"].iloc[0])
+            & (received >= pd.Timestamp(start)) & (received <= pd.Timestamp(end)))
+    return components.loc[same, "component_lot"].tolist()
+
+def get_recall_impact(component_lots):
+    """Units, shipments and customers exposed to suspect component lots"""
+    store = get_genealogy_store()
+    impact = store.where_used([str(c).strip().upper() for c in np.atleast_1d(component_lots)])
+    price = {p["sku"]: p["price"] for p in TELIT_PRODUCTS}
+    lots = impact["lots"]
+    impact["value"] = float((lots["quantity"] * lots["product"].map(price)).sum())
+    shipped = impact["shipments"]
+    impact["shipments"] = shipped.assign(
+        status=np.where(shipped["shipped"] < pd.Timestamp(datetime.now()) - pd.Timedelta(days=30), "In Field",
+                        "In Transit / Customer Stock"))
+    impact["units_unshipped"] = impact["units"] - impact["units_shipped"]
+    return impact
+
 # =============================================================================
 # CARBON / ESG DATA
 # =============================================================================
@@ -473,6 +1992,45 @@ def get_risk_data():
     ]
     return pd.DataFrame(risks)
 
+def get_bom_tables(components_per_category=40):
+    """Generate multi-level BOMs (product -> subassemblies -> components) and the AVL"""
+    rng = np.random.default_rng(41)
+    categories = [s["category"] for s in SUPPLIERS]
+    components = [f"{c.replace(' ', '')[:4].upper()}-{k:04d}" for c in categories for k in range(components_per_category)]
+    component_category = np.repeat(np.arange(len(categories)), components_per_category)
+    bom = []
+    # Subassemblies are shared across a product category, components across subassemblies
+    for category in sorted({p["category"] for p in TELIT_PRODUCTS}):
+        for sub in ["BB", "RF", "PWR"]:
+            assembly = f"SA-{sub}-{category[:4].upper()}"
+            for c in rng.choice(len(components), 12, replace=False):
+                bom.append({"parent": assembly, "child": components[c], "qty_per": int(rng.integers(1, 6))})
+    for p in TELIT_PRODUCTS:
+        for sub in ["BB", "RF", "PWR"]:
+            bom.append({"parent": p["sku"], "child": f"SA-{sub}-{p['category'][:4].upper()}", "qty_per": 1})
+        for c in rng.choice(len(components), 6, replace=False):
+            bom.append({"parent": p["sku"], "child": components[c], "qty_per": int(rng.integers(1, 4))})
+    avl = []
+    for name, cat in zip(components, component_category):
+        primary, alternate = SUPPLIERS[cat]["id"], ALTERNATE_SUPPLIERS[cat]["id"]
+        roll = rng.random()
+        sources = [primary] if roll < 0.06 else [alternate] if roll < 0.09 else [primary, alternate]
+        avl.extend({"component": name, "supplier_id": s} for s in sources)
+    return pd.DataFrame(bom), pd.DataFrame(avl)
+
+_SOURCING = {}
+
+def get_sourcing_exposure():
+    """Sourcing exposure analyzer over the product BOMs (built once per session)"""
+    if "analyzer" not in _SOURCING:
+        bom, avl = get_bom_tables()
+        series, sku_idx, _ = get_customer_demand_history()
+        units = np.bincount(sku_idx, weights=series[:, -12:].sum(axis=1), minlength=len(TELIT_PRODUCTS))
+        revenue = units * np.array([p["price"] for p in TELIT_PRODUCTS])
+        countries = {s["id"]: s["country"] for s in SUPPLIERS + ALTERNATE_SUPPLIERS}
+        _SOURCING["analyzer"] = SourcingExposure(bom, avl, [p["sku"] for p in TELIT_PRODUCTS], revenue, countries)
+    return _SOURCING["analyzer"]
+
 def get_risk_by_region():
     """Generate risk scores by region"""
     return pd.DataFrame([
@@ -485,28 +2043,18 @@ def get_risk_by_region():
 # DIGITAL TWIN / FACTORY DATA
 # =============================================================================
 
-def get_factory_zones():
+def get_factory_zones(site="Trieste"):
     """Generate factory zone data for digital twin"""
-    zones = [
-        {"id": "receiving", "name": "Receiving", "x": 50, "y": 50, "width": 150, "height": 100},
-        {"id": "warehouse", "name": "Warehouse", "x": 50, "y": 170, "width": 150, "height": 120},
-        {"id": "smt1", "name": "SMT Line 1", "x": 220, "y": 50, "width": 180, "height": 100},
-        {"id": "smt2", "name": "SMT Line 2", "x": 420, "y": 50, "width": 180, "height": 100},
-        {"id": "testing", "name": "Testing", "x": 220, "y": 170, "width": 180, "height": 120},
-        {"id": "packaging", "name": "Packaging", "x": 420, "y": 170, "width": 180, "height": 120},
-        {"id": "quality", "name": "Quality Lab", "x": 220, "y": 310, "width": 180, "height": 100},
-        {"id": "shipping", "name": "Shipping", "x": 420, "y": 310, "width": 180, "height": 100},
-    ]
-    
-    for zone in zones:
-        zone["status"] = random.choice(["active", "active", "active", "warning", "idle"])
-        zone["utilization"] = random.randint(45, 98)
-        zone["workers"] = random.randint(2, 12)
-        zone["units_today"] = random.randint(500, 5000)
-        zone["temperature"] = round(random.uniform(20, 28), 1)
-        zone["humidity"] = random.randint(35, 55)
-    
-    return zones
+    return get_site_zones(site)
+
+_SITE_TWINS = {}
+
+def get_site_twin(site="Trieste"):
+    """Spatially indexed twin for one site (built once per site)"""
+    key = get_site(site)["id"]
+    if key not in _SITE_TWINS:
+        _SITE_TWINS[key] = build_site_twin(key)
+    return _SITE_TWINS[key]
 
 def get_production_flow():
     """Generate production flow data"""
@@ -0,0 +1,186 @@
+"""
+Telit Supply Chain - Genealogy Store
+Serial -> module lot -> component lot -> supplier lot -> shipment -> customer edges with indexed lookups
+"""
+
+import numpy as np
+import pandas as pd
+
+IDENTIFIER_KINDS = ("serial", "lot", "work_order", "component_lot", "supplier_lot", "shipment", "customer_po")
+
+
+def _csr(codes: np.ndarray, n: int) -> tuple:
+    """Rows grouped by code: (row order, offsets) so code k owns order[offsets[k]:offsets[k + 1]]"""
+    order = np.argsort(codes, kind="stable")
+    return order, np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=n))])
+
+
+def _members(csr: tuple, keys: np.ndarray) -> np.ndarray:
+    """All rows owned by any of the keys"""
+    order, offsets = csr
+    keys = np.asarray(keys, dtype=np.int64)
+    keys = keys[keys >= 0]
+    starts, counts = offsets[keys], offsets[keys + 1] - offsets[keys]
+    # Concatenated ranges starts[i]:starts[i] + counts[i] without a Python loop
+    within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return order[np.repeat(starts, counts) + within]
+
+
+class GenealogyStore:
+    """Traceability graph over module lots, component lots and shipments.
+
+    Module lots (one per work order) are assigned contiguous serial
+    ranges, and shipment lines are contiguous serial ranges of one lot, so
+    serials never need a per-unit index: a serial resolves by binary
+    search over range starts, which stays small at hundreds of millions
+    of units. Every other identifier (lot, work order, component lot,
+    supplier lot, shipment, customer PO) has a hash index to its rows,
+    and each edge type is stored as CSR adjacency in both directions, so
+    forward (where-used) and backward (what-went-in) traces are a few
+    array slices.
+    """
+
+    def __init__(self, lots: pd.DataFrame, component_lots: pd.DataFrame, consumption: pd.DataFrame,
+                 shipments: pd.DataFrame):
+        self.lots = lots.sort_values("serial_first", ignore_index=True)
+        first = self.lots["serial_first"].to_numpy(dtype=np.int64)
+        self._serial_first = first
+        self._serial_end = first + self.lots["quantity"].to_numpy(dtype=np.int64)
+        if (self._serial_end[:-1] > first[1:]).any():
+            raise ValueError("module lots have overlapping serial ranges")
+        self._lot_index = pd.Index(self.lots["lot_id"])
+        self._wo_index = pd.Index(self.lots["work_order"])
+
+        self.components = component_lots.reset_index(drop=True)
+        self._comp_index = pd.Index(self.components["component_lot"])
+        self._supplier_lot_index = pd.Index(self.components["supplier_lot"])
+
+        # Lot <-> component lot edges
+        self._edge_lot = self._lot_index.get_indexer(consumption["lot_id"])
+        self._edge_comp = self._comp_index.get_indexer(consumption["component_lot"])
+        if (self._edge_lot < 0).any() or (self._edge_comp < 0).any():
+            raise ValueError("consumption references unknown lots")
+        self._edge_qty = consumption["quantity"].to_numpy(dtype=np.int64)
+        self._lot_edges = _csr(self._edge_lot, len(self.lots))
+        self._comp_edges = _csr(self._edge_comp, len(self.components))
+
+        # Shipment lines, sorted by serial range start for serial lookups
+        self.shipments = shipments.sort_values("serial_first", ignore_index=True)
+        self._ship_first = self.shipments["serial_first"].to_numpy(dtype=np.int64)
+        self._ship_end = self._ship_first + self.shipments["quantity"].to_numpy(dtype=np.int64)
+        self._ship_lot = self._lot_index.get_indexer(self.shipments["lot_id"])
+        if (self._ship_lot < 0).any():
+            raise ValueError("shipments reference unknown lots")
+        ship_codes, ship_ids = pd.factorize(self.shipments["shipment_id"])
+        po_codes, po_ids = pd.factorize(self.shipments["customer_po"])
+        self._ship_index, self._po_index = pd.Index(ship_ids), pd.Index(po_ids)
+        self._ship_lines = _csr(ship_codes, len(ship_ids))
+        self._po_lines = _csr(po_codes, len(po_ids))
+        self._lot_lines = _csr(self._ship_lot, len(self.lots))
+
+        # pandas builds hash tables lazily; build them now so the first lookup is as fast as the rest
+        for index in (self._lot_index, self._wo_index, self._comp_index, self._supplier_lot_index, self._ship_index,
+                      self._po_index):
+            index.get_indexer(index[:1])
+
+    @property
+    def units(self) -> int:
+        return int((self._serial_end - self._serial_first).sum())
+
+    def _serial_row(self, serial: int, starts: np.ndarray, ends: np.ndarray) -> int:
+        i = int(np.searchsorted(starts, serial, side="right")) - 1
+        return i if i >= 0 and serial < ends[i] else -1
+
+    def locate(self, identifier, kind: str) -> np.ndarray:
+        """Rows an identifier resolves to: module lots for serial, lot and work order; component lots for
+        component and supplier lots; shipment lines for shipment and customer PO"""
+        if kind == "serial":
+            row = self._serial_row(int(identifier), self._serial_first, self._serial_end)
+            return np.array([row] if row >= 0 else [], dtype=np.int64)
+        index = {"lot": self._lot_index, "work_order": self._wo_index, "component_lot": self._comp_index,
+                 "supplier_lot": self._supplier_lot_index}.get(kind)
+        if index is not None:
+            rows = index.get_indexer([identifier])
+            return rows[rows >= 0].astype(np.int64)
+        if kind in ("shipment", "customer_po"):
+            index, lines = (self._ship_index, self._ship_lines) if kind == "shipment" else (self._po_index,
+                                                                                            self._po_lines)
+            return np.sort(_members(lines, index.get_indexer([identifier])))
+        raise ValueError(f"unknown identifier kind: {kind}")
+
+    def identify(self, identifier) -> list:
+        """Identifier kinds a string or serial number resolves under"""
+        kinds = []
+        for kind in IDENTIFIER_KINDS:
+            if kind == "serial" and not isinstance(identifier, (int, np.integer)):
+                continue
+            if len(self.locate(identifier, kind)):
+                kinds.append(kind)
+        return kinds
+
+    def _lot_frame(self, rows: np.ndarray) -> pd.DataFrame:
+        return self.lots.iloc[np.unique(rows)].reset_index(drop=True)
+
+    def _component_frame(self, lot_rows: np.ndarray) -> pd.DataFrame:
+        """Component lots consumed by the module lots, with the quantity drawn from each"""
+        edges = _members(self._lot_edges, np.unique(lot_rows))
+        used = pd.DataFrame({"row": self._edge_comp[edges], "quantity_used": self._edge_qty[edges]})
+        used = used.groupby("row", sort=True)["quantity_used"].sum()
+        frame = self.components.iloc[used.index.to_numpy()].reset_index(drop=True)
+        frame["quantity_used"] = used.to_numpy()
+        return frame
+
+    def _shipment_frame(self, line_rows: np.ndarray) -> pd.DataFrame:
+        return self.shipments.iloc[np.unique(line_rows)].reset_index(drop=True)
+
+    def trace(self, identifier, kind: str) -> dict:
+        """Module lots, component lots and shipment lines connected to an identifier.
+
+        Serials, lots and work orders trace back to their components and
+        forward to the shipment lines carrying them; component and supplier
+        lots trace forward to every module lot that used them (where-used);
+        shipments and customer POs trace back through their lots.
+        """
+        rows = self.locate(identifier, kind)
+        serial = int(identifier) if kind == "serial" else None
+        if kind in ("serial", "lot", "work_order"):
+            lot_rows = rows
+            if kind == "serial" and len(rows):
+                line = self._serial_row(serial, self._ship_first, self._ship_end)
+                line_rows = np.array([line] if line >= 0 else [], dtype=np.int64)
+            else:
+                line_rows = _members(self._lot_lines, lot_rows)
+            components = self._component_frame(lot_rows)
+        elif kind in ("component_lot", "supplier_lot"):
+            edges = _members(self._comp_edges, rows)
+            lot_rows = self._edge_lot[edges]
+            line_rows = _members(self._lot_lines, np.unique(lot_rows))
+            components = self.components.iloc[rows].reset_index(drop=True)
+        else:
+            line_rows = rows
+            lot_rows = self._ship_lot[rows]
+            components = self._component_frame(lot_rows)
+        return {
+            "kind": kind,
+            "identifier": identifier,
+            "serial": serial,
+            "found": len(rows) > 0,
+            "lots": self._lot_frame(lot_rows),
+            "components": components,
+            "shipments": self._shipment_frame(line_rows),
+        }
+
+    def where_used(self, component_lots: list) -> dict:
+        """Recall exposure of component lots: module lots, units, shipments and customers"""
+        rows = self._comp_index.get_indexer(list(component_lots))
+        edges = _members(self._comp_edges, rows[rows >= 0])
+        lot_rows = np.unique(self._edge_lot[edges])
+        shipped = self._shipment_frame(_members(self._lot_lines, lot_rows))
+        lots = self._lot_frame(lot_rows)
+        return {
+            "lots": lots,
+            "units": int(lots["quantity"].sum()),
+            "units_shipped": int(shipped["quantity"].sum()),
+            "shipments": shipped,
+            "customers": shipped.groupby("customer", sort=False)["quantity"].sum().sort_values(ascending=False),
+        }
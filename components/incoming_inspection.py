@@ -0,0 +1,243 @@
+"""
+Telit Supply Chain - Incoming Inspection Planner
+AQL sampling plans with switching and skip-lot rules, evaluated for whole batches of lots
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+# Inspection levels, loosest first
+INSPECTION_LEVELS = ("skip", "reduced", "normal", "tightened", "hold")
+SKIP, REDUCED, NORMAL, TIGHTENED, HOLD = range(len(INSPECTION_LEVELS))
+
+# Sample size code letters for general inspection level II: upper lot size of each letter
+LOT_SIZE_LIMITS = np.array([8, 15, 25, 50, 90, 150, 280, 500, 1200, 3200, 10000, 35000, 150000, 500000])
+CODE_LETTERS = "ABCDEFGHJKLMNPQR"
+SAMPLE_SIZES = np.array([2, 3, 5, 8, 13, 20, 32, 50, 80, 125, 200, 315, 500, 800, 1250, 2000])
+
+# Preferred AQL series (% defective); tightened inspection uses the next lower step
+AQL_SERIES = np.array([0.065, 0.1, 0.15, 0.25, 0.4, 0.65, 1.0, 1.5, 2.5, 4.0, 6.5])
+
+# Lots are accepted with at least this probability when running exactly at the AQL
+ACCEPT_AT_AQL = 0.95
+
+SWITCHING = {
+    "tighten_rejects": 2,       # rejected lots among the last `tighten_window` on normal
+    "tighten_window": 5,
+    "relax_accepts": 5,         # consecutive accepts to leave tightened
+    "hold_rejects": 5,          # cumulative rejects on tightened before holding the source (until released)
+    "reduce_accepts": 10,       # consecutive accepts on normal to move to reduced
+    "skip_accepts": 10,         # consecutive accepts on reduced to qualify for skip-lot
+    "skip_interval": 4,         # inspect one lot in this many while on skip-lot
+    "reduced_letters": 2,       # reduced inspection samples this many code letters lower
+}
+
+
+def _acceptance_numbers(ns: np.ndarray, aqls: np.ndarray) -> np.ndarray:
+    """Smallest c with Poisson P(defects <= c) >= ACCEPT_AT_AQL for each sample size x AQL"""
+    out = np.zeros((len(ns), len(aqls)), dtype=np.int64)
+    for i, n in enumerate(ns):
+        for j, aql in enumerate(aqls):
+            lam = n * aql / 100
+            term = total = math.exp(-lam)
+            c = 0
+            while total < ACCEPT_AT_AQL:
+                c += 1
+                term *= lam / c
+                total += term
+            out[i, j] = c
+    return out
+
+
+ACCEPTANCE_TABLE = _acceptance_numbers(SAMPLE_SIZES, AQL_SERIES)
+
+
+def code_letter(lot_size: np.ndarray) -> np.ndarray:
+    """Code letter index (into SAMPLE_SIZES) for each lot size"""
+    return np.searchsorted(LOT_SIZE_LIMITS, np.asarray(lot_size), side="left")
+
+
+class InspectionPlanner:
+    """Sampling plans and switching state for every supplier-part.
+
+    Each supplier-part carries an AQL, an inspection level and the few
+    counters the switching rules need (recent rejects, accept streak,
+    rejects on tightened, lots since the last skip-lot inspection) in flat
+    arrays. plan() sizes a whole batch of lots with table lookups: code
+    letter from lot size, sample size and acceptance number from the
+    level and AQL. record() judges the batch and applies the switching
+    rules to all supplier-parts at once, taking repeated lots of the same
+    supplier-part in arrival order. Lots from a held supplier-part are
+    quarantined (rejected without sampling) until release() returns it to
+    tightened inspection. sample_plans() and judge() do the
+    same on supplier-part rows from rows(), for replaying long histories
+    without per-batch frame overhead.
+    """
+
+    def __init__(self, default_aql: float = 1.0, switching: dict = None):
+        self.default_aql = default_aql
+        self.switching = dict(SWITCHING, **(switching or {}))
+        self.keys = pd.MultiIndex.from_arrays([[], []], names=["supplier_id", "part"])
+        self.aql_step = np.empty(0, dtype=np.int64)
+        self.level = np.empty(0, dtype=np.int64)
+        self._recent = np.empty(0, dtype=np.int64)
+        self._streak = np.empty(0, dtype=np.int64)
+        self._tight_rejects = np.empty(0, dtype=np.int64)
+        self._since_inspected = np.empty(0, dtype=np.int64)
+        # Totals for reporting: lots, inspected, rejected, units received, units sampled, units normal would sample
+        self.totals = np.zeros((0, 6), dtype=np.int64)
+        self._popcount = np.array([bin(v).count("1") for v in range(1 << self.switching["tighten_window"])])
+
+    def rows(self, suppliers, parts) -> np.ndarray:
+        """Row of each supplier-part, adding rows (on normal inspection) for new ones"""
+        wanted = pd.MultiIndex.from_arrays([np.asarray(suppliers), np.asarray(parts)])
+        idx = self.keys.get_indexer(wanted)
+        if (idx < 0).any():
+            new = wanted[idx < 0].unique()
+            self.keys = self.keys.append(new).set_names(["supplier_id", "part"])
+            default = int(np.abs(AQL_SERIES - self.default_aql).argmin())
+            grow = lambda a, fill: np.concatenate([a, np.full((len(new),) + a.shape[1:], fill, dtype=a.dtype)])
+            self.aql_step = grow(self.aql_step, default)
+            self.level = grow(self.level, NORMAL)
+            self._recent, self._streak = grow(self._recent, 0), grow(self._streak, 0)
+            self._tight_rejects, self._since_inspected = grow(self._tight_rejects, 0), grow(self._since_inspected, 0)
+            self.totals = grow(self.totals, 0)
+            idx = self.keys.get_indexer(wanted)
+        return idx
+
+    def set_aql(self, suppliers, parts, aql):
+        """Set the AQL (snapped to the preferred series) for supplier-parts"""
+        idx = self.rows(np.atleast_1d(suppliers), np.atleast_1d(parts))
+        self.aql_step[idx] = np.abs(AQL_SERIES[None, :] - np.atleast_1d(aql)[:, None]).argmin(axis=1)
+
+    def release(self, suppliers, parts):
+        """Return held supplier-parts to tightened inspection (e.g. once their corrective action is verified)"""
+        idx = self.rows(np.atleast_1d(suppliers), np.atleast_1d(parts))
+        idx = idx[self.level[idx] == HOLD]
+        self.level[idx] = TIGHTENED
+        self._recent[idx] = 0
+        self._streak[idx] = 0
+        self._tight_rejects[idx] = 0
+        self._since_inspected[idx] = 0
+
+    @staticmethod
+    def _rank(idx: np.ndarray) -> np.ndarray:
+        """Occurrence number of each lot among earlier lots of the same supplier-part"""
+        order = np.argsort(idx, kind="stable")
+        starts = np.r_[0, np.flatnonzero(np.diff(idx[order])) + 1]
+        rank = np.empty(len(idx), dtype=np.int64)
+        rank[order] = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+        return rank
+
+    def _sampling(self, level: np.ndarray, aql_step: np.ndarray, lot_size: np.ndarray) -> tuple:
+        letter = np.minimum(code_letter(lot_size), len(SAMPLE_SIZES) - 1)
+        letter = np.where(level <= REDUCED, np.maximum(letter - self.switching["reduced_letters"], 0), letter)
+        step = np.where(level == TIGHTENED, np.maximum(aql_step - 1, 0), aql_step)
+        n = SAMPLE_SIZES[letter]
+        ac = ACCEPTANCE_TABLE[letter, step]
+        # Lots no bigger than the sample are inspected in full
+        full = n >= lot_size
+        n = np.where(full, lot_size, n)
+        ac = np.where(full, np.floor(lot_size * AQL_SERIES[aql_step] / 100).astype(np.int64), ac)
+        # Held sources are quarantined: nothing sampled and no defect count accepts the lot
+        held = level == HOLD
+        return np.where(held, 0, n), np.where(held, -1, ac)
+
+    def sample_plans(self, rows: np.ndarray, lot_size: np.ndarray) -> dict:
+        """Level, AQL, sample size and acceptance number for lots given as supplier-part rows"""
+        lot_size = np.asarray(lot_size, dtype=np.int64)
+        level = self.level[rows]
+        n, ac = self._sampling(level, self.aql_step[rows], lot_size)
+        # On skip-lot, only every skip_interval-th lot of a supplier-part is sampled
+        due = (self._since_inspected[rows] + self._rank(rows) + 1) % self.switching["skip_interval"] == 0
+        skipped = (level == SKIP) & ~due
+        return {
+            "level": level,
+            "aql": AQL_SERIES[self.aql_step[rows]],
+            "sample_size": np.where(skipped, 0, n),
+            "accept_number": np.where(skipped, -1, ac),
+            "skipped": skipped,
+        }
+
+    def judge(self, rows: np.ndarray, lot_size: np.ndarray, plans: dict, defects_found: np.ndarray) -> np.ndarray:
+        """Accept or reject planned lots on the defects found and apply the switching rules"""
+        lot_size = np.asarray(lot_size, dtype=np.int64)
+        skipped = plans["skipped"]
+        accepted = skipped | (np.asarray(defects_found, dtype=np.int64) <= plans["accept_number"])
+        normal_n, _ = self._sampling(np.full(len(rows), NORMAL), self.aql_step[rows], lot_size)
+        np.add.at(self.totals, rows, np.stack([np.ones(len(rows), dtype=np.int64), ~skipped, ~accepted, lot_size,
+                                               plans["sample_size"], normal_n], axis=1))
+        rank = self._rank(rows)
+        for r in range(int(rank.max()) + 1 if len(rank) else 0):
+            at = np.flatnonzero(rank == r)
+            self._switch(rows[at], accepted[at], skipped[at])
+        return accepted
+
+    def plan(self, lots: pd.DataFrame) -> pd.DataFrame:
+        """Sampling plan for each lot (supplier_id, part, lot_size) from the current levels"""
+        rows = self.rows(lots["supplier_id"], lots["part"])
+        plans = self.sample_plans(rows, lots["lot_size"].to_numpy())
+        plan = lots.copy()
+        plan["level"] = np.asarray(INSPECTION_LEVELS)[plans["level"]]
+        plan["aql"] = plans["aql"]
+        plan["sample_size"] = plans["sample_size"]
+        plan["accept_number"] = plans["accept_number"]
+        plan["reject_number"] = np.where(plans["skipped"], -1, plans["accept_number"] + 1)
+        plan["skipped"] = plans["skipped"]
+        return plan
+
+    def record(self, plan: pd.DataFrame, defects_found) -> pd.DataFrame:
+        """Judge a planned batch (as returned by plan) on the defects found in each sample"""
+        rows = self.rows(plan["supplier_id"], plan["part"])
+        plans = {col: plan[col].to_numpy() for col in ("sample_size", "accept_number", "skipped")}
+        result = plan.copy()
+        result["defects_found"] = np.asarray(defects_found, dtype=np.int64)
+        result["accepted"] = self.judge(rows, plan["lot_size"].to_numpy(), plans, result["defects_found"].to_numpy())
+        return result
+
+    def _switch(self, k: np.ndarray, accepted: np.ndarray, skipped: np.ndarray):
+        sw = self.switching
+        rejected = ~accepted
+        self._since_inspected[k] = np.where(skipped, self._since_inspected[k] + 1, 0)
+        inspected = ~skipped
+        self._recent[k] = np.where(inspected, ((self._recent[k] << 1) | rejected) & ((1 << sw["tighten_window"]) - 1),
+                                   self._recent[k])
+        self._streak[k] = np.where(rejected, 0, self._streak[k] + inspected)
+        self._tight_rejects[k] += (self.level[k] == TIGHTENED) & rejected
+
+        level = self.level[k]
+        recent_rejects = self._popcount[self._recent[k]]
+        new = level.copy()
+        new[(level == NORMAL) & (recent_rejects >= sw["tighten_rejects"])] = TIGHTENED
+        new[(level == NORMAL) & (self._streak[k] >= sw["reduce_accepts"])] = REDUCED
+        new[(level == TIGHTENED) & (self._streak[k] >= sw["relax_accepts"])] = NORMAL
+        new[(level == TIGHTENED) & (self._tight_rejects[k] >= sw["hold_rejects"])] = HOLD
+        new[(level == REDUCED) & rejected] = NORMAL
+        new[(level == REDUCED) & (self._streak[k] >= sw["skip_accepts"])] = SKIP
+        new[(level == SKIP) & rejected] = NORMAL
+
+        changed = new != level
+        moved = k[changed]
+        self.level[moved] = new[changed]
+        self._recent[moved] = 0
+        self._streak[moved] = 0
+        self._tight_rejects[moved] = 0
+        self._since_inspected[moved] = 0
+
+    def status(self) -> pd.DataFrame:
+        """Level, AQL and inspection history per supplier-part"""
+        lots, inspected, rejected, units, sampled, normal = self.totals.T
+        frame = self.keys.to_frame(index=False)
+        frame["aql"] = AQL_SERIES[self.aql_step]
+        frame["level"] = np.asarray(INSPECTION_LEVELS)[self.level]
+        frame["lots"] = lots
+        frame["inspected"] = inspected
+        frame["rejected"] = rejected
+        frame["acceptance_rate"] = (1 - rejected / np.maximum(inspected, 1)) * 100
+        frame["units_received"] = units
+        frame["units_sampled"] = sampled
+        frame["units_normal"] = normal
+        frame["effort_saved"] = (1 - sampled / np.maximum(normal, 1)) * 100
+        return frame
@@ -0,0 +1,118 @@
+"""
+Telit Supply Chain - Inventory Position Engine
+Vectorized days-of-supply, reorder and stockout evaluation per SKU x warehouse
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+# Quantity buckets tracked for every SKU x warehouse cell
+QUANTITY_FIELDS = ["on_hand", "on_order", "allocated", "in_transit"]
+
+
+class InventoryPosition:
+    """Inventory quantities for a SKU x warehouse matrix held as NumPy arrays.
+
+    evaluate() derives the whole matrix in one pass and caches it;
+    post_movements() applies stock moves and re-derives only the
+    touched cells, so the cached view stays current without a rescan.
+    """
+
+    def __init__(self, skus: list, warehouses: list, daily_demand: np.ndarray = None,
+                 reorder_point: np.ndarray = None, as_of: datetime = None):
+        self.skus = list(skus)
+        self.warehouses = list(warehouses)
+        self.sku_index = {s: i for i, s in enumerate(self.skus)}
+        self.warehouse_index = {w: j for j, w in enumerate(self.warehouses)}
+        shape = (len(self.skus), len(self.warehouses))
+        self.qty = {f: np.zeros(shape, dtype=np.float64) for f in QUANTITY_FIELDS}
+        self.daily_demand = np.zeros(shape) if daily_demand is None else np.asarray(daily_demand, dtype=np.float64)
+        self.reorder_point = np.zeros(shape) if reorder_point is None else np.asarray(reorder_point, dtype=np.float64)
+        self.as_of = np.datetime64((as_of or datetime.now()).date(), "D")
+        self._view = None
+
+    @property
+    def shape(self):
+        return self.daily_demand.shape
+
+    def load(self, **quantities):
+        """Replace one or more quantity arrays and invalidate the cached view"""
+        for field, values in quantities.items():
+            if field not in self.qty:
+                raise KeyError(f"Unknown quantity field: {field}")
+            self.qty[field] = np.asarray(values, dtype=np.float64).reshape(self.shape)
+        self._view = None
+
+    def _derive(self, on_hand, on_order, allocated, in_transit, demand, rop):
+        available = on_hand - allocated
+        position = available + on_order + in_transit
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dos = np.where(demand > 0, np.maximum(available, 0) / demand, np.inf)
+        stockout = np.full(dos.shape, np.datetime64("NaT"), dtype="datetime64[D]")
+        finite = np.isfinite(dos)
+        stockout[finite] = self.as_of + np.floor(dos[finite]).astype("timedelta64[D]")
+        return {
+            "available": available,
+            "inventory_position": position,
+            "days_of_supply": dos,
+            "below_reorder": position <= rop,
+            "low_stock": available < rop,
+            "projected_stockout": stockout,
+        }
+
+    def evaluate(self) -> dict:
+        """Compute derived metrics for the whole matrix (cached)"""
+        if self._view is None:
+            q = self.qty
+            self._view = self._derive(q["on_hand"], q["on_order"], q["allocated"], q["in_transit"],
+                                      self.daily_demand, self.reorder_point)
+        return self._view
+
+    def post_movements(self, skus, warehouses, quantities, field: str = "on_hand"):
+        """Apply a batch of signed stock movements to one quantity bucket"""
+        i = np.array([self.sku_index[s] for s in np.atleast_1d(skus)], dtype=np.int64)
+        j = np.array([self.warehouse_index[w] for w in np.atleast_1d(warehouses)], dtype=np.int64)
+        np.add.at(self.qty[field], (i, j), np.broadcast_to(np.asarray(quantities, dtype=np.float64), i.shape))
+        if self._view is None:
+            return
+        cells = np.unique(i * self.shape[1] + j)
+        ci, cj = np.divmod(cells, self.shape[1])
+        q = self.qty
+        fresh = self._derive(q["on_hand"][ci, cj], q["on_order"][ci, cj], q["allocated"][ci, cj],
+                             q["in_transit"][ci, cj], self.daily_demand[ci, cj], self.reorder_point[ci, cj])
+        for key, values in fresh.items():
+            self._view[key][ci, cj] = values
+
+    def receive(self, skus, warehouses, quantities):
+        """Move quantities from in-transit to on-hand"""
+        self.post_movements(skus, warehouses, -np.asarray(quantities), "in_transit")
+        self.post_movements(skus, warehouses, quantities, "on_hand")
+
+    def to_frame(self) -> pd.DataFrame:
+        """Flatten the matrix to one row per SKU x warehouse"""
+        view = self.evaluate()
+        n_sku, n_wh = self.shape
+        frame = {
+            "sku": np.repeat(np.array(self.skus, dtype=object), n_wh),
+            "warehouse_id": np.tile(np.array(self.warehouses, dtype=object), n_sku),
+        }
+        for field in QUANTITY_FIELDS:
+            frame[field] = self.qty[field].ravel()
+        frame["daily_demand"] = self.daily_demand.ravel()
+        frame["reorder_point"] = self.reorder_point.ravel()
+        for key, values in view.items():
+            frame[key] = values.ravel()
+        return pd.DataFrame(frame)
+
+    def summary(self) -> dict:
+        """Headline counts for KPI cards"""
+        view = self.evaluate()
+        dos = view["days_of_supply"]
+        finite = np.isfinite(dos)
+        return {
+            "total_on_hand": float(self.qty["on_hand"].sum()),
+            "below_reorder": int(view["below_reorder"].sum()),
+            "low_stock": int(view["low_stock"].sum()),
+            "avg_days_of_supply": float(dos[finite].mean()) if finite.any() else 0.0,
+        }
@@ -0,0 +1,154 @@
+"""
+Telit Supply Chain - Lead-Time Distribution Sketches
+Mergeable t-digest quantile sketches per supplier, part and site
+"""
+
+import numpy as np
+import pandas as pd
+
+# Quantiles reported by default
+LEAD_TIME_QUANTILES = (0.5, 0.9, 0.99)
+
+
+class TDigest:
+    """Merging t-digest with a bounded number of centroids.
+
+    Values are appended to a buffer (O(1) per value) and folded into the
+    centroids when the buffer fills. Compression sorts the centroids and
+    groups them by the integer part of the arcsine scale function of
+    their cumulative weight, which keeps clusters small in the tails
+    where P99 accuracy matters. Digests merge by the same compression,
+    so per-site sketches roll up without revisiting raw receipts.
+    """
+
+    def __init__(self, compression: float = 100, buffer_size: int = 500):
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self._buffer = []
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum()) + len(self._buffer)
+
+    def add(self, value: float):
+        """Add one observation"""
+        self._buffer.append(value)
+        if len(self._buffer) >= self.buffer_size:
+            self._flush()
+
+    def add_many(self, values: np.ndarray):
+        """Add a batch of observations in one compression"""
+        values = np.asarray(values, dtype=np.float64)
+        if len(values):
+            self._compress(np.concatenate([self.means, values]),
+                           np.concatenate([self.weights, np.ones(len(values))]))
+
+    def merge(self, other: "TDigest"):
+        """Fold another digest into this one"""
+        other._flush()
+        self._flush()
+        self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @classmethod
+    def merged(cls, digests: list, compression: float = 100) -> "TDigest":
+        """New digest combining several others"""
+        out = cls(compression)
+        for d in digests:
+            out.merge(d)
+        return out
+
+    def _flush(self):
+        if self._buffer:
+            buffered, self._buffer = np.asarray(self._buffer, dtype=np.float64), []
+            self._compress(np.concatenate([self.means, buffered]),
+                           np.concatenate([self.weights, np.ones(len(buffered))]))
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        if not len(means):
+            return
+        self.min = min(self.min, float(means.min()))
+        self.max = max(self.max, float(means.max()))
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        q_mid = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / np.pi * np.arcsin(2 * q_mid - 1)
+        cluster = np.floor(k - k[0]).astype(np.int64)
+        # Renumber to consecutive ids so bincount stays small
+        _, cluster = np.unique(cluster, return_inverse=True)
+        w = np.bincount(cluster, weights=weights)
+        self.means = np.bincount(cluster, weights=means * weights) / w
+        self.weights = w
+
+    def quantile(self, q) -> np.ndarray:
+        """Estimated value at one or more quantiles"""
+        self._flush()
+        q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        if not len(self.means):
+            return np.full(len(q), np.nan)
+        if len(self.means) == 1:
+            return np.full(len(q), self.means[0])
+        total = self.weights.sum()
+        centres = np.cumsum(self.weights) - self.weights / 2
+        x = np.concatenate([[0.0], centres, [total]])
+        y = np.concatenate([[self.min], self.means, [self.max]])
+        return np.interp(q * total, x, y)
+
+    def mean(self) -> float:
+        self._flush()
+        return float((self.means * self.weights).sum() / self.weights.sum()) if len(self.weights) else np.nan
+
+
+class LeadTimeSketches:
+    """Streaming lead-time distributions keyed by (supplier, part, site).
+
+    Receipts update a single digest in O(1); supplier- or part-level
+    quantiles are answered by merging the small per-key digests rather
+    than rescanning receipts.
+    """
+
+    KEYS = ("supplier", "part", "site")
+
+    def __init__(self, compression: float = 100):
+        self.compression = compression
+        self.digests = {}
+
+    def _digest(self, key: tuple) -> TDigest:
+        if key not in self.digests:
+            self.digests[key] = TDigest(self.compression)
+        return self.digests[key]
+
+    def record(self, supplier: str, part: str, site: str, lead_days: float):
+        """Add one receipt's lead time"""
+        self._digest((supplier, part, site)).add(lead_days)
+
+    def record_batch(self, receipts: pd.DataFrame):
+        """Add a frame of receipts with supplier, part, site and lead_days columns"""
+        for key, values in receipts.groupby(list(self.KEYS), sort=False)["lead_days"]:
+            self._digest(key).add_many(values.to_numpy())
+
+    def merge(self, other: "LeadTimeSketches"):
+        """Fold in sketches built elsewhere, e.g. at another site"""
+        for key, digest in other.digests.items():
+            self._digest(key).merge(digest)
+
+    def quantiles(self, by: tuple = ("supplier",), qs: tuple = LEAD_TIME_QUANTILES, **filters) -> pd.DataFrame:
+        """P50/P90/P99 (or any quantiles) per group, merging the matching digests"""
+        by = [by] if isinstance(by, str) else list(by)
+        pos = [self.KEYS.index(k) for k in by]
+        groups = {}
+        for key, digest in self.digests.items():
+            if all(key[self.KEYS.index(k)] == v for k, v in filters.items()):
+                groups.setdefault(tuple(key[i] for i in pos), []).append(digest)
+        rows = []
+        for group, digests in groups.items():
+            d = digests[0] if len(digests) == 1 else TDigest.merged(digests, self.compression)
+            rows.append({**dict(zip(by, group)), "receipts": int(d.count), "mean": d.mean(),
+                         **{f"p{round(q * 100):d}": v for q, v in zip(qs, d.quantile(qs))}})
+        return pd.DataFrame(rows).sort_values(by, ignore_index=True) if rows else pd.DataFrame(rows)
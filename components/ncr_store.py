@@ -0,0 +1,255 @@
+"""
+Telit Supply Chain - NCR/CAPA Store
+Nonconformance reports and corrective actions in SQLite with indexed, paginated queries
+"""
+
+import sqlite3
+import threading
+
+import pandas as pd
+
+NCR_STATUSES = ("Open", "MRB Review", "In Progress", "Closed")
+CAPA_STATUSES = ("Open", "In Progress", "Verify", "Closed")
+
+ROOT_CAUSES = ("Equipment", "Material/Supplier", "Method/Process", "Operator", "Design", "Measurement")
+
+# Age buckets for open records (upper bound in days, exclusive)
+AGING_BUCKETS = {"< 7 days": 7, "7-14 days": 15, "15-30 days": 31, "31-90 days": 91, "> 90 days": None}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS attrs (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS ncr (
+    ncr_id TEXT PRIMARY KEY,
+    opened TEXT NOT NULL,
+    product TEXT,
+    supplier_id TEXT,
+    line TEXT,
+    issue TEXT,
+    root_cause TEXT,
+    qty_affected INTEGER,
+    disposition TEXT,
+    owner TEXT,
+    status TEXT NOT NULL,
+    due_date TEXT,
+    closed TEXT
+);
+CREATE INDEX IF NOT EXISTS ncr_status ON ncr (status, opened);
+CREATE INDEX IF NOT EXISTS ncr_supplier ON ncr (supplier_id, opened);
+CREATE INDEX IF NOT EXISTS ncr_product ON ncr (product, opened);
+CREATE INDEX IF NOT EXISTS ncr_due ON ncr (due_date);
+CREATE INDEX IF NOT EXISTS ncr_root_cause ON ncr (root_cause, opened);
+CREATE INDEX IF NOT EXISTS ncr_opened ON ncr (opened);
+CREATE TABLE IF NOT EXISTS capa (
+    capa_id TEXT PRIMARY KEY,
+    ncr_id TEXT REFERENCES ncr (ncr_id),
+    opened TEXT NOT NULL,
+    source TEXT,
+    product TEXT,
+    supplier_id TEXT,
+    issue TEXT,
+    root_cause TEXT,
+    action TEXT,
+    owner TEXT,
+    status TEXT NOT NULL,
+    due_date TEXT,
+    closed TEXT,
+    effectiveness REAL
+);
+CREATE INDEX IF NOT EXISTS capa_status ON capa (status, opened);
+CREATE INDEX IF NOT EXISTS capa_supplier ON capa (supplier_id, opened);
+CREATE INDEX IF NOT EXISTS capa_product ON capa (product, opened);
+CREATE INDEX IF NOT EXISTS capa_due ON capa (due_date);
+CREATE INDEX IF NOT EXISTS capa_root_cause ON capa (root_cause, opened);
+CREATE INDEX IF NOT EXISTS capa_opened ON capa (opened);
+CREATE INDEX IF NOT EXISTS capa_ncr ON capa (ncr_id);
+"""
+
+_COLUMNS = {
+    "ncr": ("ncr_id", "opened", "product", "supplier_id", "line", "issue", "root_cause", "qty_affected",
+            "disposition", "owner", "status", "due_date", "closed"),
+    "capa": ("capa_id", "ncr_id", "opened", "source", "product", "supplier_id", "issue", "root_cause", "action",
+             "owner", "status", "due_date", "closed", "effectiveness"),
+}
+
+# Columns a query may filter on (all indexed)
+FILTER_COLUMNS = ("status", "supplier_id", "product", "root_cause")
+
+
+def _check_table(table: str):
+    if table not in _COLUMNS:
+        raise ValueError(f"unknown table: {table}")
+
+
+def _iso(value) -> str:
+    return None if value is None or pd.isna(value) else pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+class NcrStore:
+    """NCRs and CAPAs in a local SQLite file.
+
+    Every column the tab filters or sorts on is indexed (status, supplier,
+    product and root cause, each paired with the open date, plus due date),
+    so the page asks for one page of rows and a count instead of loading
+    the whole history. Dates are ISO strings, which sort and compare
+    correctly as text; aging and monthly trends are aggregated in SQL.
+    The one connection is shared by every session's thread, so each
+    statement and transaction runs under a lock.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self.conn.executescript(_SCHEMA)
+
+    def _read(self, sql: str, params=()) -> pd.DataFrame:
+        with self._lock:
+            return pd.read_sql_query(sql, self.conn, params=params)
+
+    def _one(self, sql: str, params=()):
+        with self._lock:
+            return self.conn.execute(sql, params).fetchone()
+
+    def get_attr(self, key: str, default=None):
+        row = self._one("SELECT value FROM attrs WHERE key = ?", (key,))
+        return default if row is None else row[0]
+
+    def set_attr(self, key: str, value: str):
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO attrs (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def clear(self):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM capa")
+            self.conn.execute("DELETE FROM ncr")
+
+    def _insert(self, table: str, frame: pd.DataFrame):
+        columns = _COLUMNS[table]
+        frame = frame.reindex(columns=list(columns)).astype(object)
+        frame = frame.where(frame.notna(), None)
+        for col in ("opened", "due_date", "closed"):
+            frame[col] = [_iso(v) for v in frame[col]]
+        sql = f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        with self._lock, self.conn:
+            self.conn.executemany(sql, frame.itertuples(index=False, name=None))
+
+    def add_ncrs(self, frame: pd.DataFrame):
+        self._insert("ncr", frame)
+
+    def add_capas(self, frame: pd.DataFrame):
+        self._insert("capa", frame)
+
+    def set_status(self, table: str, record_id: str, status: str, closed=None):
+        """Move a record to a new status (closing it stamps the close date)"""
+        _check_table(table)
+        statuses = NCR_STATUSES if table == "ncr" else CAPA_STATUSES
+        if status not in statuses:
+            raise ValueError(f"unknown {table} status: {status}")
+        if status == "Closed" and closed is None:
+            closed = pd.Timestamp.now()
+        key = _COLUMNS[table][0]
+        with self._lock, self.conn:
+            self.conn.execute(f"UPDATE {table} SET status = ?, closed = ? WHERE {key} = ?",
+                              (status, _iso(closed) if status == "Closed" else None, record_id))
+
+    @staticmethod
+    def _where(filters: dict, open_only: bool = False, overdue_as_of=None) -> tuple:
+        clauses, params = [], []
+        for col, value in filters.items():
+            if col not in FILTER_COLUMNS:
+                raise ValueError(f"cannot filter on {col}")
+            if value is None or (isinstance(value, (list, tuple)) and not value):
+                continue
+            values = list(value) if isinstance(value, (list, tuple)) else [value]
+            clauses.append(f"{col} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        if open_only:
+            clauses.append("status != 'Closed'")
+        if overdue_as_of is not None:
+            clauses.append("status != 'Closed' AND due_date < ?")
+            params.append(_iso(overdue_as_of))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def count(self, table: str = "ncr", open_only: bool = False, overdue_as_of=None, **filters) -> int:
+        _check_table(table)
+        where, params = self._where(filters, open_only, overdue_as_of)
+        return self._one(f"SELECT COUNT(*) FROM {table}{where}", params)[0]
+
+    def query(self, table: str = "ncr", page: int = 0, page_size: int = 50, order_by: str = "opened",
+              descending: bool = True, open_only: bool = False, overdue_as_of=None, **filters) -> tuple:
+        """One page of records matching the filters, and the total number of matches"""
+        _check_table(table)
+        if order_by not in _COLUMNS[table]:
+            raise ValueError(f"cannot sort {table} by {order_by}")
+        where, params = self._where(filters, open_only, overdue_as_of)
+        total = self.count(table, open_only, overdue_as_of, **filters)
+        key = _COLUMNS[table][0]
+        direction = "DESC" if descending else "ASC"
+        sql = (f"SELECT * FROM {table}{where} ORDER BY {order_by} {direction}, {key} {direction} "
+               f"LIMIT ? OFFSET ?")
+        frame = self._read(sql, params + [page_size, max(page, 0) * page_size])
+        return frame, total
+
+    def aging(self, table: str = "ncr", as_of=None, **filters) -> pd.DataFrame:
+        """Open records by age bucket, with how many of them are past due"""
+        _check_table(table)
+        as_of = _iso(as_of if as_of is not None else pd.Timestamp.now())
+        where, params = self._where(filters, open_only=True)
+        age = f"julianday('{as_of}') - julianday(opened)"
+        cases = [f"WHEN {age} < {hi} THEN {i}" for i, hi in enumerate(AGING_BUCKETS.values()) if hi is not None]
+        sql = (f"SELECT CASE {' '.join(cases)} ELSE {len(AGING_BUCKETS) - 1} END AS bucket, "
+               f"COUNT(*) AS open, SUM(due_date < '{as_of}') AS overdue FROM {table}{where} GROUP BY bucket")
+        rows = self._read(sql, params).set_index("bucket")
+        frame = pd.DataFrame({"age": list(AGING_BUCKETS)})
+        frame["open"] = rows["open"].reindex(range(len(AGING_BUCKETS)), fill_value=0).to_numpy()
+        frame["overdue"] = rows["overdue"].reindex(range(len(AGING_BUCKETS)), fill_value=0).fillna(0).to_numpy()
+        return frame
+
+    def monthly_trend(self, table: str = "ncr", months: int = 12, as_of=None, **filters) -> pd.DataFrame:
+        """Records opened and closed per calendar month"""
+        _check_table(table)
+        as_of = pd.Timestamp(as_of if as_of is not None else pd.Timestamp.now())
+        first = (as_of.to_period("M") - (months - 1)).to_timestamp()
+        where, params = self._where(filters)
+        since = ("AND" if where else "WHERE") + " {col} >= ?"
+        sql = (f"SELECT strftime('%Y-%m', {{col}}) AS month, COUNT(*) AS n FROM {table}{where} "
+               f"{since} GROUP BY month")
+        opened = self._read(sql.format(col="opened"), params + [_iso(first)])
+        closed = self._read(sql.format(col="closed"), params + [_iso(first)])
+        index = pd.period_range(first, as_of, freq="M").strftime("%Y-%m")
+        return pd.DataFrame({
+            "month": pd.to_datetime(index),
+            "opened": opened.set_index("month")["n"].reindex(index, fill_value=0).to_numpy(),
+            "closed": closed.set_index("month")["n"].reindex(index, fill_value=0).to_numpy(),
+        })
+
+    def breakdown(self, by: str, table: str = "ncr", open_only: bool = True, **filters) -> pd.DataFrame:
+        """Record count (and affected quantity for NCRs) per value of an indexed column"""
+        _check_table(table)
+        if by not in FILTER_COLUMNS:
+            raise ValueError(f"cannot group by {by}")
+        where, params = self._where(filters, open_only)
+        qty = ", SUM(qty_affected) AS qty_affected" if table == "ncr" else ""
+        sql = f"SELECT {by}, COUNT(*) AS records{qty} FROM {table}{where} GROUP BY {by} ORDER BY records DESC"
+        return self._read(sql, params)
+
+    def kpis(self, as_of=None, closure_days: int = 90) -> dict:
+        """Open and overdue counts, recent closure time and CAPA effectiveness"""
+        as_of = pd.Timestamp(as_of if as_of is not None else pd.Timestamp.now())
+        today, since = _iso(as_of), _iso(as_of - pd.Timedelta(days=closure_days))
+        one = lambda sql, *p: self._one(sql, p)[0]
+        return {
+            "open_ncrs": one("SELECT COUNT(*) FROM ncr WHERE status != 'Closed'"),
+            "open_capas": one("SELECT COUNT(*) FROM capa WHERE status != 'Closed'"),
+            "overdue_ncrs": one("SELECT COUNT(*) FROM ncr WHERE status != 'Closed' AND due_date < ?", today),
+            "overdue_capas": one("SELECT COUNT(*) FROM capa WHERE status != 'Closed' AND due_date < ?", today),
+            "avg_closure_days": one("SELECT AVG(julianday(closed) - julianday(opened)) FROM ncr "
+                                    "WHERE status = 'Closed' AND closed >= ?", since),
+            "capa_effectiveness": one("SELECT AVG(effectiveness) FROM capa WHERE status = 'Closed' AND closed >= ?",
+                                      since),
+            "total_ncrs": one("SELECT COUNT(*) FROM ncr"),
+        }
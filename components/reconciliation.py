@@ -0,0 +1,151 @@
+"""
+Telit Supply Chain - Hierarchical Forecast Reconciliation
+Bottom-up, top-down and MinT-style coherent forecasts over a nested hierarchy
+"""
+
+import numpy as np
+import pandas as pd
+
+RECONCILIATION_METHODS = ["bottom_up", "top_down", "mint"]
+
+
+class Hierarchy:
+    """Nested aggregation hierarchy over leaf series.
+
+    The summing matrix is kept implicitly as one parent-index array per
+    level (leaf -> node code), i.e. the column structure of a sparse S
+    with exactly one non-zero per level. Aggregation is a sort-once
+    reduceat, so a level costs O(leaves x periods) with no dense S.
+    """
+
+    def __init__(self, leaves: pd.DataFrame, levels: list):
+        self.levels = ["total"] + list(levels) + ["leaf"]
+        self.n_leaves = len(leaves)
+        self.codes = [np.zeros(self.n_leaves, dtype=np.int64)]
+        self.labels = [np.array(["Total"], dtype=object)]
+        for level in levels:
+            # A node is the path from the root, so combine the parent code
+            # with this level's value before factorizing
+            values, names = pd.factorize(leaves[level], sort=True)
+            path = self.codes[-1] * len(names) + values
+            _, first, codes = np.unique(path, return_index=True, return_inverse=True)
+            self.codes.append(codes.astype(np.int64).ravel())
+            self.labels.append(np.asarray(names, dtype=object)[values[first]])
+        self.codes.append(np.arange(self.n_leaves, dtype=np.int64))
+        self.labels.append(np.arange(self.n_leaves))
+        self.sizes = [int(c.max()) + 1 if len(c) else 0 for c in self.codes]
+        # Parent node of each node, per level (the tree edges of S)
+        self.parents = [None]
+        for k in range(1, len(self.codes)):
+            parent = np.zeros(self.sizes[k], dtype=np.int64)
+            parent[self.codes[k]] = self.codes[k - 1]
+            self.parents.append(parent)
+        self._order = [np.argsort(c, kind="stable") for c in self.codes]
+        self._starts = [np.searchsorted(c[o], np.arange(n)) for c, o, n in zip(self.codes, self._order, self.sizes)]
+
+    @property
+    def n_nodes(self) -> int:
+        return sum(self.sizes)
+
+    def aggregate(self, leaf_values: np.ndarray, level: int) -> np.ndarray:
+        """Sum leaf rows up to one level of the hierarchy"""
+        values = np.asarray(leaf_values, dtype=np.float64)
+        if level == len(self.codes) - 1:
+            return values
+        return np.add.reduceat(values[self._order[level]], self._starts[level], axis=0)
+
+    def aggregate_all(self, leaf_values: np.ndarray) -> list:
+        """Sum leaf rows up to every level"""
+        return [self.aggregate(leaf_values, k) for k in range(len(self.codes))]
+
+    def leaf_counts(self) -> list:
+        """Number of leaves under each node, per level"""
+        return [np.bincount(c, minlength=n).astype(np.float64) for c, n in zip(self.codes, self.sizes)]
+
+    def summing_matrix_coo(self) -> tuple:
+        """Return (row, col) coordinates of the non-zeros of S, stacked top level first"""
+        offsets = np.concatenate([[0], np.cumsum(self.sizes)])
+        rows = np.concatenate([offsets[k] + c for k, c in enumerate(self.codes)])
+        cols = np.tile(np.arange(self.n_leaves), len(self.codes))
+        return rows, cols
+
+
+def _group_sum(groups: np.ndarray, values: np.ndarray, size: int) -> np.ndarray:
+    """Sum the rows of a 2D array by group index"""
+    return np.stack([np.bincount(groups, weights=values[:, h], minlength=size)
+                     for h in range(values.shape[1])], axis=1)
+
+
+def bottom_up(hierarchy: Hierarchy, base: list) -> list:
+    """Coherent forecasts from leaf forecasts alone"""
+    return hierarchy.aggregate_all(base[-1])
+
+
+def top_down(hierarchy: Hierarchy, base: list, history: np.ndarray) -> list:
+    """Disaggregate the total forecast by historical leaf proportions"""
+    totals = np.asarray(history, dtype=np.float64).sum(axis=1)
+    share = totals / totals.sum() if totals.sum() > 0 else np.full(len(totals), 1 / len(totals))
+    return hierarchy.aggregate_all(share[:, None] * np.asarray(base[0], dtype=np.float64)[0][None, :])
+
+
+def mint(hierarchy: Hierarchy, base: list, variances: list = None) -> list:
+    """MinT reconciliation with a diagonal error covariance.
+
+    For a tree, the GLS projection S(S'W^-1S)^-1S'W^-1 factorises into an
+    upward pass combining each node's own forecast with the sum of its
+    children, then a downward pass sharing each node's discrepancy with
+    its children in proportion to their variance. Both passes are per-level
+    bincounts, so cost is linear in the number of nodes. Without
+    variances, structural scaling (leaves under each node) is used.
+    """
+    depth = len(hierarchy.codes)
+    if variances is None:
+        variances = hierarchy.leaf_counts()
+    var = [np.maximum(np.asarray(v, dtype=np.float64), 1e-12) for v in variances]
+    var = [v[:, None] if v.ndim == 1 else v for v in var]
+    base = [np.asarray(b, dtype=np.float64) for b in base]
+
+    # Upward pass: posterior estimate of each node from its whole subtree
+    est, post_var = [None] * depth, [None] * depth
+    est[-1] = base[-1]
+    post_var[-1] = np.broadcast_to(var[-1], base[-1].shape).copy()
+    for k in range(depth - 2, -1, -1):
+        parent = hierarchy.parents[k + 1]
+        child_sum = _group_sum(parent, est[k + 1], hierarchy.sizes[k])
+        child_var = _group_sum(parent, post_var[k + 1], hierarchy.sizes[k])
+        own_var = np.broadcast_to(var[k], child_sum.shape)
+        precision = 1 / own_var + 1 / child_var
+        est[k] = (base[k] / own_var + child_sum / child_var) / precision
+        post_var[k] = 1 / precision
+
+    # Downward pass: push each node's final value back onto its children
+    final = [None] * depth
+    final[0] = est[0]
+    for k in range(1, depth):
+        parent = hierarchy.parents[k]
+        child_sum = _group_sum(parent, est[k], hierarchy.sizes[k - 1])
+        child_var = _group_sum(parent, post_var[k], hierarchy.sizes[k - 1])
+        gap = final[k - 1] - child_sum
+        final[k] = est[k] + post_var[k] / child_var[parent] * gap[parent]
+    return final
+
+
+def reconcile(hierarchy: Hierarchy, base: list, method: str = "mint", history: np.ndarray = None,
+              variances: list = None) -> list:
+    """Reconcile per-level base forecasts into a coherent set"""
+    if method == "bottom_up":
+        return bottom_up(hierarchy, base)
+    if method == "top_down":
+        if history is None:
+            raise ValueError("top_down reconciliation needs leaf history")
+        return top_down(hierarchy, base, history)
+    if method == "mint":
+        return mint(hierarchy, base, variances)
+    raise ValueError(f"Unknown reconciliation method: {method}")
+
+
+def rollup(leaves: pd.DataFrame, values: np.ndarray, by) -> pd.DataFrame:
+    """Sum reconciled leaf values by any leaf attribute(s)"""
+    frame = pd.DataFrame(np.asarray(values), index=leaves.index)
+    keys = [by] if isinstance(by, str) else list(by)
+    return frame.groupby([leaves[k] for k in keys], sort=False).sum()
@@ -0,0 +1,127 @@
+"""
+Telit Supply Chain - Multi-Echelon Safety Stock Optimizer
+Service-level targeted safety stock for every SKU x location in one vectorized pass
+"""
+
+import numpy as np
+import pandas as pd
+from statistics import NormalDist
+
+
+def service_level_z(service_level) -> np.ndarray:
+    """Convert cycle service levels to standard normal z-scores"""
+    levels = np.asarray(service_level, dtype=np.float64)
+    unique, inverse = np.unique(levels, return_inverse=True)
+    z = np.array([NormalDist().inv_cdf(min(max(p, 1e-6), 1 - 1e-6)) for p in unique])
+    return z[inverse].reshape(levels.shape)
+
+
+def echelon_matrix(hub_of: np.ndarray) -> np.ndarray:
+    """Build the location x location roll-up matrix of the network.
+
+    hub_of[j] is the index of the hub replenishing location j, or -1 when
+    j is replenished directly by suppliers. Column h of the result sums
+    every location whose echelon demand flows through h.
+    """
+    hub_of = np.asarray(hub_of)
+    n = len(hub_of)
+    m = np.eye(n)
+    children = np.flatnonzero(hub_of >= 0)
+    m[children, hub_of[children]] = 1.0
+    return m
+
+
+def optimize_safety_stock(mean_daily: np.ndarray, std_daily: np.ndarray, hub_of: np.ndarray,
+                          transfer_days: np.ndarray, supplier_lead_days: np.ndarray,
+                          supplier_lead_std: np.ndarray, service_level=0.95) -> dict:
+    """Compute safety stock for a two-echelon network.
+
+    Hubs (hub_of == -1) carry echelon stock against pooled demand of
+    their own and downstream locations over the supplier lead time.
+    Downstream locations carry local stock over the hub transfer time,
+    assuming the hub quotes immediate service. Demand arrays are
+    SKU x location; supplier lead times are per SKU.
+    """
+    mean_daily = np.asarray(mean_daily, dtype=np.float64)
+    var_daily = np.asarray(std_daily, dtype=np.float64) ** 2
+    hub_of = np.asarray(hub_of)
+    is_hub = hub_of < 0
+    z = service_level_z(service_level)
+    if z.ndim == 1:
+        z = z[:, None]
+
+    hubs = np.flatnonzero(is_hub)
+    roll_up = echelon_matrix(hub_of)[:, hubs]
+    echelon_mean = mean_daily @ roll_up
+    echelon_var = var_daily @ roll_up
+
+    lead = np.asarray(supplier_lead_days, dtype=np.float64)[:, None]
+    lead_std = np.asarray(supplier_lead_std, dtype=np.float64)[:, None]
+    sigma = np.sqrt(np.asarray(transfer_days, dtype=np.float64)[None, :] * var_daily)
+    sigma[:, hubs] = np.sqrt(lead * echelon_var + echelon_mean ** 2 * lead_std ** 2)
+
+    safety_stock = np.ceil(z * sigma)
+    cover_demand = mean_daily.copy()
+    cover_demand[:, hubs] = echelon_mean
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weeks = np.where(cover_demand > 0, safety_stock / (cover_demand * 7), 0.0)
+    return {"safety_stock": safety_stock, "weeks_of_cover": weeks, "cover_demand": cover_demand}
+
+
+def safety_stock_plan(skus: list, locations: list, result: dict, current_safety_stock: np.ndarray,
+                      unit_cost: np.ndarray) -> pd.DataFrame:
+    """Flatten an optimizer result with working-capital deltas per SKU x location"""
+    n_sku, n_loc = result["safety_stock"].shape
+    current = np.asarray(current_safety_stock, dtype=np.float64).reshape(n_sku, n_loc)
+    cost = np.broadcast_to(np.asarray(unit_cost, dtype=np.float64).reshape(-1, 1), (n_sku, n_loc))
+    cover = result["cover_demand"] * 7
+    with np.errstate(divide="ignore", invalid="ignore"):
+        current_weeks = np.where(cover > 0, current / cover, 0.0)
+    optimized = result["safety_stock"]
+    return pd.DataFrame({
+        "sku": np.repeat(np.array(skus, dtype=object), n_loc),
+        "location": np.tile(np.array(locations, dtype=object), n_sku),
+        "current_ss": current.ravel(),
+        "current_weeks": current_weeks.ravel().round(1),
+        "optimized_ss": optimized.ravel(),
+        "optimized_weeks": result["weeks_of_cover"].ravel().round(1),
+        "change_units": (optimized - current).ravel(),
+        "working_capital_change": ((optimized - current) * cost).ravel(),
+    })
+
+
+def working_capital_impact(plan: pd.DataFrame) -> dict:
+    """Summarise the working-capital effect of a safety stock plan"""
+    delta = plan["working_capital_change"].to_numpy()
+    return {
+        "released": float(-delta[delta < 0].sum()),
+        "invested": float(delta[delta > 0].sum()),
+        "net_change": float(delta.sum()),
+        "locations_increase": int((delta > 0).sum()),
+        "locations_decrease": int((delta < 0).sum()),
+    }
+
+
+def safety_stock_recommendations(plan: pd.DataFrame, top_n: int = 5) -> list:
+    """Turn the largest SKU-level changes into planner-facing recommendations"""
+    by_sku = plan.groupby("sku", sort=False).agg(
+        current_ss=("current_ss", "sum"),
+        optimized_ss=("optimized_ss", "sum"),
+        working_capital_change=("working_capital_change", "sum"),
+    )
+    by_sku = by_sku[by_sku["current_ss"] > 0]
+    order = by_sku["working_capital_change"].abs().sort_values(ascending=False).index[:top_n]
+    recs = []
+    for sku in order:
+        row = by_sku.loc[sku]
+        pct = (row["optimized_ss"] / row["current_ss"] - 1) * 100
+        wc = row["working_capital_change"]
+        action = "Increase" if pct > 0 else "Reduce"
+        recs.append({
+            "sku": sku,
+            "change_pct": round(float(pct), 1),
+            "working_capital_change": float(wc),
+            "message": f"{action} {sku} safety stock by {abs(pct):.0f}% "
+                       f"({'ties up' if wc > 0 else 'frees'} ${abs(wc) / 1000:,.0f}K working capital)",
+        })
+    return recs
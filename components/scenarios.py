@@ -0,0 +1,165 @@
+"""
+Telit Supply Chain - Scenario Re-Forecast Engine
+Vectorized what-if levers over the cached SKU-level base forecast
+"""
+
+import numpy as np
+import pandas as pd
+
+# Baseline lever settings; a scenario is expressed as deviations from these
+BASELINE_LEVERS = {
+    "market_growth": 15,
+    "auto_growth": 32,
+    "meter_growth": 12,
+    "supply_constraint": "Normal",
+    "capacity_util": 85,
+    "fx_impact": 0,
+    "inflation": 5,
+    "recession_risk": "None",
+}
+
+SUPPLY_CONSTRAINT_FACTOR = {"Normal": 1.0, "Constrained (-15%)": 0.85, "Severe (-30%)": 0.70}
+RECESSION_FACTOR = {"None": 1.0, "Mild (-5%)": 0.95, "Moderate (-15%)": 0.85, "Severe (-25%)": 0.75}
+
+# Share of nameplate capacity the base plan's peak month uses
+PLANNED_LOAD = 0.75
+
+# Categories whose supply depends on the 5G chipset lever
+CHIPSET_CONSTRAINED_CATEGORIES = {"Cellular 5G"}
+
+
+def _annual_ramp(pct: float, months: int) -> np.ndarray:
+    """Monthly multiplier compounding an annual growth deviation"""
+    return (1 + pct / 100) ** (np.arange(1, months + 1) / 12)
+
+
+def scenario_multipliers(levers: dict, segments: np.ndarray, regions: np.ndarray, months: int) -> np.ndarray:
+    """Build the leaf x month demand multiplier for a set of levers.
+
+    Each lever touches a subset of leaves (by end-market segment or
+    region) and is combined multiplicatively, so the result is
+    one broadcast product instead of a sum of scalar impacts.
+    """
+    lv = {**BASELINE_LEVERS, **levers}
+    n = len(segments)
+    mult = np.ones((n, months))
+    mult *= _annual_ramp(lv["market_growth"] - BASELINE_LEVERS["market_growth"], months)[None, :]
+    auto = _annual_ramp(lv["auto_growth"] - BASELINE_LEVERS["auto_growth"], months)
+    meter = _annual_ramp(lv["meter_growth"] - BASELINE_LEVERS["meter_growth"], months)
+    mult = np.where((segments == "Automotive")[:, None], mult * auto[None, :], mult)
+    mult = np.where((segments == "Smart Energy")[:, None], mult * meter[None, :], mult)
+    # EUR-invoiced customers' demand moves with half the EUR/USD swing
+    mult = np.where((regions == "EMEA")[:, None], mult * (1 + lv["fx_impact"] / 100 * 0.5), mult)
+    mult *= RECESSION_FACTOR[lv["recession_risk"]]
+    return mult
+
+
+def supply_caps(levers: dict, categories: np.ndarray, base: np.ndarray) -> tuple:
+    """Pooled monthly capacity per category implied by chipset and capacity levers.
+
+    Each category's nameplate capacity is sized so the base plan's peak
+    month loads it to PLANNED_LOAD; the capacity lever is the share of
+    nameplate available, so the default setting leaves headroom above
+    the base plan. Returns each leaf's category code and the category x
+    month capacity.
+    """
+    lv = {**BASELINE_LEVERS, **levers}
+    codes, names = pd.factorize(categories)
+    load = np.zeros((len(names), base.shape[1]))
+    np.add.at(load, codes, base)
+    nameplate = load.max(axis=1) / PLANNED_LOAD
+    chipset = np.where(np.isin(names, list(CHIPSET_CONSTRAINED_CATEGORIES)),
+                       SUPPLY_CONSTRAINT_FACTOR[lv["supply_constraint"]], 1.0)
+    available = nameplate * chipset * lv["capacity_util"] / 100
+    return codes, np.repeat(available[:, None], base.shape[1], axis=1)
+
+
+def run_scenario(base: np.ndarray, leaves: pd.DataFrame, levers: dict, prices: np.ndarray,
+                 unit_costs: np.ndarray) -> dict:
+    """Apply levers to the base forecast cube.
+
+    Returns unconstrained demand, supply-capped shipments, revenue and
+    margin per leaf x month, plus the capacity gap. base is leaf x month;
+    prices and unit_costs are per leaf. When a category's demand exceeds
+    its pooled capacity in a month, every leaf in it ships the same share.
+    """
+    lv = {**BASELINE_LEVERS, **levers}
+    months = base.shape[1]
+    demand = base * scenario_multipliers(lv, leaves["segment"].to_numpy(), leaves["region"].to_numpy(), months)
+    codes, capacity = supply_caps(lv, leaves["category"].to_numpy(), base)
+    pooled = np.zeros_like(capacity)
+    np.add.at(pooled, codes, demand)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fill = np.where(pooled > capacity, capacity / pooled, 1.0)
+    shipments = demand * fill[codes]
+    cost = unit_costs * (1 + (lv["inflation"] - BASELINE_LEVERS["inflation"]) / 100)
+    revenue = shipments * prices[:, None]
+    return {
+        "levers": lv,
+        "demand": demand,
+        "shipments": shipments,
+        "revenue": revenue,
+        "margin": revenue - shipments * cost[:, None],
+        "capacity_gap": demand - shipments,
+    }
+
+
+def scenario_summary(result: dict, base: np.ndarray, prices: np.ndarray) -> dict:
+    """Headline totals of a scenario against the base forecast"""
+    base_revenue = float((base * prices[:, None]).sum())
+    return {
+        "base_units": float(base.sum()),
+        "demand_units": float(result["demand"].sum()),
+        "shipped_units": float(result["shipments"].sum()),
+        "unfilled_units": float(result["capacity_gap"].sum()),
+        "revenue": float(result["revenue"].sum()),
+        "revenue_change": float(result["revenue"].sum()) - base_revenue,
+        "margin": float(result["margin"].sum()),
+    }
+
+
+class ScenarioStore:
+    """Saved scenarios over one base forecast cube, with diffing.
+
+    The base arrays are shared read-only; each session keeps its own
+    store so saved scenarios never collide between users.
+    """
+
+    def __init__(self, base: np.ndarray, leaves: pd.DataFrame, prices: np.ndarray, unit_costs: np.ndarray):
+        self.base = base
+        self.leaves = leaves
+        self.prices = prices
+        self.unit_costs = unit_costs
+        self.saved = {}
+
+    def run(self, levers: dict) -> dict:
+        """Evaluate levers without saving"""
+        return run_scenario(self.base, self.leaves, levers, self.prices, self.unit_costs)
+
+    def save(self, name: str, levers: dict) -> dict:
+        """Evaluate levers and keep the result under a name"""
+        self.saved[name] = self.run(levers)
+        return self.saved[name]
+
+    def delete(self, name: str):
+        self.saved.pop(name, None)
+
+    def names(self) -> list:
+        return list(self.saved)
+
+    def diff(self, a: str, b: str, by: str = "sku") -> pd.DataFrame:
+        """Compare two saved scenarios, aggregated by a leaf attribute"""
+        ra, rb = self.saved[a], self.saved[b]
+        frame = pd.DataFrame({
+            by: self.leaves[by].to_numpy(),
+            "demand_a": ra["demand"].sum(axis=1),
+            "demand_b": rb["demand"].sum(axis=1),
+            "shipped_a": ra["shipments"].sum(axis=1),
+            "shipped_b": rb["shipments"].sum(axis=1),
+            "revenue_a": ra["revenue"].sum(axis=1),
+            "revenue_b": rb["revenue"].sum(axis=1),
+        })
+        out = frame.groupby(by, sort=False).sum()
+        out["demand_change"] = out["demand_b"] - out["demand_a"]
+        out["revenue_change"] = out["revenue_b"] - out["revenue_a"]
+        return out.sort_values("revenue_change", key=np.abs, ascending=False)
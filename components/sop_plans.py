@@ -0,0 +1,220 @@
+"""
+Telit Supply Chain - S&OP Plan Versioning
+Copy-on-write plan versions with branching, diff and three-way merge
+"""
+
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Measures held for every SKU-month in a plan
+PLAN_MEASURES = ["demand", "supply", "inventory"]
+
+
+class PlanVersion:
+    """One named plan version: per-measure lists of shared row chunks"""
+
+    def __init__(self, name: str, parent: str, chunks: dict, author: str = None, message: str = ""):
+        self.name = name
+        self.parent = parent
+        self.chunks = chunks
+        self.author = author
+        self.message = message
+        self.created = datetime.now()
+        self.edits = 0
+        # The parent's chunk lists when this version branched: the base for merges
+        self.forked = {m: list(c) for m, c in chunks.items()}
+        # Chunks this version allocated itself and may write in place
+        self._owned = set()
+
+
+class PlanStore:
+    """Versioned S&OP plans with copy-on-write branches.
+
+    Each measure is split into row chunks of chunk_rows SKUs. A branch
+    copies only the lists of chunk references, so creating a what-if
+    version is O(chunks), and an edit copies just the chunks it touches.
+    Versions that still share a chunk object are equal on it by
+    construction, so diff and merge skip shared chunks entirely and
+    compare cells only where either side actually changed. A chunk is
+    never written in place once shared, so the chunk lists a version
+    snapshots at branch time keep the base it forked from even after the
+    parent is edited.
+    """
+
+    def __init__(self, skus: list, months: list, plans: dict, chunk_rows: int = 256):
+        self.skus = pd.Index(skus)
+        self.months = list(months)
+        self.chunk_rows = chunk_rows
+        self._lock = threading.Lock()
+        chunks = {}
+        for measure in PLAN_MEASURES:
+            values = np.asarray(plans[measure], dtype=np.float64)
+            chunks[measure] = [values[i:i + chunk_rows].copy() for i in range(0, len(self.skus), chunk_rows)]
+        root = PlanVersion("baseline", None, chunks, message="Statistical baseline")
+        root._owned = {(m, c) for m in PLAN_MEASURES for c in range(len(chunks[m]))}
+        self.versions = {"baseline": root}
+
+    def branch(self, name: str, source: str = "baseline", author: str = None, message: str = "") -> PlanVersion:
+        """Create a new version sharing every chunk with its source"""
+        with self._lock:
+            if name in self.versions:
+                raise ValueError(f"Plan version already exists: {name}")
+            parent = self.versions[source]
+            version = PlanVersion(name, source, {m: list(c) for m, c in parent.chunks.items()}, author, message)
+            # Both sides now share every chunk, so neither may write in place
+            parent._owned.clear()
+            self.versions[name] = version
+            return version
+
+    def set(self, name: str, measure: str, sku_idx: np.ndarray, month_idx: np.ndarray, values: np.ndarray):
+        """Overwrite cells of one measure, copying only the chunks touched"""
+        sku_idx = np.asarray(sku_idx, dtype=np.int64)
+        month_idx = np.broadcast_to(np.asarray(month_idx, dtype=np.int64), sku_idx.shape)
+        values = np.broadcast_to(np.asarray(values, dtype=np.float64), sku_idx.shape)
+        with self._lock:
+            self._write(self.versions[name], measure, sku_idx, month_idx, values)
+
+    def _write(self, version: PlanVersion, measure: str, sku_idx: np.ndarray, month_idx: np.ndarray,
+               values: np.ndarray):
+        # Callers hold the lock
+        chunk_of, row = np.divmod(sku_idx, self.chunk_rows)
+        for c in np.unique(chunk_of):
+            if (measure, c) not in version._owned:
+                version.chunks[measure][c] = version.chunks[measure][c].copy()
+                version._owned.add((measure, c))
+            sel = chunk_of == c
+            version.chunks[measure][c][row[sel], month_idx[sel]] = values[sel]
+        version.edits += len(sku_idx)
+
+    def adjust(self, name: str, measure: str, sku_idx: np.ndarray, month_idx: np.ndarray, factor):
+        """Scale existing cells, e.g. a sales override of +10% (read and write under one lock)"""
+        sku_idx = np.asarray(sku_idx, dtype=np.int64)
+        month_idx = np.broadcast_to(np.asarray(month_idx, dtype=np.int64), sku_idx.shape)
+        with self._lock:
+            current = self.cells(name, measure, sku_idx, month_idx)
+            values = np.broadcast_to(current * np.asarray(factor, dtype=np.float64), sku_idx.shape)
+            self._write(self.versions[name], measure, sku_idx, month_idx, values)
+
+    def cells(self, name: str, measure: str, sku_idx: np.ndarray, month_idx: np.ndarray) -> np.ndarray:
+        """Read individual cells of one measure"""
+        sku_idx = np.asarray(sku_idx, dtype=np.int64)
+        month_idx = np.broadcast_to(np.asarray(month_idx, dtype=np.int64), sku_idx.shape)
+        chunk_of, row = np.divmod(sku_idx, self.chunk_rows)
+        chunks = self.versions[name].chunks[measure]
+        out = np.empty(len(sku_idx))
+        for c in np.unique(chunk_of):
+            sel = chunk_of == c
+            out[sel] = chunks[c][row[sel], month_idx[sel]]
+        return out
+
+    def get(self, name: str, measure: str) -> np.ndarray:
+        """Materialise one measure of a version as a SKU x month array"""
+        return np.vstack(self.versions[name].chunks[measure])
+
+    def lineage(self, name: str) -> list:
+        """Version names from this version back to the baseline"""
+        chain = []
+        while name is not None:
+            chain.append(name)
+            name = self.versions[name].parent
+        return chain
+
+    def merge_base(self, a: str, b: str) -> str:
+        """Closest common ancestor of two versions"""
+        ancestors = set(self.lineage(a))
+        return next(v for v in self.lineage(b) if v in ancestors)
+
+    def _fork(self, name: str, base: str) -> PlanVersion:
+        """The version on name's lineage that branched directly from base (None if name is base)"""
+        child = None
+        while name != base:
+            child, name = self.versions[name], self.versions[name].parent
+        return child
+
+    def diff(self, a: str, b: str, measures: list = None) -> pd.DataFrame:
+        """Cells that differ between two versions"""
+        frames = []
+        va, vb = self.versions[a], self.versions[b]
+        months = np.asarray(self.months, dtype=object)
+        for measure in measures or PLAN_MEASURES:
+            for c, (x, y) in enumerate(zip(va.chunks[measure], vb.chunks[measure])):
+                if x is y:
+                    continue
+                rows, cols = np.nonzero(x != y)
+                if not len(rows):
+                    continue
+                frames.append(pd.DataFrame({
+                    "measure": measure,
+                    "sku": self.skus[c * self.chunk_rows + rows],
+                    "month": months[cols],
+                    a: x[rows, cols],
+                    b: y[rows, cols],
+                    "delta": y[rows, cols] - x[rows, cols],
+                }))
+        if not frames:
+            return pd.DataFrame(columns=["measure", "sku", "month", a, b, "delta"])
+        return pd.concat(frames, ignore_index=True)
+
+    def merge(self, source: str, target: str, into: str = None, prefer: str = "target",
+              author: str = None) -> tuple:
+        """Three-way merge of source into target against their common ancestor.
+
+        The ancestor is taken as it stood when the earlier of the two
+        lines branched from it, so edits made to it afterwards do not move
+        the base. Cells changed on one side only take that side's value.
+        Cells changed on both sides to different values are conflicts,
+        resolved in favour of prefer ("source" or "target") and returned
+        for review. Returns (merged version name, conflicts frame).
+        """
+        ancestor = self.merge_base(source, target)
+        forks = [v for v in (self._fork(source, ancestor), self._fork(target, ancestor)) if v is not None]
+        base_chunks = min(forks, key=lambda v: v.created).forked if forks else self.versions[ancestor].chunks
+        into = into or f"{target}+{source}"
+        merged = self.branch(into, target, author, f"Merge {source} into {target}")
+        vs = self.versions[source]
+        conflicts = []
+        with self._lock:
+            for measure in PLAN_MEASURES:
+                for c, (b, s, t) in enumerate(zip(base_chunks[measure], vs.chunks[measure],
+                                                  merged.chunks[measure])):
+                    if s is b or s is t:
+                        continue
+                    if t is b:
+                        # Only the source touched this chunk: share it as-is
+                        merged.chunks[measure][c] = s
+                        merged._owned.discard((measure, c))
+                        vs._owned.discard((measure, c))
+                        continue
+                    out = t.copy()
+                    src_changed = s != b
+                    both = src_changed & (t != b) & (s != t)
+                    take_source = src_changed & ~both if prefer == "target" else src_changed
+                    out[take_source] = s[take_source]
+                    merged.chunks[measure][c] = out
+                    merged._owned.add((measure, c))
+                    rows, cols = np.nonzero(both)
+                    for r, m in zip(rows, cols):
+                        conflicts.append({"measure": measure, "sku": self.skus[c * self.chunk_rows + r],
+                                          "month": self.months[m], "base": b[r, m], source: s[r, m], target: t[r, m]})
+        return into, pd.DataFrame(conflicts)
+
+    def log(self) -> pd.DataFrame:
+        """All versions with lineage and how much of the baseline they share"""
+        root = self.versions["baseline"]
+        rows = []
+        for v in self.versions.values():
+            shared = sum(x is y for m in PLAN_MEASURES for x, y in zip(v.chunks[m], root.chunks[m]))
+            total = sum(len(v.chunks[m]) for m in PLAN_MEASURES)
+            rows.append({
+                "version": v.name,
+                "parent": v.parent,
+                "author": v.author,
+                "message": v.message,
+                "created": v.created,
+                "edits": v.edits,
+                "shared_chunks_pct": shared / total * 100 if total else 100.0,
+            })
+        return pd.DataFrame(rows)
@@ -0,0 +1,145 @@
+"""
+Telit Supply Chain - Sourcing Exposure Analysis
+Single- and dual-source exposure from multi-level BOMs and the approved vendor list
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _csr(keys: np.ndarray, values: np.ndarray, n_keys: int) -> tuple:
+    """Group values by integer key into (offsets, values) index arrays"""
+    order = np.argsort(keys, kind="stable")
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(keys, minlength=n_keys))])
+    return offsets, values[order], order
+
+
+def explode_bom(bom: pd.DataFrame, products: list, item_index: pd.Index, max_depth: int = 20) -> pd.DataFrame:
+    """Flatten a multi-level BOM to (product, component, extended quantity) rows.
+
+    bom has parent, child and qty_per columns. Expansion is one vectorized
+    join per BOM level: every frontier row whose item has children is
+    replaced by those children with quantities multiplied through.
+    """
+    parent = item_index.get_indexer(bom["parent"])
+    child = item_index.get_indexer(bom["child"])
+    qty = bom["qty_per"].to_numpy(dtype=np.float64)
+    offsets, _, order = _csr(parent, child, len(item_index))
+    child, qty = child[order], qty[order]
+    n_children = np.diff(offsets)
+
+    root = np.arange(len(products))
+    item = item_index.get_indexer(products)
+    ext = np.ones(len(products))
+    leaves = []
+    for _ in range(max_depth):
+        has_children = n_children[item] > 0
+        leaves.append((root[~has_children], item[~has_children], ext[~has_children]))
+        root, item, ext = root[has_children], item[has_children], ext[has_children]
+        if not len(item):
+            break
+        counts = n_children[item]
+        # Positions of every child of every frontier item in the CSR arrays
+        starts = np.repeat(offsets[item], counts)
+        pos = starts + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        root, ext = np.repeat(root, counts), np.repeat(ext, counts) * qty[pos]
+        item = child[pos]
+    else:
+        raise ValueError("BOM deeper than max_depth; check for cycles")
+    root, item, ext = (np.concatenate(p) for p in zip(*leaves))
+    flat = pd.DataFrame({"product": root, "component": item, "qty": ext})
+    return flat.groupby(["product", "component"], as_index=False, sort=False)["qty"].sum()
+
+
+class SourcingExposure:
+    """Inverted indexes from product to component and component to supplier.
+
+    Both indexes are CSR-style integer arrays, so any exposure question
+    ("revenue that depends on a single-source component from country X")
+    is a component mask pushed through the product index with one
+    bincount, linear in BOM entries.
+    """
+
+    def __init__(self, bom: pd.DataFrame, avl: pd.DataFrame, products: list, revenue: np.ndarray,
+                 supplier_country: dict):
+        items = pd.Index(pd.unique(pd.concat([pd.Series(products), bom["parent"], bom["child"], avl["component"]])))
+        self.items = items
+        self.products = list(products)
+        self.revenue = np.asarray(revenue, dtype=np.float64)
+        flat = explode_bom(bom, self.products, items)
+        self.entry_product = flat["product"].to_numpy()
+        self.entry_component = flat["component"].to_numpy()
+        self.entry_qty = flat["qty"].to_numpy()
+
+        # Component -> approved suppliers
+        self.suppliers = pd.Index(pd.unique(avl["supplier_id"]))
+        self.avl_component = items.get_indexer(avl["component"])
+        self.avl_supplier = self.suppliers.get_indexer(avl["supplier_id"])
+        self.supplier_country = np.array([supplier_country.get(s, "Unknown") for s in self.suppliers], dtype=object)
+        self.n_sources = np.bincount(self.avl_component, minlength=len(items))
+        # Sole supplier of each single-source component (-1 otherwise)
+        self.sole_supplier = np.full(len(items), -1)
+        single = self.n_sources[self.avl_component] == 1
+        self.sole_supplier[self.avl_component[single]] = self.avl_supplier[single]
+        self.purchased = np.zeros(len(items), dtype=bool)
+        self.purchased[self.entry_component] = True
+
+    def component_mask(self, max_sources: int = 1, country: str = None, supplier: str = None) -> np.ndarray:
+        """Purchased components with at most max_sources approved suppliers, optionally
+        restricted to those sourced from a country or a given supplier"""
+        mask = self.purchased & (self.n_sources <= max_sources)
+        if country is not None or supplier is not None:
+            rows = np.ones(len(self.avl_supplier), dtype=bool)
+            if country is not None:
+                rows &= self.supplier_country[self.avl_supplier] == country
+            if supplier is not None:
+                rows &= self.avl_supplier == self.suppliers.get_loc(supplier)
+            mask &= np.bincount(self.avl_component[rows], minlength=len(self.items)) > 0
+        return mask
+
+    def exposed_products(self, component_mask: np.ndarray) -> np.ndarray:
+        """Products using at least one masked component"""
+        hits = np.bincount(self.entry_product, weights=component_mask[self.entry_component],
+                           minlength=len(self.products))
+        return hits > 0
+
+    def exposed_revenue(self, max_sources: int = 1, country: str = None, supplier: str = None) -> float:
+        """Revenue of products depending on any component matching the exposure filter"""
+        return float(self.revenue[self.exposed_products(self.component_mask(max_sources, country, supplier))].sum())
+
+    def component_table(self, max_sources: int = 2) -> pd.DataFrame:
+        """Exposed components with their sources, products using them and revenue at risk"""
+        mask = self.component_mask(max_sources)
+        entries = mask[self.entry_component]
+        comp, prod = self.entry_component[entries], self.entry_product[entries]
+        products_using = np.bincount(comp, minlength=len(self.items))
+        revenue_at_risk = np.bincount(comp, weights=self.revenue[prod], minlength=len(self.items))
+        idx = np.flatnonzero(mask)
+        avl = pd.DataFrame({"component": self.avl_component, "supplier": self.suppliers[self.avl_supplier],
+                            "country": self.supplier_country[self.avl_supplier]})
+        avl = avl[mask[avl["component"]]].groupby("component").agg(
+            suppliers=("supplier", ", ".join), countries=("country", lambda c: ", ".join(sorted(set(c)))))
+        return pd.DataFrame({
+            "component": self.items[idx],
+            "sources": self.n_sources[idx],
+            "suppliers": avl["suppliers"].reindex(idx).to_numpy(),
+            "countries": avl["countries"].reindex(idx).to_numpy(),
+            "products_using": products_using[idx],
+            "revenue_at_risk": revenue_at_risk[idx],
+        }).sort_values("revenue_at_risk", ascending=False, ignore_index=True)
+
+    def supplier_table(self) -> pd.DataFrame:
+        """Revenue depending on components each supplier is the sole source for"""
+        sole = self.sole_supplier[self.entry_component]
+        keep = sole >= 0
+        # One product counts once per supplier however many sole-source parts it uses
+        pairs = np.unique(sole[keep] * len(self.products) + self.entry_product[keep])
+        sup, prod = np.divmod(pairs, len(self.products))
+        return pd.DataFrame({
+            "supplier": self.suppliers,
+            "country": self.supplier_country,
+            "sole_source_components": np.bincount(self.sole_supplier[self.purchased & (self.sole_supplier >= 0)],
+                                                  minlength=len(self.suppliers)),
+            "products_exposed": np.bincount(sup, minlength=len(self.suppliers)),
+            "revenue_exposed": np.bincount(sup, weights=self.revenue[prod], minlength=len(self.suppliers)),
+        }).sort_values("revenue_exposed", ascending=False, ignore_index=True)
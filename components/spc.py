@@ -0,0 +1,244 @@
+"""
+Telit Supply Chain - Statistical Process Control
+X-bar/R, I-MR and EWMA charts with Nelson rule checks over rolling control limits
+"""
+
+import numpy as np
+import pandas as pd
+
+# Shewhart constants by subgroup size: (d2, D3, D4, A2); size 1 charts moving ranges of 2
+CHART_CONSTANTS = {
+    1: (1.128, 0.0, 3.267, 2.660),
+    2: (1.128, 0.0, 3.267, 1.880),
+    3: (1.693, 0.0, 2.574, 1.023),
+    4: (2.059, 0.0, 2.282, 0.729),
+    5: (2.326, 0.0, 2.114, 0.577),
+    6: (2.534, 0.0, 2.004, 0.483),
+    7: (2.704, 0.076, 1.924, 0.419),
+    8: (2.847, 0.136, 1.864, 0.373),
+    9: (2.970, 0.184, 1.816, 0.337),
+    10: (3.078, 0.223, 1.777, 0.308),
+}
+
+NELSON_RULES = {
+    1: "1 point beyond 3σ",
+    2: "9 points on one side of centre",
+    3: "6 points steadily rising or falling",
+    4: "14 points alternating up and down",
+    5: "2 of 3 points beyond 2σ, same side",
+    6: "4 of 5 points beyond 1σ, same side",
+    7: "15 points within 1σ",
+    8: "8 points beyond 1σ, either side",
+}
+
+# The Western Electric zone rules as Nelson rule numbers
+WESTERN_ELECTRIC_RULES = (1, 2, 5, 6)
+
+# Points a rule can look back over
+RULE_LOOKBACK = 15
+
+
+def _rolling_count(mask: np.ndarray, length: int) -> np.ndarray:
+    """Number of True values in the trailing window ending at each point (last axis)"""
+    c = np.cumsum(mask, axis=-1, dtype=np.int32)
+    out = c.copy()
+    out[..., length:] -= c[..., :-length]
+    return out
+
+
+def _pad_front(mask: np.ndarray, width: int) -> np.ndarray:
+    return np.concatenate([np.zeros(mask.shape[:-1] + (width,), dtype=bool), mask], axis=-1)
+
+
+def nelson_rules(z: np.ndarray) -> np.ndarray:
+    """Rule violations for standardized points (last axis = time).
+
+    z is (point - centre) / sigma, NaN where no limits apply. Returns a
+    boolean array with a trailing axis of the 8 Nelson rules, flagged at
+    the point that completes each pattern.
+    """
+    z = np.asarray(z, dtype=np.float64)
+    above, below = z > 0, z < 0
+    step = np.diff(z, axis=-1)
+    rising, falling = step > 0, step < 0
+    alternating = (step[..., 1:] * step[..., :-1]) < 0
+    rules = [
+        np.abs(z) > 3,
+        (_rolling_count(above, 9) == 9) | (_rolling_count(below, 9) == 9),
+        _pad_front((_rolling_count(rising, 5) == 5) | (_rolling_count(falling, 5) == 5), 1),
+        _pad_front(_rolling_count(alternating, 12) == 12, 2),
+        (_rolling_count(z > 2, 3) >= 2) | (_rolling_count(z < -2, 3) >= 2),
+        (_rolling_count(z > 1, 5) >= 4) | (_rolling_count(z < -1, 5) >= 4),
+        _rolling_count(np.abs(z) < 1, 15) == 15,
+        _rolling_count(np.abs(z) > 1, 8) == 8,
+    ]
+    return np.stack(rules, axis=-1)
+
+
+def rule_mask(rules: tuple) -> int:
+    """Bitmask selecting a set of rule numbers"""
+    return sum(1 << (r - 1) for r in rules)
+
+
+def describe_rules(bits: int) -> str:
+    """Comma-separated rule numbers set in a bitmask"""
+    return ", ".join(str(r) for r in NELSON_RULES if bits & (1 << (r - 1)))
+
+
+class SpcMonitor:
+    """Control charts for many measurement streams maintained point by point.
+
+    Each stream (e.g. line x station x parameter) keeps a ring buffer of
+    plotted points and running sums over the trailing `window` subgroups,
+    so control limits roll forward in O(1) per subgroup. A new point is
+    judged against the limits of the window before it, and the Nelson
+    rules are checked over its last RULE_LOOKBACK points. Ingest takes
+    one subgroup for any number of streams and updates them together.
+    Subgroup size 1 gives an I-MR chart; the EWMA is tracked alongside.
+    A subgroup with any missing value is plotted as a gap and kept out of
+    the running sums, so limits carry on from the points that are present.
+    """
+
+    def __init__(self, streams: pd.DataFrame, subgroup_size: int = 5, window: int = 25, history: int = 500,
+                 ewma_lambda: float = 0.2, ewma_width: float = 3.0):
+        if subgroup_size not in CHART_CONSTANTS:
+            raise ValueError(f"subgroup size must be 1-{max(CHART_CONSTANTS)}")
+        if history <= window:
+            raise ValueError("history must be longer than the limit window")
+        self.streams = streams.reset_index(drop=True)
+        self.subgroup_size = subgroup_size
+        self.window = window
+        self.history = history
+        self.ewma_lambda = ewma_lambda
+        self.ewma_width = ewma_width
+        self.d2, self.D3, self.D4, self.A2 = CHART_CONSTANTS[subgroup_size]
+        n = len(self.streams)
+        ring = lambda: np.full((n, history), np.nan)
+        self.time = np.zeros((n, history), dtype="datetime64[ns]")
+        self.value, self.spread = ring(), ring()
+        self.cl, self.ucl, self.lcl, self.r_cl, self.r_ucl, self.r_lcl = (ring() for _ in range(6))
+        self.ewma, self.ewma_ucl, self.ewma_lcl = ring(), ring(), ring()
+        self.rules = np.zeros((n, history), dtype=np.uint8)
+        self.count = np.zeros(n, dtype=np.int64)
+        self._sum_x = np.zeros(n)
+        self._n_x = np.zeros(n, dtype=np.int64)
+        self._sum_r = np.zeros(n)
+        self._n_r = np.zeros(n, dtype=np.int64)
+        self._last_x = np.full(n, np.nan)
+        self._ewma = np.full(n, np.nan)
+
+    def ingest(self, stream_idx: np.ndarray, subgroups: np.ndarray, times=None) -> np.ndarray:
+        """Add one subgroup (row of subgroup_size values) per listed stream.
+
+        Returns the rule bitmask for each new point. A stream may appear
+        more than once; its subgroups are applied in order.
+        """
+        stream_idx = np.asarray(stream_idx, dtype=np.int64)
+        subgroups = np.asarray(subgroups, dtype=np.float64).reshape(len(stream_idx), -1)
+        times = np.broadcast_to(np.asarray(times if times is not None else np.datetime64("now"),
+                                           dtype="datetime64[ns]"), stream_idx.shape)
+        # Occurrence rank within the batch, so repeated streams are applied in order
+        order = np.argsort(stream_idx, kind="stable")
+        starts = np.r_[0, np.flatnonzero(np.diff(stream_idx[order])) + 1]
+        rank = np.empty(len(stream_idx), dtype=np.int64)
+        rank[order] = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+        flags = np.zeros(len(stream_idx), dtype=np.uint8)
+        for r in range(int(rank.max()) + 1 if len(rank) else 0):
+            rows = np.flatnonzero(rank == r)
+            flags[rows] = self._ingest_once(stream_idx[rows], subgroups[rows], times[rows])
+        return flags
+
+    def _ingest_once(self, s: np.ndarray, subgroups: np.ndarray, times: np.ndarray) -> np.ndarray:
+        x = subgroups.mean(axis=1)
+        if self.subgroup_size == 1:
+            spread = np.abs(x - self._last_x[s])
+        else:
+            spread = np.ptp(subgroups, axis=1)
+        count = self.count[s]
+        pos = count % self.history
+
+        # Limits from the window preceding this point
+        warm = count >= self.window
+        with np.errstate(divide="ignore", invalid="ignore"):
+            centre = np.where(warm & (self._n_x[s] > 0), self._sum_x[s] / self._n_x[s], np.nan)
+            r_bar = np.where(warm, self._sum_r[s] / np.maximum(self._n_r[s], 1), np.nan)
+            sigma = r_bar / self.d2 / np.sqrt(self.subgroup_size)
+        e_prev = np.where(np.isnan(self._ewma[s]), np.where(warm, centre, x), self._ewma[s])
+        # A gap carries the EWMA over unchanged
+        e = np.where(np.isnan(x), self._ewma[s], self.ewma_lambda * x + (1 - self.ewma_lambda) * e_prev)
+        e_half = self.ewma_width * sigma * np.sqrt(self.ewma_lambda / (2 - self.ewma_lambda))
+
+        self.time[s, pos] = times
+        self.value[s, pos], self.spread[s, pos] = x, spread
+        self.cl[s, pos] = centre
+        self.ucl[s, pos], self.lcl[s, pos] = centre + self.A2 * r_bar, centre - self.A2 * r_bar
+        self.r_cl[s, pos] = r_bar
+        self.r_ucl[s, pos], self.r_lcl[s, pos] = self.D4 * r_bar, self.D3 * r_bar
+        self.ewma[s, pos] = e
+        self.ewma_ucl[s, pos], self.ewma_lcl[s, pos] = centre + e_half, centre - e_half
+
+        # Roll the window: add this point, drop the one leaving
+        leaving = count >= self.window
+        old = (count - self.window) % self.history
+        old_x = np.where(leaving, self.value[s, old], np.nan)
+        self._sum_x[s] += np.nan_to_num(x) - np.nan_to_num(old_x)
+        self._n_x[s] += (~np.isnan(x)).astype(np.int64) - (~np.isnan(old_x)).astype(np.int64)
+        old_r = np.where(leaving, self.spread[s, old], np.nan)
+        self._sum_r[s] += np.nan_to_num(spread) - np.nan_to_num(old_r)
+        self._n_r[s] += (~np.isnan(spread)).astype(np.int64) - (~np.isnan(old_r)).astype(np.int64)
+        self._last_x[s] = x
+        self._ewma[s] = e
+        self.count[s] = count + 1
+
+        # Standardized history of the last RULE_LOOKBACK points, oldest first
+        back = count[:, None] - RULE_LOOKBACK + 1 + np.arange(RULE_LOOKBACK)
+        cols = back % self.history
+        rows = s[:, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sig = (self.ucl[rows, cols] - self.cl[rows, cols]) / 3
+            hist = np.where(back >= 0, (self.value[rows, cols] - self.cl[rows, cols]) / sig, np.nan)
+        hits = nelson_rules(hist)[:, -1, :]
+        bits = (hits * (1 << np.arange(8))).sum(axis=1).astype(np.uint8)
+        self.rules[s, pos] = bits
+        return bits
+
+    def _order(self, stream: int, last: int = None) -> np.ndarray:
+        """Ring positions of a stream's retained points, oldest first"""
+        n = int(min(self.count[stream], self.history, last or self.history))
+        return (self.count[stream] - n + np.arange(n)) % self.history
+
+    def chart(self, stream: int, kind: str = "xbar", last: int = None) -> pd.DataFrame:
+        """Plot data for one stream: 'xbar' (or individuals), 'range' or 'ewma'"""
+        cols = self._order(stream, last)
+        series = {
+            "xbar": (self.value, self.cl, self.ucl, self.lcl),
+            "range": (self.spread, self.r_cl, self.r_ucl, self.r_lcl),
+            "ewma": (self.ewma, self.cl, self.ewma_ucl, self.ewma_lcl),
+        }[kind]
+        value, centre, upper, lower = (a[stream, cols] for a in series)
+        return pd.DataFrame({
+            "date": self.time[stream, cols],
+            "value": value,
+            "mean": centre,
+            "ucl": upper,
+            "lcl": lower,
+            "rules": self.rules[stream, cols] if kind == "xbar" else np.zeros(len(cols), dtype=np.uint8),
+        })
+
+    def status(self, last: int = None, rules: tuple = tuple(NELSON_RULES)) -> pd.DataFrame:
+        """Latest point, limits and recent rule violations for every stream"""
+        last = min(last or self.window, self.history)
+        n = len(self.streams)
+        latest = (self.count - 1) % self.history
+        rows = np.arange(n)
+        back = self.count[:, None] - last + np.arange(last)
+        recent = np.where(back >= 0, self.rules[rows[:, None], back % self.history], 0) & rule_mask(rules)
+        frame = self.streams.copy()
+        frame["points"] = self.count
+        frame["value"] = np.where(self.count > 0, self.value[rows, latest], np.nan)
+        frame["cl"] = self.cl[rows, latest]
+        frame["ucl"] = self.ucl[rows, latest]
+        frame["lcl"] = self.lcl[rows, latest]
+        frame["violations"] = (recent > 0).sum(axis=1)
+        frame["rules_hit"] = [describe_rules(b) for b in np.bitwise_or.reduce(recent, axis=1)]
+        return frame
@@ -0,0 +1,128 @@
+"""
+Telit Supply Chain - Supplier Risk Scoring
+Composite financial, geographic, delivery and quality risk with dependency-tracked recomputation
+"""
+
+import numpy as np
+import pandas as pd
+
+# Country risk index (0 = lowest, 1 = highest), covering geopolitical and natural-hazard exposure
+COUNTRY_RISK = {
+    "Taiwan": 0.70, "China": 0.65, "South Korea": 0.40, "Japan": 0.35, "USA": 0.15,
+    "Germany": 0.10, "Italy": 0.15, "Malaysia": 0.35, "Switzerland": 0.05, "Israel": 0.55,
+}
+
+# Weight of each factor in the composite score
+RISK_WEIGHTS = {"financial": 0.25, "geographic": 0.30, "delivery": 0.25, "quality": 0.20}
+
+# Supplier-level inputs and the factors each one feeds
+INPUT_FACTORS = {
+    "altman_z": "financial",
+    "on_time_delivery": "delivery",
+    "lead_time_p50": "delivery",
+    "lead_time_p90": "delivery",
+    "quality_ppm": "quality",
+}
+
+
+def financial_risk(altman_z: np.ndarray) -> np.ndarray:
+    """0 above the Altman safe zone (3.0), 1 in the distress zone (1.8)"""
+    return np.clip((3.0 - altman_z) / 1.2, 0.0, 1.0)
+
+
+def delivery_risk(on_time_delivery: np.ndarray, p50: np.ndarray, p90: np.ndarray) -> np.ndarray:
+    """Lateness plus lead-time tail heaviness"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tail = np.where(p50 > 0, p90 / p50 - 1, 0.0)
+    return 0.6 * np.clip((100 - on_time_delivery) / 20, 0.0, 1.0) + 0.4 * np.clip(tail / 0.5, 0.0, 1.0)
+
+
+def quality_risk(ppm: np.ndarray) -> np.ndarray:
+    """0 at zero defects, 1 at 10,000 PPM or worse"""
+    return np.clip(ppm / 10_000, 0.0, 1.0)
+
+
+class SupplierRiskModel:
+    """Composite supplier risk kept current by recomputing only affected rows.
+
+    Feeds update raw inputs per supplier (financials, scorecard, lead
+    times) or per country (country risk). Each update compares against
+    the stored inputs and marks only suppliers whose inputs actually
+    changed; a country update reaches its suppliers through a country ->
+    supplier index. Scores are re-derived for dirty rows on read and the
+    result frame is cached until the next effective change.
+    """
+
+    def __init__(self, suppliers: pd.DataFrame, country_risk: dict = None, weights: dict = None):
+        self.ids = pd.Index(suppliers["id"])
+        self.names = suppliers["name"].to_numpy()
+        self.country = suppliers["country"].to_numpy()
+        self.country_risk = dict(country_risk or COUNTRY_RISK)
+        self.weights = dict(weights or RISK_WEIGHTS)
+        self.inputs = {k: np.full(len(self.ids), np.nan) for k in INPUT_FACTORS}
+        self._by_country = {c: np.flatnonzero(self.country == c) for c in np.unique(self.country)}
+        self.factors = pd.DataFrame(0.0, index=self.ids, columns=list(self.weights))
+        self._dirty = np.ones(len(self.ids), dtype=bool)
+        self._frame = None
+        self.recomputed = 0
+
+    def update_suppliers(self, values: pd.DataFrame) -> int:
+        """Apply a feed of supplier inputs (index = supplier id, columns from INPUT_FACTORS).
+        Returns the number of suppliers whose inputs changed."""
+        rows = self.ids.get_indexer(values.index)
+        known = rows >= 0
+        rows = rows[known]
+        changed = np.zeros(len(self.ids), dtype=bool)
+        for column in values.columns.intersection(list(INPUT_FACTORS)):
+            new = values[column].to_numpy(dtype=np.float64)[known]
+            old = self.inputs[column][rows]
+            diff = ~np.isclose(new, old, equal_nan=True)
+            self.inputs[column][rows[diff]] = new[diff]
+            changed[rows[diff]] = True
+        self._mark(changed)
+        return int(changed.sum())
+
+    def update_country_risk(self, updates: dict) -> int:
+        """Apply a country-risk feed; returns the number of suppliers affected"""
+        changed = np.zeros(len(self.ids), dtype=bool)
+        for country, risk in updates.items():
+            if not np.isclose(self.country_risk.get(country, np.nan), risk, equal_nan=True):
+                self.country_risk[country] = risk
+                changed[self._by_country.get(country, [])] = True
+        self._mark(changed)
+        return int(changed.sum())
+
+    def _mark(self, changed: np.ndarray):
+        if changed.any():
+            self._dirty |= changed
+            self._frame = None
+
+    def _recompute(self, rows: np.ndarray):
+        x = {k: v[rows] for k, v in self.inputs.items()}
+        geo = np.array([self.country_risk.get(c, 0.5) for c in self.country[rows]])
+        factors = np.column_stack([
+            financial_risk(np.nan_to_num(x["altman_z"], nan=3.0)),
+            geo,
+            delivery_risk(np.nan_to_num(x["on_time_delivery"], nan=100.0),
+                          np.nan_to_num(x["lead_time_p50"]), np.nan_to_num(x["lead_time_p90"])),
+            quality_risk(np.nan_to_num(x["quality_ppm"])),
+        ])
+        order = [list(self.weights).index(f) for f in ["financial", "geographic", "delivery", "quality"]]
+        self.factors.iloc[rows, order] = factors
+        self.recomputed += len(rows)
+
+    def scores(self) -> pd.DataFrame:
+        """Factor and composite scores per supplier, highest risk first"""
+        if self._frame is None:
+            rows = np.flatnonzero(self._dirty)
+            if len(rows):
+                self._recompute(rows)
+                self._dirty[rows] = False
+            frame = self.factors.copy()
+            frame["risk_score"] = sum(frame[f] * w for f, w in self.weights.items())
+            frame["risk_level"] = np.where(frame["risk_score"] < 0.25, "Low",
+                                           np.where(frame["risk_score"] < 0.4, "Medium", "High"))
+            frame.insert(0, "country", self.country)
+            frame.insert(0, "name", self.names)
+            self._frame = frame.sort_values("risk_score", ascending=False)
+        return self._frame
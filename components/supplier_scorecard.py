@@ -0,0 +1,157 @@
+"""
+Telit Supply Chain - Supplier Scorecard Engine
+OTD, quality PPM, lead time, cost variance and responsiveness from PO-line and receipt events
+"""
+
+import numpy as np
+import pandas as pd
+
+# Additive per supplier-month aggregates every scorecard metric is derived from
+AGGREGATES = ["receipts", "on_time", "received_qty", "rejected_qty", "lead_time_sum", "lead_time_sumsq",
+              "actual_cost", "standard_cost", "po_lines", "acknowledged_in_sla"]
+
+# Scorecard weights for the overall score
+SCORE_WEIGHTS = {"on_time_delivery": 0.3, "quality_score": 0.3, "responsiveness": 0.2, "cost_score": 0.2}
+
+
+def _month_number(dates) -> np.ndarray:
+    dates = pd.DatetimeIndex(pd.to_datetime(dates))
+    return np.asarray(dates.year * 12 + dates.month - 1, dtype=np.int64)
+
+
+class SupplierScorecard:
+    """Supplier-month aggregates maintained incrementally from event batches.
+
+    PO lines and receipts are reduced on ingest into a dense supplier x
+    month array per additive aggregate (counts, sums and sums of squares),
+    so a scorecard over any window is a slice-sum and a few divisions
+    regardless of how many events are behind it. Receipts are matched to
+    their PO line for promised date, order date and standard price.
+    """
+
+    def __init__(self, suppliers: list, grace_days: int = 0, ack_sla_hours: float = 48):
+        self.suppliers = pd.Index(suppliers)
+        self.grace_days = grace_days
+        self.ack_sla_hours = ack_sla_hours
+        self.first_month = None
+        self.agg = {k: np.zeros((len(self.suppliers), 0)) for k in AGGREGATES}
+        self._po = None
+
+    @property
+    def n_months(self) -> int:
+        return next(iter(self.agg.values())).shape[1]
+
+    def _month_index(self, months: np.ndarray) -> np.ndarray:
+        """Column index of each month number, widening the arrays as needed"""
+        if self.first_month is None:
+            self.first_month = int(months.min())
+        if months.min() < self.first_month:
+            pad = self.first_month - int(months.min())
+            self.agg = {k: np.pad(v, ((0, 0), (pad, 0))) for k, v in self.agg.items()}
+            self.first_month -= pad
+        cols = months - self.first_month
+        if cols.max() >= self.n_months:
+            pad = int(cols.max()) + 1 - self.n_months
+            self.agg = {k: np.pad(v, ((0, 0), (0, pad))) for k, v in self.agg.items()}
+        return cols
+
+    def _accumulate(self, supplier_idx: np.ndarray, months: np.ndarray, values: dict):
+        keep = supplier_idx >= 0
+        if not keep.any():
+            return
+        cols = self._month_index(months[keep])
+        frame = pd.DataFrame({"s": supplier_idx[keep], "m": cols, **{k: v[keep] for k, v in values.items()}})
+        sums = frame.groupby(["s", "m"], sort=False).sum()
+        s = sums.index.get_level_values("s").to_numpy()
+        m = sums.index.get_level_values("m").to_numpy()
+        for k in values:
+            self.agg[k][s, m] += sums[k].to_numpy()
+
+    def ingest_po_lines(self, po_lines: pd.DataFrame):
+        """Register PO lines: po_line_id, supplier_id, order_date, promised_date, quantity,
+        unit_price and optionally ack_hours"""
+        lines = po_lines.set_index("po_line_id")
+        new = pd.DataFrame({
+            "supplier": lines["supplier_id"],
+            "order_date": pd.to_datetime(lines["order_date"]),
+            "promised_date": pd.to_datetime(lines["promised_date"]),
+            "standard_price": lines["unit_price"].astype(float),
+        })
+        self._po = new if self._po is None else pd.concat([self._po, new])
+        ack = lines["ack_hours"].to_numpy(dtype=np.float64) if "ack_hours" in lines else np.zeros(len(lines))
+        self._accumulate(self.suppliers.get_indexer(lines["supplier_id"]), _month_number(lines["order_date"]), {
+            "po_lines": np.ones(len(lines)),
+            "acknowledged_in_sla": (ack <= self.ack_sla_hours).astype(np.float64),
+        })
+
+    def ingest_receipts(self, receipts: pd.DataFrame):
+        """Fold receipts into the aggregates: po_line_id, receipt_date, quantity_received,
+        quantity_rejected and invoice_price. Returns the number with no known PO line."""
+        if self._po is None:
+            return len(receipts)
+        po = self._po.reindex(receipts["po_line_id"])
+        known = po["supplier"].notna().to_numpy()
+        receipts, po = receipts[known], po[known]
+        receipt_date = pd.to_datetime(receipts["receipt_date"]).to_numpy()
+        lead = (receipt_date - po["order_date"].to_numpy()) / np.timedelta64(1, "D")
+        late = (receipt_date - po["promised_date"].to_numpy()) / np.timedelta64(1, "D")
+        qty = receipts["quantity_received"].to_numpy(dtype=np.float64)
+        self._accumulate(self.suppliers.get_indexer(po["supplier"]), _month_number(receipt_date), {
+            "receipts": np.ones(len(receipts)),
+            "on_time": (late <= self.grace_days).astype(np.float64),
+            "received_qty": qty,
+            "rejected_qty": receipts["quantity_rejected"].to_numpy(dtype=np.float64),
+            "lead_time_sum": lead,
+            "lead_time_sumsq": lead ** 2,
+            "actual_cost": qty * receipts["invoice_price"].to_numpy(dtype=np.float64),
+            "standard_cost": qty * po["standard_price"].to_numpy(dtype=np.float64),
+        })
+        return int((~known).sum())
+
+    def _window(self, start=None, end=None) -> slice:
+        """Column slice for months between two dates (inclusive)"""
+        if self.first_month is None:
+            return slice(0, 0)
+        lo = 0 if start is None else max(int(_month_number([start])[0]) - self.first_month, 0)
+        hi = self.n_months if end is None else int(_month_number([end])[0]) - self.first_month + 1
+        return slice(lo, max(hi, lo))
+
+    @staticmethod
+    def _metrics(t: dict) -> dict:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            n = t["receipts"]
+            mean_lead = np.where(n > 0, t["lead_time_sum"] / n, np.nan)
+            var_lead = np.where(n > 1, (t["lead_time_sumsq"] - n * mean_lead ** 2) / np.maximum(n - 1, 1), np.nan)
+            ppm = np.where(t["received_qty"] > 0, t["rejected_qty"] / t["received_qty"] * 1e6, np.nan)
+            cost_var = np.where(t["standard_cost"] > 0,
+                                (t["actual_cost"] - t["standard_cost"]) / t["standard_cost"] * 100, np.nan)
+            return {
+                "on_time_delivery": np.where(n > 0, t["on_time"] / n * 100, np.nan),
+                "quality_ppm": ppm,
+                "quality_score": 100 - ppm / 1e4,
+                "lead_time_days": mean_lead,
+                "lead_time_std": np.sqrt(np.maximum(var_lead, 0)),
+                "cost_variance": cost_var,
+                "responsiveness": np.where(t["po_lines"] > 0, t["acknowledged_in_sla"] / t["po_lines"] * 100, np.nan),
+                "spend": t["actual_cost"],
+                "orders": t["po_lines"],
+                "receipts": n,
+            }
+
+    def scorecard(self, start=None, end=None) -> pd.DataFrame:
+        """Metrics per supplier over a date window (whole history by default)"""
+        window = self._window(start, end)
+        metrics = self._metrics({k: v[:, window].sum(axis=1) for k, v in self.agg.items()})
+        frame = pd.DataFrame(metrics, index=self.suppliers)
+        frame["cost_score"] = 100 - frame["cost_variance"].abs() * 5
+        frame["overall_score"] = sum(frame[k] * w for k, w in SCORE_WEIGHTS.items())
+        return frame
+
+    def trend(self, metric: str, start=None, end=None) -> pd.DataFrame:
+        """One metric per supplier and month"""
+        window = self._window(start, end)
+        values = self._metrics({k: v[:, window] for k, v in self.agg.items()})[metric]
+        months = pd.period_range(start=pd.Period(year=(self.first_month + window.start) // 12,
+                                                 month=(self.first_month + window.start) % 12 + 1, freq="M"),
+                                 periods=values.shape[1], freq="M")
+        return pd.DataFrame(values, index=self.suppliers, columns=months.to_timestamp())
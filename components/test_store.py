@@ -0,0 +1,206 @@
+"""
+Telit Supply Chain - Columnar Test-Results Store
+Dictionary-encoded, memory-mapped per-unit test measurements
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Column -> storage dtype; "category" columns hold codes into a per-column dictionary
+TEST_RESULT_SCHEMA = {
+    "time": "int64",
+    "serial": "int64",
+    "line": "category",
+    "station": "category",
+    "product": "category",
+    "parameter": "category",
+    "shift": "category",
+    "value": "float32",
+    "lsl": "float32",
+    "usl": "float32",
+    "passed": "bool",
+}
+
+CODE_DTYPE = np.uint16
+
+# Rows read per chunk when scanning
+SCAN_ROWS = 4_000_000
+
+
+class TestResultStore:
+    """Append-only column files on disk, one raw typed array per column.
+
+    Categoricals are stored as uint16 codes with their dictionaries in
+    meta.json, numbers as int64/float32 and pass/fail as one byte, so a
+    measurement costs about 40 bytes. Columns are opened as read-only
+    memory maps: scans walk the files in fixed-size chunks and only the
+    rows a query selects are ever decoded. Rows are appended in time
+    order, which lets time windows be found by binary search.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                self.meta = json.load(f)
+        else:
+            self.meta = {"rows": 0, "dictionaries": {}, "attrs": {}}
+        for col, kind in TEST_RESULT_SCHEMA.items():
+            if kind == "category":
+                self.meta["dictionaries"].setdefault(col, [])
+        self._maps = {}
+
+    @property
+    def rows(self) -> int:
+        return self.meta["rows"]
+
+    @property
+    def attrs(self) -> dict:
+        """Free-form metadata persisted with the store (e.g. what it was loaded from)"""
+        return self.meta["attrs"]
+
+    def set_attrs(self, **attrs):
+        self.meta["attrs"].update(attrs)
+        self._save_meta()
+
+    def _file(self, col: str) -> str:
+        return os.path.join(self.path, f"{col}.bin")
+
+    @staticmethod
+    def _dtype(col: str) -> np.dtype:
+        kind = TEST_RESULT_SCHEMA[col]
+        return np.dtype(CODE_DTYPE if kind == "category" else kind)
+
+    def _save_meta(self):
+        tmp = os.path.join(self.path, "meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, os.path.join(self.path, "meta.json"))
+
+    def clear(self):
+        """Drop every row and dictionary"""
+        self._maps = {}
+        for col in TEST_RESULT_SCHEMA:
+            if os.path.exists(self._file(col)):
+                os.remove(self._file(col))
+        self.meta = {"rows": 0, "dictionaries": {c: [] for c, k in TEST_RESULT_SCHEMA.items() if k == "category"},
+                     "attrs": {}}
+        self._save_meta()
+
+    def append(self, frame: pd.DataFrame):
+        """Append measurements; passed is derived from the limits when absent"""
+        if not len(frame):
+            return
+        time = pd.to_datetime(frame["time"]).to_numpy().astype("datetime64[ns]").astype(np.int64)
+        if (np.diff(time) < 0).any() or (self.rows and time[0] < self.column("time")[-1]):
+            raise ValueError("test results must be appended in time order")
+        columns = {"time": time}
+        for col, kind in TEST_RESULT_SCHEMA.items():
+            if col == "time":
+                continue
+            if col == "passed" and col not in frame:
+                value, lsl, usl = (frame[c].to_numpy(dtype=np.float64) for c in ("value", "lsl", "usl"))
+                columns[col] = (value >= lsl) & (value <= usl)
+            elif kind == "category":
+                dictionary = self.meta["dictionaries"][col]
+                known = pd.Index(dictionary)
+                values = frame[col].astype(str)
+                new = pd.Index(pd.unique(values[~values.isin(known)]))
+                dictionary.extend(new.tolist())
+                if len(dictionary) > np.iinfo(CODE_DTYPE).max:
+                    raise ValueError(f"too many distinct values in {col}")
+                columns[col] = pd.Index(dictionary).get_indexer(values)
+            else:
+                columns[col] = frame[col].to_numpy()
+        for col, values in columns.items():
+            with open(self._file(col), "ab") as f:
+                np.asarray(values).astype(self._dtype(col)).tofile(f)
+        self.meta["rows"] += len(frame)
+        self._maps = {}
+        self._save_meta()
+
+    def column(self, col: str) -> np.ndarray:
+        """Read-only memory map of a column's stored values (codes for categoricals)"""
+        if col not in self._maps:
+            if not self.rows:
+                return np.empty(0, dtype=self._dtype(col))
+            self._maps[col] = np.memmap(self._file(col), dtype=self._dtype(col), mode="r", shape=(self.rows,))
+        return self._maps[col]
+
+    def dictionary(self, col: str) -> pd.Index:
+        return pd.Index(self.meta["dictionaries"][col])
+
+    def codes(self, col: str, values) -> np.ndarray:
+        """Codes of category values (-1 where unknown)"""
+        return self.dictionary(col).get_indexer(np.atleast_1d(values))
+
+    def time_slice(self, start=None, end=None) -> slice:
+        """Row range between two timestamps (inclusive)"""
+        time = self.column("time")
+        lo = 0 if start is None else int(np.searchsorted(time, pd.Timestamp(start).value, side="left"))
+        hi = self.rows if end is None else int(np.searchsorted(time, pd.Timestamp(end).value, side="right"))
+        return slice(lo, max(hi, lo))
+
+    def scan(self, columns: list, start=None, end=None, chunk_rows: int = SCAN_ROWS, **filters):
+        """Yield dicts of raw column arrays chunk by chunk, restricted to a time window and
+        to rows whose categorical (or serial) columns match the filters"""
+        window = self.time_slice(start, end)
+        wanted = {col: (self.codes(col, v) if TEST_RESULT_SCHEMA[col] == "category" else np.atleast_1d(v))
+                  for col, v in filters.items()}
+        for lo in range(window.start, window.stop, chunk_rows):
+            rows = slice(lo, min(lo + chunk_rows, window.stop))
+            mask = None
+            for col, allowed in wanted.items():
+                hit = np.isin(self.column(col)[rows], allowed)
+                mask = hit if mask is None else mask & hit
+            chunk = {col: np.asarray(self.column(col)[rows]) for col in columns}
+            if mask is not None:
+                if not mask.any():
+                    continue
+                chunk = {col: v[mask] for col, v in chunk.items()}
+            yield chunk
+
+    def _decode(self, col: str, values: np.ndarray):
+        if TEST_RESULT_SCHEMA[col] == "category":
+            return pd.Categorical.from_codes(values.astype(np.int64), self.dictionary(col))
+        if col == "time":
+            return values.astype("datetime64[ns]")
+        return values
+
+    def frame(self, columns: list = None, start=None, end=None, **filters) -> pd.DataFrame:
+        """Decoded rows for a time window and filters (categoricals come back as pandas categoricals)"""
+        columns = list(columns or TEST_RESULT_SCHEMA)
+        chunks = list(self.scan(columns, start, end, **filters))
+        data = {col: np.concatenate([c[col] for c in chunks]) if chunks else np.empty(0, dtype=self._dtype(col))
+                for col in columns}
+        return pd.DataFrame({col: self._decode(col, v) for col, v in data.items()})
+
+    def summary(self, by: tuple, start=None, end=None, **filters) -> pd.DataFrame:
+        """Measurement, failure and failing-unit counts per combination of categorical columns,
+        aggregated chunk by chunk"""
+        by = list(by)
+        dims = [len(self.dictionary(c)) for c in by]
+        size = int(np.prod(dims))
+        tested = np.zeros(size, dtype=np.int64)
+        failed = np.zeros(size, dtype=np.int64)
+        for chunk in self.scan(by + ["passed"], start, end, **filters):
+            key = np.ravel_multi_index([chunk[c].astype(np.int64) for c in by], dims)
+            tested += np.bincount(key, minlength=size)
+            failed += np.bincount(key[~chunk["passed"]], minlength=size)
+        present = np.flatnonzero(tested)
+        labels = np.unravel_index(present, dims)
+        frame = pd.DataFrame({col: self.dictionary(col)[labels[i]] for i, col in enumerate(by)})
+        frame["tested"] = tested[present]
+        frame["failed"] = failed[present]
+        frame["pass_rate"] = (1 - frame["failed"] / frame["tested"]) * 100
+        return frame
+
+    def disk_usage(self) -> pd.Series:
+        """Bytes on disk per column"""
+        return pd.Series({col: os.path.getsize(self._file(col)) if os.path.exists(self._file(col)) else 0
+                          for col in TEST_RESULT_SCHEMA})
@@ -0,0 +1,177 @@
+"""
+Telit Supply Chain - Yield Roll-up
+First-pass yield, rolled throughput yield and rework loops per station of the process route
+"""
+
+import numpy as np
+import pandas as pd
+
+PROCESS_ROUTE = ("SMT", "Reflow", "AOI", "Programming", "RF Calibration", "Functional Test", "Final QC")
+
+RESULTS = ("pass", "fail", "scrap")
+
+# Counters kept per (day, line, product, station)
+YIELD_COUNTERS = ("entered", "first_pass", "passed", "scrapped", "attempts")
+_ENTERED, _FIRST_PASS, _PASSED, _SCRAPPED, _ATTEMPTS = range(len(YIELD_COUNTERS))
+
+
+def _codes(values, index: pd.Index) -> np.ndarray:
+    """Positions of values in index (-1 where unknown), mapping categoricals by category"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        lookup = np.append(index.get_indexer(values.cat.categories), -1)
+        return lookup[values.cat.codes.to_numpy()]
+    return index.get_indexer(values)
+
+
+class YieldRollup:
+    """Station yields materialised per day from unit-level test events.
+
+    An event is one attempt of a unit at a station with a pass, fail or
+    scrap result. A batch is sorted once on a (serial, station) composite
+    key and each unit-station group is reduced to its attempt count and
+    first and last result. Groups are credited to the day, line and
+    product of their first attempt, so the counters (units entered, passed
+    first time, passed after rework, scrapped, attempts) are final as soon
+    as a unit passes. Only units failed and not yet dispositioned are
+    carried between batches, in a small sorted array, so later retests
+    land on the right cohort. Any roll-up is a slice-sum over the counters.
+    """
+
+    def __init__(self, lines: list, products: list, route: tuple = PROCESS_ROUTE):
+        self.lines = pd.Index(lines)
+        self.products = pd.Index(products)
+        self.route = pd.Index(route)
+        self.days = np.empty(0, dtype=np.int64)
+        self.counts = np.zeros((0, len(self.lines), len(self.products), len(self.route), len(YIELD_COUNTERS)),
+                               dtype=np.int64)
+        # Unit-stations failed and awaiting retest or disposition, sorted by key, with their cohort
+        self._open_key = np.empty(0, dtype=np.int64)
+        self._open_cell = np.empty((0, 4), dtype=np.int64)
+        self.events = 0
+        self.dropped = 0
+
+    @property
+    def in_rework(self) -> int:
+        return len(self._open_key)
+
+    def _day_rows(self, days: np.ndarray) -> np.ndarray:
+        """Row of each day number in the counters, adding rows for unseen days"""
+        new = np.setdiff1d(days, self.days)
+        if len(new):
+            merged = np.union1d(self.days, new)
+            counts = np.zeros((len(merged),) + self.counts.shape[1:], dtype=self.counts.dtype)
+            counts[np.searchsorted(merged, self.days)] = self.counts
+            self.days, self.counts = merged, counts
+        return np.searchsorted(self.days, days)
+
+    def ingest(self, events: pd.DataFrame):
+        """Add test events (time, serial, line, product, station, result)"""
+        line = _codes(events["line"], self.lines)
+        product = _codes(events["product"], self.products)
+        station = _codes(events["station"], self.route)
+        result = _codes(events["result"], pd.Index(RESULTS))
+        keep = (line >= 0) & (product >= 0) & (station >= 0) & (result >= 0)
+        self.dropped += int((~keep).sum())
+        if not keep.any():
+            return
+        time = pd.to_datetime(events["time"]).to_numpy()[keep]
+        day = time.astype("datetime64[D]").astype(np.int64)
+        line, product, station, result = line[keep], product[keep], station[keep], result[keep]
+        key = events["serial"].to_numpy(dtype=np.int64)[keep] * len(self.route) + station
+        self.events += len(key)
+
+        # One sort groups each unit-station's attempts in time order
+        order = np.lexsort((time, key))
+        key, day, line, product, station, result = (a[order] for a in (key, day, line, product, station, result))
+        starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+        ends = np.r_[starts[1:], len(key)] - 1
+        group_key = key[starts]
+        attempts = ends - starts + 1
+        first, last = result[starts], result[ends]
+
+        # Groups continuing a unit-station already failed in an earlier batch keep that cohort
+        pos = np.searchsorted(self._open_key, group_key)
+        pos_c = np.minimum(pos, max(len(self._open_key) - 1, 0))
+        carried = (pos < len(self._open_key)) & (self._open_key[pos_c] == group_key) if len(self._open_key) \
+            else np.zeros(len(group_key), dtype=bool)
+        cell = np.stack([day[starts], line[starts], product[starts], station[starts]], axis=1)
+        cell[carried] = self._open_cell[pos_c[carried]]
+
+        counters = np.zeros((len(group_key), len(YIELD_COUNTERS)), dtype=np.int64)
+        counters[:, _ENTERED] = ~carried
+        counters[:, _FIRST_PASS] = ~carried & (first == 0)
+        counters[:, _PASSED] = last == 0
+        counters[:, _SCRAPPED] = last == 2
+        counters[:, _ATTEMPTS] = attempts
+        rows = self._day_rows(cell[:, 0])
+        np.add.at(self.counts, (rows, cell[:, 1], cell[:, 2], cell[:, 3]), counters)
+
+        # Carry forward unit-stations whose latest attempt failed; drop the resolved ones
+        still_open = last == 1
+        resolved = carried & ~still_open
+        keep_open = np.ones(len(self._open_key), dtype=bool)
+        keep_open[pos_c[resolved]] = False
+        fresh = still_open & ~carried
+        open_key = np.concatenate([self._open_key[keep_open], group_key[fresh]])
+        open_cell = np.concatenate([self._open_cell[keep_open], cell[fresh]])
+        order = np.argsort(open_key, kind="stable")
+        self._open_key, self._open_cell = open_key[order], open_cell[order]
+
+    def _select(self, start=None, end=None, lines=None, products=None) -> tuple:
+        day = lambda ts: pd.Timestamp(ts).to_datetime64().astype("datetime64[D]").astype(np.int64)
+        lo = 0 if start is None else int(np.searchsorted(self.days, day(start), side="left"))
+        hi = len(self.days) if end is None else int(np.searchsorted(self.days, day(end), side="right"))
+        line_idx = np.arange(len(self.lines)) if lines is None else self.lines.get_indexer(np.atleast_1d(lines))
+        prod_idx = np.arange(len(self.products)) if products is None else \
+            self.products.get_indexer(np.atleast_1d(products))
+        return slice(lo, hi), line_idx[line_idx >= 0], prod_idx[prod_idx >= 0]
+
+    @staticmethod
+    def _yields(counts: np.ndarray) -> dict:
+        """Yield ratios from counters on the last axis (stations on the axis before it)"""
+        entered = counts[..., _ENTERED].astype(np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fpy = counts[..., _FIRST_PASS] / entered
+            return {
+                "fpy": fpy,
+                "final_yield": counts[..., _PASSED] / entered,
+                "rework_rate": (counts[..., _PASSED] - counts[..., _FIRST_PASS]) / entered,
+                "retests_per_unit": (counts[..., _ATTEMPTS] - entered) / entered,
+                "rty": np.prod(np.where(entered > 0, fpy, 1.0), axis=-1),
+            }
+
+    def station_yield(self, start=None, end=None, lines=None, products=None) -> pd.DataFrame:
+        """Counters and yields per route station, with RTY accumulated along the route"""
+        days, line_idx, prod_idx = self._select(start, end, lines, products)
+        counts = self.counts[days][:, line_idx][:, :, prod_idx].sum(axis=(0, 1, 2))
+        frame = pd.DataFrame(counts, columns=list(YIELD_COUNTERS))
+        frame.insert(0, "station", self.route)
+        frame["in_rework"] = frame["entered"] - frame["passed"] - frame["scrapped"]
+        ratios = self._yields(counts)
+        for col in ("fpy", "final_yield", "rework_rate", "retests_per_unit"):
+            frame[col] = ratios[col]
+        frame["rty_cumulative"] = np.cumprod(frame["fpy"].fillna(1.0))
+        return frame
+
+    def rolled_yield(self, start=None, end=None, lines=None, products=None) -> float:
+        """Rolled throughput yield: the chance a unit passes every station first time"""
+        days, line_idx, prod_idx = self._select(start, end, lines, products)
+        counts = self.counts[days][:, line_idx][:, :, prod_idx].sum(axis=(0, 1, 2))
+        return float(self._yields(counts)["rty"])
+
+    def trend(self, start=None, end=None, lines=None, products=None, by_line: bool = True) -> pd.DataFrame:
+        """Daily RTY and the station with the lowest FPY, per line or overall"""
+        days, line_idx, prod_idx = self._select(start, end, lines, products)
+        counts = self.counts[days][:, line_idx][:, :, prod_idx].sum(axis=2)
+        if not by_line:
+            counts = counts.sum(axis=1, keepdims=True)
+        ratios = self._yields(counts)
+        worst = np.argmin(np.where(np.isnan(ratios["fpy"]), np.inf, ratios["fpy"]), axis=-1)
+        n_days, n_lines = counts.shape[:2]
+        return pd.DataFrame({
+            "date": np.repeat(self.days[days].astype("datetime64[D]"), n_lines).astype("datetime64[ns]"),
+            "line": np.tile(np.asarray(self.lines[line_idx]) if by_line else ["All Lines"], n_days),
+            "units": counts[:, :, 0, _ENTERED].ravel(),
+            "rty": ratios["rty"].ravel(),
+            "worst_station": np.asarray(self.route)[worst.ravel()],
+        })
@@ -13,7 +13,7 @@ from components.styles import (
     get_telit_css, render_header, render_section_header, render_alert_card,
     TELIT_LOGO_SVG, TELIT_BLUE, TELIT_DARK, TELIT_ORANGE, TELIT_GREEN, TELIT_YELLOW, TELIT_RED, TELIT_GRAY
 )
-from components.fake_data import get_risk_data, get_risk_by_region
+from components.fake_data import get_risk_data, get_risk_by_region, get_sourcing_exposure, SUPPLIERS, ALTERNATE_SUPPLIERS
 
 # Page config
 st.set_page_config(page_title="Risk - Telit Supply Chain", page_icon="⚠️", layout="wide")
@@ -108,7 +108,7 @@ for _, risk in high_score_risks.iterrows():
 # =============================================================================
 # TABS
 # =============================================================================
-tab1, tab2, tab3 = st.tabs(["🗺️ Risk Heatmap", "📊 Risk Analysis", "🎯 Scenario Planning"])
+tab1, tab2, tab3, tab4 = st.tabs(["🗺️ Risk Heatmap", "📊 Risk Analysis", "🎯 Scenario Planning", "🔗 Sourcing Exposure"])
 
 with tab1:
     st.markdown(render_section_header("Global Risk Heatmap"), unsafe_allow_html=True)
@@ -333,3 +333,55 @@ with tab3:
                 </div>
             """, unsafe_allow_html=True)
 
+with tab4:
+    st.markdown(render_section_header("Single & Dual-Source Exposure"), unsafe_allow_html=True)
+    
+    exposure = get_sourcing_exposure()
+    supplier_names = {s['id']: s['name'] for s in SUPPLIERS + ALTERNATE_SUPPLIERS}
+    countries = sorted(set(exposure.supplier_country))
+    
+    filter_col1, filter_col2 = st.columns(2)
+    with filter_col1:
+        max_sources = st.radio("Exposure", [1, 2], format_func=lambda n: "Single-source" if n == 1 else "Single or dual-source",
+                               horizontal=True)
+    with filter_col2:
+        country = st.selectbox("Sourced from", ["Any country"] + countries)
+    country_filter = None if country == "Any country" else country
+    
+    total_revenue = exposure.revenue.sum()
+    exposed = exposure.exposed_revenue(max_sources, country_filter)
+    exp_cols = st.columns(3)
+    exp_cols[0].metric("Revenue Exposed", f"${exposed/1e6:,.1f}M", f"{exposed/total_revenue*100:.0f}% of revenue",
+                       delta_color="off")
+    exp_cols[1].metric("Exposed Components", f"{int(exposure.component_mask(max_sources, country_filter).sum())}")
+    exp_cols[2].metric("Products Affected",
+                       f"{int(exposure.exposed_products(exposure.component_mask(max_sources, country_filter)).sum())} / {len(exposure.products)}")
+    
+    exp_col1, exp_col2 = st.columns([3, 2])
+    
+    with exp_col1:
+        components = exposure.component_table(max_sources)
+        if country_filter:
+            components = components[components['countries'].str.contains(country_filter)]
+        st.dataframe(
+            components.head(50),
+            column_config={
+                "component": "Component",
+                "sources": st.column_config.NumberColumn("Sources", format="%d"),
+                "suppliers": "Approved Suppliers",
+                "countries": "Countries",
+                "products_using": st.column_config.NumberColumn("Products", format="%d"),
+                "revenue_at_risk": st.column_config.NumberColumn("Revenue at Risk ($)", format="%.0f"),
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+    
+    with exp_col2:
+        sole = exposure.supplier_table()
+        sole = sole[sole['revenue_exposed'] > 0]
+        sole['name'] = sole['supplier'].map(supplier_names)
+        fig = px.bar(sole, x='revenue_exposed', y='name', color='country', orientation='h',
+                     labels={'revenue_exposed': 'Revenue on sole-source parts ($)', 'name': ''})
+        fig.update_layout(height=400, yaxis=dict(categoryorder='total ascending'), legend_title="")
+        st.plotly_chart(fig, use_container_width=True)
@@ -13,12 +13,13 @@ from components.styles import (
     TELIT_LOGO_SVG, TELIT_BLUE, TELIT_DARK, TELIT_GREEN, TELIT_YELLOW, TELIT_RED, TELIT_GRAY
 )
 from components.fake_data import (
-    get_factory_zones, get_factory_kpis, get_production_flow, get_equipment_health
+    get_factory_zones, get_site_twin, get_factory_kpis, get_production_flow, get_equipment_health
 )
 from components.factory_map import (
     render_factory_floor, render_factory_kpi_panel, render_equipment_list
 )
 from components.charts import create_gauge_chart, create_line_chart
+from components.digital_twin import FACTORY_SITES
 
 # Page config
 st.set_page_config(
@@ -47,7 +48,7 @@ with st.sidebar:
     """, unsafe_allow_html=True)
     
     # Factory selector
-    st.selectbox("Select Factory", ["Telit Manufacturing - Germany", "Telit Assembly - China", "Telit Production - USA"])
+    selected_site = st.selectbox("Select Factory", [s['name'] for s in FACTORY_SITES])
     
     # Auto-refresh toggle
     auto_refresh = st.toggle("Auto Refresh", value=True)
@@ -65,7 +66,8 @@ st.markdown(render_header(
 ), unsafe_allow_html=True)
 
 # Get data
-zones = get_factory_zones()
+zones = get_factory_zones(selected_site)
+twin = get_site_twin(selected_site)
 kpis = get_factory_kpis()
 production = get_production_flow()
 equipment = get_equipment_health()
@@ -184,6 +186,7 @@ with tab1:
                 
                 <div style="margin-top: 16px; padding-top: 16px; border-top: 1px solid #e9ecef;">
                     <div style="font-size: 12px; color: {TELIT_GRAY};">Workers on shift: <strong>{zone_data['workers']}</strong></div>
+                    <div style="font-size: 12px; color: {TELIT_GRAY};">Tracked equipment: <strong>{len(twin.equipment_in_zone(zone_data['id'])):,}</strong></div>
                     <div style="font-size: 12px; color: {TELIT_GRAY};">Status: <strong style="color: {status_color};">{zone_data['status'].upper()}</strong></div>
                 </div>
             </div>
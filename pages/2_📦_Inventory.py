@@ -13,9 +13,11 @@ from components.styles import (
     TELIT_LOGO_SVG, TELIT_BLUE, TELIT_DARK, TELIT_GREEN, TELIT_YELLOW, TELIT_RED, TELIT_GRAY
 )
 from components.fake_data import (
-    get_inventory_levels, get_warehouse_summary, TELIT_PRODUCTS, WAREHOUSES
+    get_inventory_levels, get_warehouse_summary, get_abc_classification, get_safety_stock_plan, TELIT_PRODUCTS,
+    WAREHOUSES
 )
-from components.charts import create_bar_chart, create_heatmap, create_gauge_chart
+from components.safety_stock import working_capital_impact, safety_stock_recommendations
+from components.charts import create_bar_chart, create_heatmap, create_gauge_chart, create_pareto_chart
 
 # Page config
 st.set_page_config(page_title="Inventory - Telit Supply Chain", page_icon="📦", layout="wide")
@@ -178,6 +180,25 @@ with tab2:
     )
     fig.update_layout(height=400)
     st.plotly_chart(fig, use_container_width=True)
+    
+    st.markdown(render_section_header("ABC/XYZ Classification"), unsafe_allow_html=True)
+    
+    abc = get_abc_classification()
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        fig = create_pareto_chart(abc.pareto(), 'sku', 'revenue_pct', "Revenue Pareto (A items ≤ 80%)")
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        fig = px.imshow(
+            abc.matrix(),
+            text_auto=True,
+            color_continuous_scale=[[0, '#f0f9ff'], [1, TELIT_BLUE]],
+            labels={'x': 'Demand Variability', 'y': 'Revenue Class', 'color': 'SKUs'}
+        )
+        fig.update_layout(height=400, coloraxis_showscale=False)
+        st.plotly_chart(fig, use_container_width=True)
 
 with tab3:
     st.markdown(render_section_header("Low Stock Alerts"), unsafe_allow_html=True)
@@ -201,8 +222,8 @@ with tab3:
     st.markdown(render_section_header("Reorder Recommendations"), unsafe_allow_html=True)
     
     # Show reorder table
-    reorder_df = low_stock_df[['product_name', 'warehouse_name', 'current_stock', 'reorder_point', 'days_of_supply']].copy()
-    reorder_df['suggested_order'] = (reorder_df['reorder_point'] * 2 - reorder_df['current_stock']).clip(lower=0)
+    reorder_df = low_stock_df[['product_name', 'warehouse_name', 'current_stock', 'reorder_point', 'days_of_supply', 'projected_stockout']].copy()
+    reorder_df['suggested_order'] = (low_stock_df['reorder_point'] * 2 - low_stock_df['inventory_position']).clip(lower=0)
     
     st.dataframe(
         reorder_df.head(10),
@@ -212,9 +233,27 @@ with tab3:
             "current_stock": st.column_config.NumberColumn("Current Stock", format="%d"),
             "reorder_point": st.column_config.NumberColumn("Reorder Point", format="%d"),
             "days_of_supply": st.column_config.NumberColumn("Days of Supply", format="%.1f"),
+            "projected_stockout": st.column_config.DateColumn("Projected Stockout"),
             "suggested_order": st.column_config.NumberColumn("Suggested Order", format="%d"),
         },
         hide_index=True,
         use_container_width=True
     )
-
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown(render_section_header("Safety Stock Recommendations"), unsafe_allow_html=True)
+    
+    ss_service = st.select_slider("Target service level", [0.90, 0.95, 0.98, 0.99], value=0.95,
+                                  format_func=lambda v: f"{v:.0%}")
+    ss_plan = get_safety_stock_plan(ss_service)
+    ss_impact = working_capital_impact(ss_plan)
+    
+    ss_cols = st.columns(3)
+    ss_cols[0].metric("Working Capital Released", f"${ss_impact['released'] / 1e6:,.2f}M")
+    ss_cols[1].metric("Working Capital Invested", f"${ss_impact['invested'] / 1e6:,.2f}M")
+    ss_cols[2].metric("Locations to Change", f"{ss_impact['locations_increase'] + ss_impact['locations_decrease']:,}")
+    
+    for rec in safety_stock_recommendations(ss_plan, 5):
+        st.markdown(render_alert_card(
+            rec['message'], "warning" if rec['change_pct'] > 0 else "info", "📈" if rec['change_pct'] > 0 else "📉"
+        ), unsafe_allow_html=True)
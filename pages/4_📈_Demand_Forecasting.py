@@ -8,13 +8,22 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
-from datetime import datetime, timedelta
 
 from components.styles import (
     get_telit_css, render_header, render_section_header,
     TELIT_LOGO_SVG, TELIT_BLUE, TELIT_DARK, TELIT_ORANGE, TELIT_GREEN, TELIT_GRAY
 )
-from components.fake_data import get_demand_forecast, TELIT_PRODUCTS
+from components.fake_data import (
+    get_demand_forecast, get_safety_stock_plan, get_forecast_accuracy, get_forecast_accuracy_trend,
+    get_forecast_cube, get_scenario_store, get_demand_sensor, get_sensed_forecast,
+    get_demand_cube_tiler, get_sop_plan_store, get_design_win_pipeline, get_design_win_demand,
+    get_design_win_forecast,
+    TELIT_PRODUCTS
+)
+from components.reconciliation import rollup
+from components.scenarios import scenario_summary
+from components.cube_tiles import HEATMAP_MAX_CELLS, SURFACE_MAX_CELLS
+from components.safety_stock import working_capital_impact, safety_stock_recommendations
 from components.charts import create_forecast_chart
 
 # Page config
@@ -36,21 +45,24 @@ with st.sidebar:
     st.markdown("<br>", unsafe_allow_html=True)
     forecast_horizon = st.slider("Forecast Horizon (months)", 3, 24, 12)
     confidence_level = st.selectbox("Confidence Level", ["90%", "95%", "99%"], index=1)
-    selected_product = st.selectbox("Product", [p['name'] for p in TELIT_PRODUCTS[:6]])
+    selected_product = st.selectbox("Product", [p['name'] for p in TELIT_PRODUCTS])
 
 # Header
 st.markdown(render_header("Demand Forecasting", "ML-powered demand predictions with confidence intervals"), unsafe_allow_html=True)
 
 # Get data
-forecast_df = get_demand_forecast(forecast_horizon)
+service_level = {"90%": 0.90, "95%": 0.95, "99%": 0.99}[confidence_level]
+forecast_df = get_demand_forecast(forecast_horizon, level=service_level)
 
 # =============================================================================
 # KPI CARDS
 # =============================================================================
 total_forecast = forecast_df[forecast_df['is_forecast']]['demand'].sum()
 avg_growth = 12.5
-forecast_accuracy = 94.2
-mape = 5.8
+accuracy_df = get_forecast_accuracy()
+best_model = accuracy_df.sort_values('wape').iloc[0]
+forecast_accuracy = round(100 - best_model['wape'], 1)
+mape = round(best_model['mape'], 1)
 
 col1, col2, col3, col4 = st.columns(4)
 
@@ -77,7 +89,7 @@ with col3:
         <div class="kpi-card">
             <div class="kpi-label">Forecast Accuracy</div>
             <div class="kpi-value">{forecast_accuracy}%</div>
-            <div style="font-size: 12px; color: {TELIT_GRAY};">Last 6 months</div>
+            <div style="font-size: 12px; color: {TELIT_GRAY};">Rolling-origin backtest</div>
         </div>
     """, unsafe_allow_html=True)
 
@@ -95,13 +107,18 @@ st.markdown("<br>", unsafe_allow_html=True)
 # =============================================================================
 # TABS
 # =============================================================================
-tab1, tab2, tab3 = st.tabs(["📊 Forecast View", "🔬 Model Insights", "📋 Planning Recommendations"])
+tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs([
+    "📊 Forecast View", "🔬 Model Insights", "📋 Planning Recommendations", "🔮 Scenarios", "⚡ Signals", "🌡️ Demand Cube",
+    "🔄 S&OP", "📡 Design Wins"
+])
 
 with tab1:
     st.markdown(render_section_header(f"Demand Forecast: {selected_product}"), unsafe_allow_html=True)
     
     # Filter for selected product
     product_df = forecast_df[forecast_df['product'] == selected_product].copy()
+    model_names = {"ses": "Exponential Smoothing", "holt": "Holt Linear Trend", "seasonal_naive": "Seasonal Naive", "croston": "Croston (Intermittent)"}
+    st.caption(f"Selected model: {model_names.get(product_df['model'].iloc[0], product_df['model'].iloc[0])}")
     
     # Create forecast chart
     fig = go.Figure()
@@ -126,6 +143,15 @@ with tab1:
         marker=dict(size=6)
     ))
     
+    # Forecast including expected design-win ramps not yet in history
+    product_pos = [p['name'] for p in TELIT_PRODUCTS].index(selected_product)
+    fig.add_trace(go.Scatter(
+        x=fore_df['date'], y=get_design_win_forecast(forecast_horizon)[product_pos],
+        mode='lines',
+        name='Forecast + Design Wins',
+        line=dict(color=TELIT_GREEN, width=2, dash='dash')
+    ))
+    
     # Confidence band
     fig.add_trace(go.Scatter(
         x=list(fore_df['date']) + list(fore_df['date'])[::-1],
@@ -174,6 +200,26 @@ with tab1:
     )
     
     st.plotly_chart(fig2, use_container_width=True)
+    
+    # Reconciled forecast by geography and customer
+    st.markdown(render_section_header("Reconciled Forecast by Country & Customer"), unsafe_allow_html=True)
+    
+    cube = get_forecast_cube("mint", forecast_horizon)
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        country_df = rollup(cube['leaves'], cube['forecast'], ['region', 'country']).sum(axis=1).rename('forecast').reset_index()
+        fig = px.bar(country_df.sort_values('forecast'), x='forecast', y='country', color='region', orientation='h',
+                     color_discrete_sequence=[TELIT_BLUE, TELIT_ORANGE, TELIT_GREEN])
+        fig.update_layout(height=350, xaxis_title="Units", yaxis_title="")
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        customer_df = rollup(cube['leaves'], cube['forecast'], 'customer').sum(axis=1).rename('forecast').reset_index()
+        fig = px.bar(customer_df.nlargest(10, 'forecast').sort_values('forecast'), x='forecast', y='customer', orientation='h',
+                     color_discrete_sequence=[TELIT_BLUE])
+        fig.update_layout(height=350, xaxis_title="Units", yaxis_title="")
+        st.plotly_chart(fig, use_container_width=True)
 
 with tab2:
     st.markdown(render_section_header("Model Performance"), unsafe_allow_html=True)
@@ -182,16 +228,13 @@ with tab2:
     
     with col1:
         # Model accuracy over time
-        months = pd.date_range(end=datetime.now(), periods=12, freq='M')
-        accuracy_data = pd.DataFrame({
-            'month': months,
-            'accuracy': [92, 93, 91, 94, 93, 95, 94, 93, 95, 94, 95, 94]
-        })
+        accuracy_data = get_forecast_accuracy_trend(best_model['model'])
+        accuracy_data['accuracy'] = 100 - accuracy_data['wape']
         
-        fig = px.line(accuracy_data, x='month', y='accuracy',
+        fig = px.line(accuracy_data, x='origin', y='accuracy',
                      title="Forecast Accuracy Trend",
                      color_discrete_sequence=[TELIT_GREEN])
-        fig.update_layout(height=300, yaxis_range=[85, 100])
+        fig.update_layout(height=300, xaxis_title="Forecast origin (month)")
         st.plotly_chart(fig, use_container_width=True)
     
     with col2:
@@ -207,6 +250,51 @@ with tab2:
         fig.update_layout(height=300)
         st.plotly_chart(fig, use_container_width=True)
     
+    # Backtest accuracy by model
+    st.markdown(render_section_header("Backtest Accuracy by Model"), unsafe_allow_html=True)
+    st.dataframe(
+        accuracy_df,
+        column_config={
+            "model": "Model",
+            "mape": st.column_config.NumberColumn("MAPE", format="%.1f%%"),
+            "wape": st.column_config.NumberColumn("WAPE", format="%.1f%%"),
+            "bias": st.column_config.NumberColumn("Bias", format="%+.1f%%"),
+            "tracking_signal": st.column_config.NumberColumn("Tracking Signal", format="%.1f"),
+            "n_forecasts": st.column_config.NumberColumn("Forecasts Scored", format="%d"),
+        },
+        hide_index=True,
+        use_container_width=True
+    )
+    
+    # Accuracy breakdown for the best model
+    st.markdown(render_section_header(f"Backtest Accuracy by Segment ({best_model['model']})"), unsafe_allow_html=True)
+    accuracy_by = st.radio("Break down by", ["Customer", "Region", "Product"], horizontal=True)
+    segment_df = get_forecast_accuracy(group_by=accuracy_by.lower())
+    segment_df = segment_df[segment_df['model'] == best_model['model']].drop(columns='model').sort_values('wape')
+    segment_df['accuracy'] = 100 - segment_df['wape']
+    
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        fig = px.bar(segment_df.sort_values('accuracy'), x='accuracy', y='group', orientation='h',
+                     color='bias', color_continuous_scale=[TELIT_ORANGE, '#f5f5f5', TELIT_BLUE],
+                     color_continuous_midpoint=0)
+        fig.update_layout(height=max(300, 22 * len(segment_df)), xaxis_title="Accuracy (100 - WAPE, %)",
+                          yaxis_title="", coloraxis_colorbar_title="Bias %")
+        st.plotly_chart(fig, use_container_width=True)
+    with col2:
+        st.dataframe(
+            segment_df[['group', 'accuracy', 'mape', 'bias', 'tracking_signal']],
+            column_config={
+                "group": accuracy_by,
+                "accuracy": st.column_config.NumberColumn("Accuracy", format="%.1f%%"),
+                "mape": st.column_config.NumberColumn("MAPE", format="%.1f%%"),
+                "bias": st.column_config.NumberColumn("Bias", format="%+.1f%%"),
+                "tracking_signal": st.column_config.NumberColumn("Tracking Signal", format="%.1f"),
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+    
     # Seasonality decomposition
     st.markdown(render_section_header("Seasonality Analysis"), unsafe_allow_html=True)
     
@@ -261,6 +349,10 @@ with tab3:
             </div>
         """, unsafe_allow_html=True)
     
+    ss_plan = get_safety_stock_plan(service_level)
+    ss_impact = working_capital_impact(ss_plan)
+    ss_recs = "".join(f"<li>{r['message']}</li>" for r in safety_stock_recommendations(ss_plan, 3))
+    
     with col2:
         st.markdown(f"""
             <div style="background: rgba(0,167,225,0.1); border-radius: 12px; padding: 20px; border-left: 4px solid {TELIT_BLUE};">
@@ -279,11 +371,11 @@ with tab3:
         st.markdown(f"""
             <div style="background: rgba(103,58,183,0.1); border-radius: 12px; padding: 20px; border-left: 4px solid #673ab7;">
                 <h4 style="margin: 0 0 12px 0; color: {TELIT_DARK};">📊 Inventory Optimization</h4>
-                <p style="color: {TELIT_GRAY}; font-size: 14px;">Based on forecast analysis</p>
+                <p style="color: {TELIT_GRAY}; font-size: 14px;">Multi-echelon safety stock at {confidence_level} service level</p>
                 <ul style="margin: 12px 0; padding-left: 20px;">
-                    <li>Optimal safety stock: 14 days supply</li>
-                    <li>Reorder point adjustment: +8%</li>
-                    <li>Estimated savings: $2.1M annually</li>
+                    <li>Optimal safety stock: {ss_plan['optimized_weeks'].mean() * 7:.0f} days supply</li>
+                    {ss_recs}
+                    <li>Net working capital change: ${ss_impact['net_change'] / 1e6:+.1f}M</li>
                 </ul>
             </div>
         """, unsafe_allow_html=True)
@@ -304,3 +396,267 @@ with tab3:
         "text/csv"
     )
 
+with tab4:
+    st.markdown(render_section_header("Scenario Re-Forecast"), unsafe_allow_html=True)
+    
+    scenario_col1, scenario_col2, scenario_col3 = st.columns(3)
+    
+    with scenario_col1:
+        market_growth = st.slider("IoT Market Growth (%)", 5, 25, 15)
+        auto_growth = st.slider("Automotive Telematics Growth (%)", 10, 50, 32)
+        meter_growth = st.slider("Smart Meter Deployment (%)", 5, 20, 12)
+    
+    with scenario_col2:
+        supply_constraint = st.selectbox("5G Chipset Supply", ["Normal", "Constrained (-15%)", "Severe (-30%)"])
+        capacity_util = st.slider("Production Capacity (%)", 70, 100, 85)
+    
+    with scenario_col3:
+        fx_impact = st.slider("EUR/USD Impact (%)", -10, 10, 0)
+        inflation = st.slider("Input Cost Inflation (%)", 0, 15, 5)
+        recession_risk = st.selectbox("Recession Scenario", ["None", "Mild (-5%)", "Moderate (-15%)", "Severe (-25%)"])
+    
+    # Saved scenarios belong to this session; the base cube behind them is shared
+    store_key = f"scenarios_{forecast_horizon}"
+    if store_key not in st.session_state:
+        st.session_state[store_key] = get_scenario_store(forecast_horizon)
+        st.session_state[store_key].save("Baseline", {})
+    scenarios = st.session_state[store_key]
+    levers = {
+        "market_growth": market_growth, "auto_growth": auto_growth, "meter_growth": meter_growth,
+        "supply_constraint": supply_constraint, "capacity_util": capacity_util,
+        "fx_impact": fx_impact, "inflation": inflation, "recession_risk": recession_risk,
+    }
+    scenario = scenarios.save("Current", levers)
+    
+    save_col1, save_col2 = st.columns([3, 1])
+    with save_col1:
+        scenario_name = st.text_input("Scenario name", placeholder="e.g. Automotive upside")
+    with save_col2:
+        st.markdown("<br>", unsafe_allow_html=True)
+        if st.button("💾 Save scenario", disabled=not scenario_name.strip() or scenario_name.strip() in ("Baseline", "Current")):
+            scenarios.save(scenario_name.strip(), levers)
+            st.success(f"Saved '{scenario_name.strip()}'")
+    summary = scenario_summary(scenario, scenarios.base, scenarios.prices)
+    
+    result_cols = st.columns(4)
+    result_cols[0].metric("Scenario Demand", f"{summary['demand_units']/1000:,.0f}K",
+                          f"{(summary['demand_units'] / summary['base_units'] - 1) * 100:+.1f}%")
+    result_cols[1].metric("Shippable Units", f"{summary['shipped_units']/1000:,.0f}K")
+    result_cols[2].metric("Unfilled Demand", f"{summary['unfilled_units']/1000:,.0f}K")
+    result_cols[3].metric("Revenue", f"${summary['revenue']/1e6:,.1f}M", f"${summary['revenue_change']/1e6:+,.1f}M")
+    
+    monthly = pd.DataFrame({
+        'month': range(1, forecast_horizon + 1),
+        'Base Forecast': scenarios.base.sum(axis=0),
+        'Scenario Demand': scenario['demand'].sum(axis=0),
+        'Shippable': scenario['shipments'].sum(axis=0),
+    })
+    fig = px.line(monthly, x='month', y=['Base Forecast', 'Scenario Demand', 'Shippable'],
+                  color_discrete_sequence=[TELIT_GRAY, TELIT_ORANGE, TELIT_BLUE])
+    fig.update_layout(height=350, xaxis_title="Months ahead", yaxis_title="Units", legend_title="")
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.markdown(render_section_header("Scenario Comparison by Product"), unsafe_allow_html=True)
+    saved_names = scenarios.names()
+    compare_col1, compare_col2 = st.columns(2)
+    with compare_col1:
+        scenario_a = st.selectbox("Compare", saved_names, index=saved_names.index("Baseline"))
+    with compare_col2:
+        scenario_b = st.selectbox("Against", saved_names, index=saved_names.index("Current"))
+    st.dataframe(
+        scenarios.diff(scenario_a, scenario_b, by="product")[['demand_a', 'demand_b', 'demand_change', 'revenue_change']],
+        column_config={
+            "demand_a": st.column_config.NumberColumn(f"{scenario_a} Units", format="%.0f"),
+            "demand_b": st.column_config.NumberColumn(f"{scenario_b} Units", format="%.0f"),
+            "demand_change": st.column_config.NumberColumn("Unit Change", format="%+.0f"),
+            "revenue_change": st.column_config.NumberColumn("Revenue Change ($)", format="%+.0f"),
+        },
+        use_container_width=True
+    )
+
+with tab5:
+    st.markdown(render_section_header("Demand Sensing"), unsafe_allow_html=True)
+    
+    sensor = get_demand_sensor()
+    sources = sensor.source_summary()
+    sensed = get_sensed_forecast(8)
+    
+    signal_col1, signal_col2 = st.columns(2)
+    
+    with signal_col1:
+        fig = px.pie(sources, values="window_units", names="source",
+                     color_discrete_sequence=[TELIT_BLUE, TELIT_GREEN, TELIT_ORANGE, '#6B5B95', TELIT_GRAY])
+        fig.update_traces(textposition='inside', textinfo='percent+label')
+        fig.update_layout(height=300, showlegend=False, title="Signal Volume by Source (sensing window)")
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with signal_col2:
+        sensed = sensed.sort_values('lift_pct')
+        fig = go.Figure(go.Bar(
+            x=sensed['lift_pct'], y=sensed['product'], orientation='h',
+            marker_color=[TELIT_GREEN if v >= 0 else TELIT_ORANGE for v in sensed['lift_pct']]
+        ))
+        fig.update_layout(height=300, title="Sensed Demand Lift (next 8 weeks)", xaxis_title="Lift (%)")
+        st.plotly_chart(fig, use_container_width=True)
+    
+    st.dataframe(
+        sources,
+        column_config={
+            "source": "Source",
+            "window_units": st.column_config.NumberColumn("Window Units", format="%.0f"),
+            "weekly_recent": st.column_config.NumberColumn("Recent / Week", format="%.0f"),
+            "weekly_baseline": st.column_config.NumberColumn("Baseline / Week", format="%.0f"),
+            "lift_pct": st.column_config.NumberColumn("Lift", format="%+.1f%%"),
+            "confidence": st.column_config.ProgressColumn("Confidence", min_value=0, max_value=1),
+            "events": st.column_config.NumberColumn("Events", format="%d"),
+            "skus_moving": st.column_config.NumberColumn("SKUs Moving", format="%d"),
+        },
+        hide_index=True,
+        use_container_width=True
+    )
+    st.caption(f"{int(sensor.events.sum()):,} signal events ingested; {sensor.dropped:,} outside the sensing window or unmatched.")
+
+with tab6:
+    st.markdown(render_section_header("SKU × Customer × Month Demand Cube"), unsafe_allow_html=True)
+    
+    tiler = get_demand_cube_tiler(forecast_horizon)
+    groups = tiler.group_ranges()
+    n_months = tiler.shape[1]
+    
+    cube_col1, cube_col2, cube_col3, cube_col4 = st.columns([2, 3, 1, 1])
+    with cube_col1:
+        drill_group = st.selectbox("Drill into", ["All categories"] + list(groups))
+    with cube_col2:
+        month_range = st.slider("Months (history, then forecast)", 0, n_months, (0, n_months))
+    with cube_col3:
+        cube_style = st.radio("View", ["Heatmap", "3D Surface"])
+    with cube_col4:
+        cube_agg = st.radio("Cell value", ["sum", "mean"])
+    
+    if month_range[0] == month_range[1]:
+        st.info("Select a range of at least one month to draw the demand cube.")
+    else:
+        rows = None if drill_group == "All categories" else groups[drill_group]
+        max_cells = HEATMAP_MAX_CELLS if cube_style == "Heatmap" else SURFACE_MAX_CELLS
+        view = tiler.view(rows, month_range, max_cells, cube_agg)
+        customdata = tiler.customdata(view)
+        
+        if cube_style == "Heatmap":
+            fig = go.Figure(go.Heatmap(
+                z=view['z'], x=view['col_labels'], y=view['row_labels'], customdata=customdata,
+                colorscale=[[0, '#e8f4f8'], [0.5, TELIT_BLUE], [1, TELIT_GREEN]],
+                hovertemplate="%{customdata[0]}<br>Month: %{customdata[1]}<br>Demand: %{z:,.0f}<br>Cells: %{customdata[2]}<extra></extra>"
+            ))
+            fig.update_layout(height=600, yaxis=dict(showticklabels=view['z'].shape[0] <= 30))
+        else:
+            fig = go.Figure(go.Surface(
+                z=view['z'], customdata=customdata, colorscale='viridis',
+                hovertemplate="%{customdata[0]}<br>Month: %{customdata[1]}<br>Demand: %{z:,.0f}<extra></extra>"
+            ))
+            fig.update_layout(height=600, scene=dict(xaxis_title="Month bin", yaxis_title="SKU × customer bin", zaxis_title="Units"))
+        st.plotly_chart(fig, use_container_width=True)
+        st.caption(
+            f"{tiler.shape[0]:,} SKU × customer series × {n_months} months (months marked F are the reconciled forecast) "
+            f"shown as {view['z'].shape[0]} × {view['z'].shape[1]} cells "
+            f"(≈{view['rows_per_bin']:.1f} series × {view['cols_per_bin']:.1f} months per cell)."
+        )
+
+with tab7:
+    st.markdown(render_section_header("S&OP Plan Versions"), unsafe_allow_html=True)
+    
+    plans = get_sop_plan_store(forecast_horizon)
+    st.dataframe(
+        plans.log(),
+        column_config={
+            "version": "Version",
+            "parent": "Branched From",
+            "author": "Owner",
+            "message": "Description",
+            "created": st.column_config.DatetimeColumn("Created", format="MMM D, HH:mm"),
+            "edits": st.column_config.NumberColumn("Cell Edits", format="%d"),
+            "shared_chunks_pct": st.column_config.ProgressColumn("Shared with Baseline", min_value=0, max_value=100, format="%.0f%%"),
+        },
+        hide_index=True,
+        use_container_width=True
+    )
+    
+    names = list(plans.versions)
+    compare_col1, compare_col2 = st.columns(2)
+    with compare_col1:
+        version_a = st.selectbox("Compare", names, index=0)
+    with compare_col2:
+        version_b = st.selectbox("Against", names, index=len(names) - 1)
+    
+    changes = plans.diff(version_a, version_b)
+    if changes.empty:
+        st.info("The selected versions are identical.")
+    else:
+        by_month = changes.groupby(['measure', 'month'], sort=False)['delta'].sum().reset_index()
+        fig = px.bar(by_month, x='month', y='delta', color='measure', barmode='group',
+                     color_discrete_sequence=[TELIT_BLUE, TELIT_ORANGE, TELIT_GREEN])
+        fig.update_layout(height=320, xaxis_title="", yaxis_title="Change (units)", legend_title="")
+        st.plotly_chart(fig, use_container_width=True)
+        st.caption(f"{len(changes):,} changed SKU-month cells between {version_a} and {version_b}.")
+        st.dataframe(changes.sort_values('delta', key=np.abs, ascending=False).head(50),
+                     hide_index=True, use_container_width=True)
+
+with tab8:
+    st.markdown(render_section_header("Design-Win Pipeline Demand"), unsafe_allow_html=True)
+    
+    pipeline = get_design_win_pipeline()
+    dw = get_design_win_demand(forecast_horizon)
+    stages = dw['by_stage'].reset_index()
+    
+    dw_kpis = st.columns(4)
+    dw_kpis[0].metric("Open Opportunities", f"{len(pipeline):,}")
+    dw_kpis[1].metric("Pipeline Annual Volume", f"{pipeline['annual_volume'].sum()/1e6:,.1f}M units")
+    dw_kpis[2].metric("Expected Units (horizon)", f"{dw['expected'].sum()/1e6:,.2f}M")
+    dw_kpis[3].metric("Incremental to Forecast", f"{dw['incremental'].sum()/1e6:,.2f}M",
+                      help="Expected units from wins not yet in shipment history")
+    
+    dw_col1, dw_col2 = st.columns(2)
+    
+    with dw_col1:
+        fig = go.Figure(go.Funnel(
+            y=stages['stage'], x=stages['annual_volume'],
+            marker_color=[TELIT_GRAY, TELIT_ORANGE, TELIT_BLUE, '#6B5B95', TELIT_GREEN]
+        ))
+        fig.update_layout(height=320, title="Pipeline Annual Volume by Stage")
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with dw_col2:
+        by_product = pd.DataFrame({
+            'product': [p['name'] for p in TELIT_PRODUCTS],
+            'In History': dw['expected'].sum(axis=1) - dw['incremental'].sum(axis=1),
+            'Incremental': dw['incremental'].sum(axis=1),
+        }).sort_values('Incremental')
+        fig = px.bar(by_product, y='product', x=['In History', 'Incremental'], orientation='h',
+                     color_discrete_sequence=[TELIT_GRAY, TELIT_GREEN])
+        fig.update_layout(height=320, title="Expected Design-Win Units by Product", xaxis_title="Units",
+                          yaxis_title="", legend_title="")
+        st.plotly_chart(fig, use_container_width=True)
+    
+    adjusted = get_design_win_forecast(forecast_horizon)
+    monthly_dw = pd.DataFrame({
+        'month': range(1, forecast_horizon + 1),
+        'Statistical Forecast': adjusted.sum(axis=0) - dw['incremental'].sum(axis=0),
+        'Forecast + Design Wins': adjusted.sum(axis=0),
+    })
+    fig = px.line(monthly_dw, x='month', y=['Statistical Forecast', 'Forecast + Design Wins'],
+                  color_discrete_sequence=[TELIT_BLUE, TELIT_GREEN])
+    fig.update_layout(height=300, xaxis_title="Months ahead", yaxis_title="Units", legend_title="")
+    st.plotly_chart(fig, use_container_width=True)
+    
+    top = pipeline.assign(expected_units=dw['opportunity_expected'], probability=dw['probability'])
+    st.dataframe(
+        top.nlargest(25, 'expected_units')[['opportunity_id', 'customer', 'application', 'sku', 'stage',
+                                            'probability', 'annual_volume', 'sop_month', 'expected_units']],
+        column_config={
+            "probability": st.column_config.ProgressColumn("Win Probability", min_value=0, max_value=1),
+            "annual_volume": st.column_config.NumberColumn("Annual Volume", format="%.0f"),
+            "sop_month": st.column_config.NumberColumn("SOP (months from now)", format="%d"),
+            "expected_units": st.column_config.NumberColumn("Expected Units", format="%.0f"),
+        },
+        hide_index=True,
+        use_container_width=True
+    )
@@ -4,7 +4,6 @@ Supplier scorecards and performance analytics
 """
 
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
@@ -12,7 +11,12 @@ from components.styles import (
     get_telit_css, render_header, render_section_header,
     TELIT_LOGO_SVG, TELIT_BLUE, TELIT_DARK, TELIT_ORANGE, TELIT_GREEN, TELIT_YELLOW, TELIT_RED, TELIT_GRAY
 )
-from components.fake_data import get_supplier_performance, SUPPLIERS
+from components.fake_data import (
+    get_supplier_performance, get_supplier_trend, get_lead_time_quantiles, get_supplier_risk,
+    get_contract_book, get_contract_evaluation, get_award_split_curve, get_safety_stock_by_supplier, SUPPLIERS
+)
+from components.digital_twin import FACTORY_SITES
+from components.supplier_risk import RISK_WEIGHTS
 from components.charts import create_radar_chart, create_bar_chart
 
 # Page config
@@ -97,7 +101,9 @@ st.markdown("<br>", unsafe_allow_html=True)
 # =============================================================================
 # TABS
 # =============================================================================
-tab1, tab2, tab3 = st.tabs(["📊 Scorecard Overview", "🏆 Supplier Rankings", "📈 Detailed Analysis"])
+tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
+    "📊 Scorecard Overview", "🏆 Supplier Rankings", "📈 Detailed Analysis", "📦 Lead Times", "⚠️ Risk", "📋 Contracts"
+])
 
 with tab1:
     st.markdown(render_section_header("Supplier Scorecards"), unsafe_allow_html=True)
@@ -154,8 +160,8 @@ with tab1:
                         </div>
                         <div>
                             <div style="font-size: 11px; color: {TELIT_GRAY}; margin-bottom: 4px;">RISK LEVEL</div>
-                            <span style="font-weight: 600; font-size: 13px; color: {TELIT_GREEN if supplier['risk_score'] < 0.2 else TELIT_YELLOW if supplier['risk_score'] < 0.3 else TELIT_RED};">
-                                {'Low' if supplier['risk_score'] < 0.2 else 'Medium' if supplier['risk_score'] < 0.3 else 'High'}
+                            <span style="font-weight: 600; font-size: 13px; color: {TELIT_GREEN if supplier['risk_score'] < 0.25 else TELIT_YELLOW if supplier['risk_score'] < 0.4 else TELIT_RED};">
+                                {'Low' if supplier['risk_score'] < 0.25 else 'Medium' if supplier['risk_score'] < 0.4 else 'High'}
                             </span>
                         </div>
                     </div>
@@ -257,22 +263,10 @@ with tab3:
     # Performance trends
     st.markdown(render_section_header("Performance Trends"), unsafe_allow_html=True)
     
-    import numpy as np
-    from datetime import datetime, timedelta
-    
-    months = pd.date_range(end=datetime.now(), periods=12, freq='M')
-    trend_data = []
-    
-    for sup in supplier_df['name'].tolist()[:4]:
-        base_otd = supplier_df[supplier_df['name'] == sup]['on_time_delivery'].values[0]
-        for m in months:
-            trend_data.append({
-                'month': m,
-                'supplier': sup,
-                'on_time_delivery': base_otd + np.random.normal(0, 2)
-            })
-    
-    trend_df = pd.DataFrame(trend_data)
+    trend_df = (get_supplier_trend("on_time_delivery")
+                .loc[supplier_df['name'].tolist()[:4]]
+                .rename_axis('supplier').reset_index()
+                .melt(id_vars='supplier', var_name='month', value_name='on_time_delivery'))
     
     fig = px.line(trend_df, x='month', y='on_time_delivery', color='supplier',
                   color_discrete_sequence=[TELIT_BLUE, TELIT_ORANGE, TELIT_GREEN, '#9c27b0'])
@@ -283,3 +277,146 @@ with tab3:
     )
     st.plotly_chart(fig, use_container_width=True)
 
+with tab4:
+    st.markdown(render_section_header("Lead-Time Distribution"), unsafe_allow_html=True)
+    
+    site = st.selectbox("Receiving site", ["All sites"] + [f["name"] for f in FACTORY_SITES])
+    site_filter = {} if site == "All sites" else {"site": site}
+    lead_df = get_lead_time_quantiles("supplier", **site_filter)
+    lead_df = lead_df[lead_df['name'].isin(supplier_df['name'])]
+    
+    fig = go.Figure()
+    for col, label, color in [('p50', 'P50', TELIT_BLUE), ('p90', 'P90', TELIT_ORANGE), ('p99', 'P99', TELIT_RED)]:
+        fig.add_trace(go.Bar(name=label, x=lead_df['name'], y=lead_df[col], marker_color=color))
+    fig.update_layout(
+        height=380,
+        barmode='group',
+        yaxis_title="Lead time (days)",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    selected = st.selectbox("Part-level detail for", lead_df['name'].tolist())
+    supplier_id = lead_df.loc[lead_df['name'] == selected, 'supplier'].iloc[0]
+    st.dataframe(
+        get_lead_time_quantiles(("part", "site"), supplier=supplier_id, **site_filter),
+        column_config={
+            "part": "Part",
+            "site": "Site",
+            "receipts": st.column_config.NumberColumn("Receipts", format="%d"),
+            "mean": st.column_config.NumberColumn("Mean (days)", format="%.1f"),
+            "p50": st.column_config.NumberColumn("P50", format="%.1f"),
+            "p90": st.column_config.NumberColumn("P90", format="%.1f"),
+            "p99": st.column_config.NumberColumn("P99", format="%.1f"),
+        },
+        hide_index=True,
+        use_container_width=True
+    )
+
+with tab5:
+    st.markdown(render_section_header("Composite Supplier Risk"), unsafe_allow_html=True)
+    
+    risk_df = get_supplier_risk()
+    risk_df = risk_df[risk_df['name'].isin(supplier_df['name'])]
+    
+    fig = go.Figure()
+    for factor, color in [('geographic', TELIT_RED), ('financial', TELIT_ORANGE),
+                          ('delivery', TELIT_YELLOW), ('quality', TELIT_BLUE)]:
+        fig.add_trace(go.Bar(
+            name=factor.title(), x=risk_df['name'], y=risk_df[factor] * RISK_WEIGHTS[factor], marker_color=color
+        ))
+    fig.update_layout(
+        height=380,
+        barmode='stack',
+        yaxis_title="Weighted risk contribution",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.dataframe(
+        risk_df,
+        column_config={
+            "name": "Supplier",
+            "country": "Country",
+            "financial": st.column_config.ProgressColumn("Financial", min_value=0, max_value=1, format="%.2f"),
+            "geographic": st.column_config.ProgressColumn("Geographic", min_value=0, max_value=1, format="%.2f"),
+            "delivery": st.column_config.ProgressColumn("Delivery", min_value=0, max_value=1, format="%.2f"),
+            "quality": st.column_config.ProgressColumn("Quality", min_value=0, max_value=1, format="%.2f"),
+            "risk_score": st.column_config.NumberColumn("Risk Score", format="%.2f"),
+            "risk_level": "Level",
+        },
+        hide_index=True,
+        use_container_width=True
+    )
+    st.caption("Scores refresh only for suppliers whose financial, scorecard, lead-time or country inputs changed.")
+    
+    st.markdown(render_section_header("Safety Stock Cover by Supplier"), unsafe_allow_html=True)
+    cover_df = get_safety_stock_by_supplier()
+    for row in cover_df.itertuples():
+        st.markdown(f"- **{row.supplier}**: recommend {row.optimized_weeks:.1f}-week safety stock vs current "
+                    f"{row.current_weeks:.1f} weeks across {row.skus} SKUs "
+                    f"({'ties up' if row.working_capital_change > 0 else 'frees'} "
+                    f"${abs(row.working_capital_change) / 1000:,.0f}K working capital)")
+    st.caption("Multi-echelon optimizer at 95% service level, using sketched supplier lead-time P50/P90.")
+
+with tab6:
+    st.markdown(render_section_header("Contract Cost of the Demand Plan"), unsafe_allow_html=True)
+    
+    ctrl1, ctrl2 = st.columns(2)
+    with ctrl1:
+        primary_share = st.slider("Award share to primary suppliers", 0, 100, 80, 5) / 100
+    with ctrl2:
+        growth = st.slider("Plan volume vs trailing year", 50, 150, 100, 5) / 100
+    
+    contract_df = get_contract_evaluation(primary_share, growth)
+    curve = get_award_split_curve(growth)
+    best = curve.loc[curve['net_cost'].idxmin()]
+    
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Net Annual Cost", f"${contract_df['net_cost'].sum()/1e6:.2f}M")
+    m2.metric("Payment-Term Savings", f"${contract_df['terms_savings'].sum()/1e3:.0f}K")
+    m3.metric("Commitment Shortfall", f"${contract_df['shortfall_penalty'].sum()/1e3:.0f}K")
+    m4.metric("Lowest-Cost Split", f"{best['primary_share']:.0%} primary",
+              f"${(best['net_cost'] - contract_df['net_cost'].sum())/1e3:,.0f}K", delta_color="inverse")
+    
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        fig = go.Figure(go.Scatter(x=curve['primary_share'] * 100, y=curve['net_cost'] / 1e6,
+                                   mode='lines+markers', line=dict(color=TELIT_BLUE, width=3)))
+        fig.add_vline(x=primary_share * 100, line_dash="dash", line_color=TELIT_ORANGE)
+        fig.update_layout(height=320, xaxis_title="Primary supplier share (%)", yaxis_title="Net annual cost ($M)")
+        st.plotly_chart(fig, use_container_width=True)
+    with col2:
+        st.markdown("##### 📅 Contract Terms")
+        st.dataframe(
+            get_contract_book().terms_summary(contract_df['spend']),
+            column_config={
+                "term": "Term",
+                "contracts": "Contracts",
+                "annual_value": st.column_config.NumberColumn("Annual Value", format="$%.0f"),
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+    
+    st.dataframe(
+        contract_df.drop(columns=['supplier_id']),
+        column_config={
+            "contract_id": "Contract",
+            "supplier": "Supplier",
+            "part": "Part",
+            "pricing": "Pricing",
+            "volume": st.column_config.NumberColumn("Volume", format="%.0f"),
+            "tier": "Tier",
+            "tiers": "Tiers",
+            "unit_price": st.column_config.NumberColumn("Unit Price", format="$%.4f"),
+            "spend": st.column_config.NumberColumn("Spend", format="$%.0f"),
+            "shortfall_penalty": st.column_config.NumberColumn("Shortfall", format="$%.0f"),
+            "terms_savings": st.column_config.NumberColumn("Terms Savings", format="$%.0f"),
+            "net_cost": st.column_config.NumberColumn("Net Cost", format="$%.0f"),
+            "next_break_qty": st.column_config.NumberColumn("Next Break", format="%.0f"),
+            "next_break_price": st.column_config.NumberColumn("Next Price", format="$%.4f"),
+        },
+        hide_index=True,
+        use_container_width=True
+    )
@@ -13,7 +13,15 @@ from components.styles import (
     get_telit_css, render_header, render_section_header, render_alert_card,
     TELIT_LOGO_SVG, TELIT_BLUE, TELIT_DARK, TELIT_ORANGE, TELIT_GREEN, TELIT_YELLOW, TELIT_RED, TELIT_GRAY
 )
-from components.fake_data import get_quality_metrics, get_defect_data, get_control_chart_data
+from components.fake_data import (
+    get_quality_metrics, get_defect_data, get_defect_trend, get_defect_heatmap, get_spc_monitor, get_capability, get_test_store, get_test_summary,
+    get_station_yield, get_yield_trend, get_ncr_store,
+    get_inspection_planner, get_inspection_results, get_inspection_queue,
+    SPC_PARAMETERS, BOARD_DESIGNS, SUPPLIERS, TELIT_PRODUCTS
+)
+from components.spc import NELSON_RULES, WESTERN_ELECTRIC_RULES, rule_mask
+from components.ncr_store import NCR_STATUSES, CAPA_STATUSES, ROOT_CAUSES
+from components.incoming_inspection import INSPECTION_LEVELS
 from components.charts import create_pareto_chart, create_control_chart, create_gauge_chart
 
 # Page config
@@ -40,9 +48,8 @@ with st.sidebar:
 st.markdown(render_header("Quality Control", "SPC analytics, defect tracking, and quality metrics"), unsafe_allow_html=True)
 
 # Get data
-quality_metrics = get_quality_metrics()
-defect_df = get_defect_data()
-control_df = get_control_chart_data()
+quality_metrics = get_quality_metrics(line=production_line)
+defect_df = get_defect_data(line=production_line)
 
 # =============================================================================
 # KPI CARDS
@@ -52,8 +59,8 @@ col1, col2, col3, col4, col5 = st.columns(5)
 with col1:
     st.markdown(f"""
         <div class="kpi-card" style="text-align: center;">
-            <div class="kpi-label">First Pass Yield</div>
-            <div class="kpi-value" style="color: {TELIT_GREEN};">{quality_metrics['first_pass_yield']}%</div>
+            <div class="kpi-label">Rolled Throughput Yield</div>
+            <div class="kpi-value" style="color: {TELIT_GREEN};">{quality_metrics['rolled_throughput_yield']}%</div>
         </div>
     """, unsafe_allow_html=True)
 
@@ -84,8 +91,8 @@ with col4:
 with col5:
     st.markdown(f"""
         <div class="kpi-card" style="text-align: center;">
-            <div class="kpi-label">Customer Returns</div>
-            <div class="kpi-value">{quality_metrics['customer_returns']}%</div>
+            <div class="kpi-label">Cost of Poor Quality</div>
+            <div class="kpi-value">${quality_metrics['quality_cost']:,}</div>
         </div>
     """, unsafe_allow_html=True)
 
@@ -94,7 +101,10 @@ st.markdown("<br>", unsafe_allow_html=True)
 # =============================================================================
 # TABS
 # =============================================================================
-tab1, tab2, tab3 = st.tabs(["📊 Defect Analysis", "📈 Control Charts", "🔍 Root Cause"])
+tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs([
+    "📊 Defect Analysis", "📈 Control Charts", "🔍 Root Cause", "🎯 Capability", "🧪 Testing", "🔁 Yield",
+    "📋 NCR/CAPA", "📦 Incoming"
+])
 
 with tab1:
     col1, col2 = st.columns([2, 1])
@@ -107,7 +117,7 @@ with tab1:
     with col2:
         st.markdown(render_section_header("Quality Gauges"), unsafe_allow_html=True)
         
-        fig1 = create_gauge_chart(quality_metrics['first_pass_yield'], "FPY", suffix="%", threshold_good=98, threshold_warning=95)
+        fig1 = create_gauge_chart(quality_metrics['rolled_throughput_yield'], "RTY", suffix="%", threshold_good=98, threshold_warning=95)
         st.plotly_chart(fig1, use_container_width=True)
         
         fig2 = create_gauge_chart(100 - quality_metrics['defect_rate'], "Quality Rate", suffix="%", threshold_good=99, threshold_warning=98)
@@ -116,64 +126,125 @@ with tab1:
     # Defect trend
     st.markdown(render_section_header("Defect Trend (30 Days)"), unsafe_allow_html=True)
     
-    from datetime import datetime, timedelta
-    dates = [datetime.now() - timedelta(days=x) for x in range(30, 0, -1)]
-    trend_df = pd.DataFrame({
-        'date': dates,
-        'defects': [int(50 + np.sin(i/5) * 15 + np.random.normal(0, 5)) for i in range(30)],
-        'target': [45] * 30
-    })
+    trend_df = get_defect_trend(line=production_line)
+    trend_df['baseline'] = trend_df['defects'].iloc[:-1].median()
     
     fig = go.Figure()
     fig.add_trace(go.Scatter(x=trend_df['date'], y=trend_df['defects'], mode='lines+markers',
                              name='Defects', line=dict(color=TELIT_BLUE, width=2)))
-    fig.add_trace(go.Scatter(x=trend_df['date'], y=trend_df['target'], mode='lines',
-                             name='Target', line=dict(color=TELIT_GREEN, dash='dash')))
+    fig.add_trace(go.Scatter(x=trend_df['date'], y=trend_df['baseline'], mode='lines',
+                             name='30-Day Median', line=dict(color=TELIT_GREEN, dash='dash')))
     fig.update_layout(height=300, legend=dict(orientation="h", yanchor="bottom", y=1.02))
     st.plotly_chart(fig, use_container_width=True)
+    
+    # Defect locations on the board
+    st.markdown(render_section_header("Defect Heatmap by PCB Location"), unsafe_allow_html=True)
+    
+    hm1, hm2 = st.columns([1, 3])
+    with hm1:
+        design = st.selectbox("Board Design", list(BOARD_DESIGNS))
+        heat_days = st.select_slider("Period", options=[1, 7, 14, 30], value=7, format_func=lambda d: f"{d} days")
+    heat = get_defect_heatmap(design, days=heat_days, line=production_line)
+    cells = heat['counts']
+    with hm1:
+        st.metric("Defects", f"{int(cells.sum()):,}")
+        if cells.sum():
+            cy, cx = np.unravel_index(cells.argmax(), cells.shape)
+            st.metric("Hotspot (x, y mm)",
+                      f"{(heat['x_edges'][cx] + heat['x_edges'][cx + 1]) / 2:.1f}, "
+                      f"{(heat['y_edges'][cy] + heat['y_edges'][cy + 1]) / 2:.1f}")
+    with hm2:
+        if not cells.sum():
+            st.info(f"No {design} defects on {production_line} in the last {heat_days} days.")
+        else:
+            x_mid = (heat['x_edges'][:-1] + heat['x_edges'][1:]) / 2
+            y_mid = (heat['y_edges'][:-1] + heat['y_edges'][1:]) / 2
+            fig = go.Figure(go.Heatmap(z=cells, x=x_mid, y=y_mid, colorscale='YlOrRd',
+                                       hovertemplate='x %{x:.1f} mm, y %{y:.1f} mm<br>%{z} defects<extra></extra>'))
+            width, height = BOARD_DESIGNS[design]
+            fig.update_layout(height=420, xaxis_title="x (mm)", yaxis_title="y (mm)",
+                              yaxis=dict(scaleanchor="x", range=[0, height]), xaxis=dict(range=[0, width]))
+            st.plotly_chart(fig, use_container_width=True)
 
 with tab2:
     st.markdown(render_section_header("Statistical Process Control"), unsafe_allow_html=True)
     
-    # Control chart
-    fig = create_control_chart(control_df, "Solder Paste Thickness (mm)")
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Alert for out-of-control points
-    out_of_control = control_df[(control_df['value'] > control_df['ucl']) | (control_df['value'] < control_df['lcl'])]
-    
-    if len(out_of_control) > 0:
-        st.markdown(render_alert_card(
-            f"<strong>{len(out_of_control)} out-of-control points detected!</strong><br>"
-            f"Dates: {', '.join(out_of_control['date'].dt.strftime('%Y-%m-%d').tolist())}",
-            "warning", "⚠️"
-        ), unsafe_allow_html=True)
-    
-    st.markdown("<br>", unsafe_allow_html=True)
-    
-    # Multiple control charts
-    col1, col2 = st.columns(2)
+    ctrl1, ctrl2, ctrl3, ctrl4 = st.columns(4)
+    with ctrl1:
+        spc_param = st.selectbox("Parameter", list(SPC_PARAMETERS))
+    with ctrl2:
+        chart_type = st.selectbox("Chart", ["X-bar / R", "I-MR", "EWMA"])
+    with ctrl3:
+        rule_set = st.selectbox("Rules", ["Western Electric", "All Nelson"])
     
-    with col1:
-        st.markdown("**X-bar Chart (Mean)**")
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=control_df['date'], y=control_df['value'], mode='lines+markers',
-                                 line=dict(color=TELIT_BLUE)))
-        fig.add_hline(y=control_df['mean'].iloc[0], line_dash="dot", line_color=TELIT_GREEN)
-        fig.add_hline(y=control_df['ucl'].iloc[0], line_dash="dash", line_color=TELIT_RED)
-        fig.add_hline(y=control_df['lcl'].iloc[0], line_dash="dash", line_color=TELIT_RED)
-        fig.update_layout(height=250, margin=dict(l=40, r=20, t=20, b=40))
-        st.plotly_chart(fig, use_container_width=True)
+    monitor = get_spc_monitor(1 if chart_type == "I-MR" else 5)
+    streams = monitor.streams
+    candidates = streams[(streams['parameter'] == spc_param) &
+                         ((production_line == "All Lines") | (streams['line'] == production_line))]
     
-    with col2:
-        st.markdown("**R Chart (Range)**")
-        range_values = [abs(np.random.normal(0, 0.2)) for _ in range(30)]
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=control_df['date'], y=range_values, mode='lines+markers',
-                                 line=dict(color=TELIT_ORANGE)))
-        fig.add_hline(y=0.4, line_dash="dash", line_color=TELIT_RED)
-        fig.update_layout(height=250, margin=dict(l=40, r=20, t=20, b=40))
+    if candidates.empty:
+        st.info(f"No {spc_param} measurements on {production_line}.")
+    else:
+        with ctrl4:
+            station = st.selectbox("Station", candidates['station'].tolist())
+        stream = int(candidates.index[candidates['station'] == station][0])
+        rules = WESTERN_ELECTRIC_RULES if rule_set == "Western Electric" else tuple(NELSON_RULES)
+        unit = SPC_PARAMETERS[spc_param]['unit']
+        
+        control_df = monitor.chart(stream, "ewma" if chart_type == "EWMA" else "xbar", last=168)
+        label = {"X-bar / R": "Subgroup Mean", "I-MR": "Individual", "EWMA": "EWMA"}[chart_type]
+        fig = create_control_chart(control_df, f"{spc_param} ({unit}) — {label}, rolling limits")
         st.plotly_chart(fig, use_container_width=True)
+        
+        # Rule violations on the plotted points
+        points = monitor.chart(stream, "xbar", last=168)
+        flagged = points[(points['rules'] & rule_mask(rules)) > 0]
+        if len(flagged) > 0:
+            hit = np.bitwise_or.reduce(flagged['rules'].to_numpy() & rule_mask(rules))
+            st.markdown(render_alert_card(
+                f"<strong>{len(flagged)} points violate {rule_set} rules</strong><br>"
+                + "<br>".join(f"Rule {r}: {NELSON_RULES[r]}" for r in rules if hit & (1 << (r - 1)))
+                + f"<br>Last: {pd.Timestamp(flagged['date'].iloc[-1]):%Y-%m-%d %H:%M}",
+                "warning", "⚠️"
+            ), unsafe_allow_html=True)
+        
+        st.markdown("<br>", unsafe_allow_html=True)
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown(f"**{'Moving Range' if chart_type == 'I-MR' else 'R Chart (Range)'}**")
+            range_df = monitor.chart(stream, "range", last=168)
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(x=range_df['date'], y=range_df['value'], mode='lines+markers',
+                                     line=dict(color=TELIT_ORANGE)))
+            fig.add_trace(go.Scatter(x=range_df['date'], y=range_df['mean'], mode='lines',
+                                     line=dict(color=TELIT_GREEN, dash='dot')))
+            fig.add_trace(go.Scatter(x=range_df['date'], y=range_df['ucl'], mode='lines',
+                                     line=dict(color=TELIT_RED, dash='dash')))
+            fig.update_layout(height=250, margin=dict(l=40, r=20, t=20, b=40), showlegend=False)
+            st.plotly_chart(fig, use_container_width=True)
+        
+        with col2:
+            st.markdown("**All Stations — Last 25 Points**")
+            status = monitor.status(last=25, rules=rules)
+            status = status[(production_line == "All Lines") | (status['line'] == production_line)]
+            st.dataframe(
+                status.sort_values('violations', ascending=False)[['line', 'station', 'parameter', 'value', 'ucl', 'lcl', 'violations', 'rules_hit']],
+                column_config={
+                    "line": "Line",
+                    "station": "Station",
+                    "parameter": "Parameter",
+                    "value": st.column_config.NumberColumn("Last", format="%.2f"),
+                    "ucl": st.column_config.NumberColumn("UCL", format="%.2f"),
+                    "lcl": st.column_config.NumberColumn("LCL", format="%.2f"),
+                    "violations": "Violations",
+                    "rules_hit": "Rules",
+                },
+                hide_index=True,
+                use_container_width=True,
+                height=250
+            )
 
 with tab3:
     st.markdown(render_section_header("Root Cause Analysis"), unsafe_allow_html=True)
@@ -244,3 +315,368 @@ with tab3:
             </div>
         """, unsafe_allow_html=True)
 
+with tab4:
+    st.markdown(render_section_header("Process Capability"), unsafe_allow_html=True)
+    
+    ctrl1, ctrl2, ctrl3 = st.columns(3)
+    with ctrl1:
+        cap_param = st.selectbox("Parameter", list(SPC_PARAMETERS), key="cap_param")
+    with ctrl2:
+        cap_window = st.selectbox("Window", ["Last 24 hours", "Last 7 days", "Last 30 days"], index=1)
+    with ctrl3:
+        cap_by = st.multiselect("Group by", ["product", "line", "shift"], default=["product", "line"])
+    
+    days = {"Last 24 hours": 1, "Last 7 days": 7, "Last 30 days": 30}[cap_window]
+    capability = get_capability(days, ("parameter", *cap_by))
+    cap_df = capability['table']
+    rows = (cap_df['parameter'] == cap_param).to_numpy()
+    if production_line != "All Lines" and "line" in cap_by:
+        rows &= (cap_df['line'] == production_line).to_numpy()
+    cap_view = cap_df[rows]
+    histograms = capability['histograms'][rows]
+    edges = capability['edges'][cap_param]
+    
+    if cap_view.empty:
+        st.info(f"No {cap_param} measurements on {production_line}.")
+    else:
+        label = cap_view[cap_by].astype(str).agg(" · ".join, axis=1) if cap_by else pd.Series(["All"], index=cap_view.index)
+        
+        col1, col2 = st.columns([3, 2])
+        with col1:
+            selected = st.selectbox("Histogram for", label.tolist())
+            pos = label.tolist().index(selected)
+            spec = cap_view.iloc[pos]
+            fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=histograms[pos],
+                                   width=np.diff(edges), marker_color=TELIT_BLUE))
+            fig.add_vline(x=spec['lsl'], line_dash="dash", line_color=TELIT_RED, annotation_text="LSL")
+            fig.add_vline(x=spec['usl'], line_dash="dash", line_color=TELIT_RED, annotation_text="USL")
+            fig.add_vline(x=spec['mean'], line_dash="dot", line_color=TELIT_GREEN)
+            fig.update_layout(height=320, bargap=0, xaxis_title=f"{cap_param} ({SPC_PARAMETERS[cap_param]['unit']})",
+                              yaxis_title="Units")
+            st.plotly_chart(fig, use_container_width=True)
+        
+        with col2:
+            st.markdown("<br>", unsafe_allow_html=True)
+            k1, k2 = st.columns(2)
+            k1.metric("Cpk", f"{spec['cpk']:.2f}")
+            k2.metric("Ppk", f"{spec['ppk']:.2f}")
+            k1.metric("Ppk (percentile)", f"{spec['ppk_percentile']:.2f}")
+            k2.metric("Out of Spec", f"{spec['ppm_out']:.0f} PPM")
+            st.caption(f"{spec['n']:,} measurements · σ within {spec['sigma_within']:.3f} · σ overall {spec['sigma_overall']:.3f}")
+        
+        st.dataframe(
+            cap_view.drop(columns=['parameter', 'lsl', 'usl']).sort_values('ppk'),
+            column_config={
+                "product": "Product",
+                "line": "Line",
+                "shift": "Shift",
+                "n": st.column_config.NumberColumn("Units", format="%d"),
+                "mean": st.column_config.NumberColumn("Mean", format="%.3f"),
+                "sigma_within": st.column_config.NumberColumn("σ Within", format="%.3f"),
+                "sigma_overall": st.column_config.NumberColumn("σ Overall", format="%.3f"),
+                "cp": st.column_config.NumberColumn("Cp", format="%.2f"),
+                "cpk": st.column_config.NumberColumn("Cpk", format="%.2f"),
+                "pp": st.column_config.NumberColumn("Pp", format="%.2f"),
+                "ppk": st.column_config.NumberColumn("Ppk", format="%.2f"),
+                "pp_percentile": st.column_config.NumberColumn("Pp (pct)", format="%.2f"),
+                "ppk_percentile": st.column_config.NumberColumn("Ppk (pct)", format="%.2f"),
+                "ppm_out": st.column_config.NumberColumn("PPM Out", format="%.0f"),
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+
+with tab5:
+    st.markdown(render_section_header("Test Results by Station"), unsafe_allow_html=True)
+    
+    test_days = st.select_slider("Window (days)", [1, 7, 14, 30], value=7)
+    line_filter = {} if production_line == "All Lines" else {"line": production_line}
+    summary = get_test_summary(("line", "station", "parameter"), test_days, **line_filter)
+    store = get_test_store()
+    
+    t1, t2, t3, t4 = st.columns(4)
+    t1.metric("Measurements", f"{summary['tested'].sum():,}")
+    t2.metric("Failures", f"{summary['failed'].sum():,}")
+    t3.metric("Pass Rate", f"{(1 - summary['failed'].sum() / max(summary['tested'].sum(), 1)) * 100:.3f}%")
+    t4.metric("Store Size", f"{store.disk_usage().sum() / 1e6:.0f} MB", f"{store.rows:,} rows", delta_color="off")
+    
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        pivot = summary.pivot_table(index='station', columns='parameter', values='pass_rate', observed=True)
+        fig = go.Figure(go.Heatmap(z=pivot.values, x=pivot.columns.astype(str), y=pivot.index.astype(str),
+                                   colorscale='RdYlGn', zmin=99.5, zmax=100, colorbar=dict(title="Pass %")))
+        fig.update_layout(height=420, margin=dict(l=20, r=20, t=20, b=20))
+        st.plotly_chart(fig, use_container_width=True)
+    with col2:
+        st.dataframe(
+            summary.sort_values('failed', ascending=False).head(15),
+            column_config={
+                "line": "Line",
+                "station": "Station",
+                "parameter": "Parameter",
+                "tested": st.column_config.NumberColumn("Tested", format="%d"),
+                "failed": st.column_config.NumberColumn("Failed", format="%d"),
+                "pass_rate": st.column_config.NumberColumn("Pass %", format="%.3f"),
+            },
+            hide_index=True,
+            use_container_width=True,
+            height=420
+        )
+
+with tab6:
+    st.markdown(render_section_header("Yield Along the Process Route"), unsafe_allow_html=True)
+    
+    yield_days = st.select_slider("Window", options=[1, 7, 14, 30], value=7, format_func=lambda d: f"{d} days",
+                                  key="yield_days")
+    stations = get_station_yield(yield_days, production_line)
+    worst = stations.loc[stations['fpy'].idxmin()]
+    
+    y1, y2, y3, y4 = st.columns(4)
+    y1.metric("Units Started", f"{stations['entered'].iloc[0]:,}")
+    y2.metric("Rolled Throughput Yield", f"{stations['rty_cumulative'].iloc[-1] * 100:.2f}%")
+    y3.metric("Lowest FPY", f"{worst['fpy'] * 100:.2f}%", worst['station'], delta_color="off")
+    y4.metric("Units in Rework", f"{stations['in_rework'].sum():,}")
+    
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        fig = go.Figure()
+        fig.add_trace(go.Bar(x=stations['station'], y=stations['fpy'] * 100, name='First Pass Yield',
+                             marker_color=[TELIT_RED if s == worst['station'] else TELIT_BLUE for s in stations['station']]))
+        fig.add_trace(go.Scatter(x=stations['station'], y=stations['rty_cumulative'] * 100, name='Cumulative RTY',
+                                 mode='lines+markers', line=dict(color=TELIT_ORANGE, width=2)))
+        fig.update_layout(height=380, yaxis=dict(title="Yield (%)", range=[min(90, stations['rty_cumulative'].min() * 100 - 1), 100]),
+                          legend=dict(orientation="h", yanchor="bottom", y=1.02))
+        st.plotly_chart(fig, use_container_width=True)
+    with col2:
+        st.dataframe(
+            stations[['station', 'entered', 'fpy', 'final_yield', 'rework_rate', 'retests_per_unit', 'scrapped']],
+            column_config={
+                "station": "Station",
+                "entered": st.column_config.NumberColumn("Units", format="%d"),
+                "fpy": st.column_config.NumberColumn("FPY", format="%.4f"),
+                "final_yield": st.column_config.NumberColumn("Final Yield", format="%.4f"),
+                "rework_rate": st.column_config.NumberColumn("Reworked", format="%.4f"),
+                "retests_per_unit": st.column_config.NumberColumn("Retests/Unit", format="%.4f"),
+                "scrapped": st.column_config.NumberColumn("Scrapped", format="%d"),
+            },
+            hide_index=True,
+            use_container_width=True,
+            height=380
+        )
+    
+    st.markdown(render_section_header("Daily Rolled Throughput Yield"), unsafe_allow_html=True)
+    trend = get_yield_trend(30, production_line)
+    fig = px.line(trend, x='date', y=trend['rty'] * 100, color='line', markers=True,
+                  hover_data=['units', 'worst_station'],
+                  color_discrete_sequence=[TELIT_BLUE, TELIT_ORANGE, TELIT_GREEN])
+    fig.update_layout(height=320, yaxis_title="RTY (%)", xaxis_title="",
+                      legend=dict(orientation="h", yanchor="bottom", y=1.02))
+    st.plotly_chart(fig, use_container_width=True)
+
+with tab7:
+    st.markdown(render_section_header("Non-Conformance & Corrective Actions"), unsafe_allow_html=True)
+    
+    ncr_store = get_ncr_store()
+    kpis = ncr_store.kpis()
+    k1, k2, k3, k4, k5 = st.columns(5)
+    k1.metric("Open NCRs", f"{kpis['open_ncrs']:,}")
+    k2.metric("Open CAPAs", f"{kpis['open_capas']:,}")
+    k3.metric("Avg Closure (90d)", f"{kpis['avg_closure_days'] or 0:.1f} days")
+    k4.metric("Overdue", f"{kpis['overdue_ncrs'] + kpis['overdue_capas']:,}",
+              f"{kpis['overdue_ncrs']} NCR / {kpis['overdue_capas']} CAPA", delta_color="off")
+    k5.metric("CAPA Effectiveness", f"{kpis['capa_effectiveness'] or 0:.0f}%")
+    
+    f1, f2, f3, f4, f5 = st.columns([1, 2, 2, 2, 2])
+    with f1:
+        record_type = st.radio("Records", ["NCR", "CAPA"], horizontal=True)
+    table = record_type.lower()
+    with f2:
+        ncr_status = st.multiselect("Status", NCR_STATUSES if table == "ncr" else CAPA_STATUSES,
+                                    default=[s for s in (NCR_STATUSES if table == "ncr" else CAPA_STATUSES) if s != "Closed"])
+    with f3:
+        supplier_names = {s['id']: s['name'] for s in SUPPLIERS}
+        ncr_supplier = st.selectbox("Supplier", ["All Suppliers"] + list(supplier_names),
+                                    format_func=lambda s: supplier_names.get(s, s))
+    with f4:
+        ncr_product = st.selectbox("Product", ["All Products"] + [p['sku'] for p in TELIT_PRODUCTS], key="ncr_product")
+    with f5:
+        ncr_causes = st.multiselect("Root Cause", ROOT_CAUSES)
+    filters = {
+        "status": ncr_status,
+        "supplier_id": None if ncr_supplier == "All Suppliers" else ncr_supplier,
+        "product": None if ncr_product == "All Products" else ncr_product,
+        "root_cause": ncr_causes,
+    }
+    
+    p1, p2, p3, p4 = st.columns([2, 1, 1, 2])
+    with p1:
+        order_by = st.selectbox("Sort by", ["opened", "due_date", "status", "root_cause"] +
+                                (["qty_affected"] if table == "ncr" else ["effectiveness"]),
+                                format_func=lambda c: c.replace("_", " ").title())
+    with p2:
+        descending = st.toggle("Newest first", value=True)
+    with p3:
+        page_size = st.selectbox("Rows", [25, 50, 100], index=1)
+    matches = ncr_store.count(table, **filters)
+    pages = max((matches - 1) // page_size + 1, 1)
+    with p4:
+        page = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, value=1) - 1
+    
+    records, matches = ncr_store.query(table, page=page, page_size=page_size, order_by=order_by,
+                                       descending=descending, **filters)
+    st.caption(f"{matches:,} matching {record_type}s · showing {page * page_size + 1 if matches else 0:,}–"
+               f"{min((page + 1) * page_size, matches):,}")
+    records['supplier'] = records['supplier_id'].map(supplier_names)
+    st.dataframe(
+        records.drop(columns=['supplier_id']),
+        column_config={
+            "opened": st.column_config.DateColumn("Opened"),
+            "due_date": st.column_config.DateColumn("Due"),
+            "closed": st.column_config.DateColumn("Closed"),
+            "qty_affected": st.column_config.NumberColumn("Qty Affected", format="%d"),
+            "effectiveness": st.column_config.NumberColumn("Effectiveness", format="%.0f%%"),
+        },
+        hide_index=True,
+        use_container_width=True,
+        height=400
+    )
+    
+    scope = {k: v for k, v in filters.items() if k != "status"}
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.markdown(f"##### ⏱️ Open {record_type} Aging")
+        aging = ncr_store.aging(table, **scope)
+        fig = go.Figure()
+        fig.add_trace(go.Bar(x=aging['age'], y=aging['open'] - aging['overdue'], name='On time', marker_color=TELIT_BLUE))
+        fig.add_trace(go.Bar(x=aging['age'], y=aging['overdue'], name='Overdue', marker_color=TELIT_RED))
+        fig.update_layout(height=260, barmode='stack', margin=dict(l=20, r=20, t=10, b=40),
+                          legend=dict(orientation="h", yanchor="bottom", y=1.02))
+        st.plotly_chart(fig, use_container_width=True)
+    with col2:
+        st.markdown(f"##### 📈 {record_type} Trend (Monthly)")
+        trend = ncr_store.monthly_trend(table, months=12, **scope)
+        fig = go.Figure()
+        fig.add_trace(go.Bar(name="Opened", x=trend['month'], y=trend['opened'], marker_color=TELIT_ORANGE))
+        fig.add_trace(go.Bar(name="Closed", x=trend['month'], y=trend['closed'], marker_color=TELIT_GREEN))
+        fig.update_layout(height=260, barmode='group', margin=dict(l=20, r=20, t=10, b=40),
+                          legend=dict(orientation="h", yanchor="bottom", y=1.02))
+        st.plotly_chart(fig, use_container_width=True)
+    with col3:
+        st.markdown(f"##### 🔍 Open {record_type}s by Root Cause")
+        causes = ncr_store.breakdown("root_cause", table, **{k: v for k, v in scope.items() if k != "root_cause"})
+        fig = px.pie(causes, names='root_cause', values='records', hole=0.5,
+                     color_discrete_sequence=[TELIT_BLUE, TELIT_ORANGE, TELIT_GREEN, TELIT_YELLOW, TELIT_RED, TELIT_GRAY])
+        fig.update_layout(height=260, margin=dict(l=20, r=20, t=10, b=40))
+        st.plotly_chart(fig, use_container_width=True)
+
+with tab8:
+    st.markdown(render_section_header("Incoming Quality Control (IQC)"), unsafe_allow_html=True)
+    
+    planner = get_inspection_planner()
+    iqc = get_inspection_results(30)
+    plans = planner.status()
+    supplier_names = {s['id']: s['name'] for s in SUPPLIERS}
+    inspected = iqc[~iqc['skipped']]
+    
+    i1, i2, i3, i4, i5 = st.columns(5)
+    i1.metric("Lots Received (30d)", f"{len(iqc):,}")
+    i2.metric("Lots Accepted", f"{iqc['accepted'].sum():,}", f"{iqc['accepted'].mean() * 100:.1f}%", delta_color="off")
+    i3.metric("Lots Rejected", f"{(~iqc['accepted']).sum():,}")
+    i4.metric("Skip-Lot Rate", f"{iqc['skipped'].mean() * 100:.0f}%")
+    effort = 1 - plans['units_sampled'].sum() / max(plans['units_normal'].sum(), 1)
+    i5.metric("Effort Saved vs Normal", f"{effort * 100:.0f}%")
+    
+    level_colors = {"skip": TELIT_GREEN, "reduced": TELIT_BLUE, "normal": TELIT_GRAY, "tightened": TELIT_ORANGE,
+                    "hold": TELIT_RED}
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("##### 📊 Lot Acceptance by Supplier (30 Days)")
+        by_supplier = inspected.groupby('supplier_id').agg(inspected=('accepted', 'size'), accepted=('accepted', 'sum'))
+        by_supplier['rate'] = by_supplier['accepted'] / by_supplier['inspected'] * 100
+        by_supplier = by_supplier.sort_values('rate')
+        fig = go.Figure(go.Bar(
+            x=by_supplier['rate'], y=by_supplier.index.map(supplier_names), orientation='h',
+            marker_color=[TELIT_GREEN if r >= 99 else TELIT_BLUE if r >= 95 else TELIT_ORANGE for r in by_supplier['rate']],
+            text=[f"{r:.1f}% of {n}" for r, n in zip(by_supplier['rate'], by_supplier['inspected'])], textposition="outside"
+        ))
+        fig.update_layout(height=300, margin=dict(l=10, r=80, t=10, b=10), xaxis_title="Acceptance Rate %",
+                          xaxis=dict(range=[min(80, by_supplier['rate'].min() - 5) if len(by_supplier) else 80, 105]))
+        st.plotly_chart(fig, use_container_width=True)
+    with col2:
+        st.markdown("##### 🎚️ Inspection Level by Supplier-Part")
+        mix = plans.assign(supplier=plans['supplier_id'].map(supplier_names)) \
+            .groupby(['supplier', 'level']).size().reset_index(name='parts')
+        fig = px.bar(mix, x='parts', y='supplier', color='level', orientation='h',
+                     category_orders={'level': list(INSPECTION_LEVELS)}, color_discrete_map=level_colors)
+        fig.update_layout(height=300, margin=dict(l=10, r=10, t=10, b=10), xaxis_title="Parts", yaxis_title="",
+                          legend=dict(orientation="h", yanchor="bottom", y=1.02, title=None))
+        st.plotly_chart(fig, use_container_width=True)
+    
+    st.markdown("##### 📋 Today's Receiving Queue")
+    queue = get_inspection_queue()
+    q1, q2, q3 = st.columns(3)
+    q1.metric("Lots Arrived", f"{len(queue):,}")
+    q2.metric("To Sample", f"{(~queue['skipped']).sum():,}", f"{queue['sample_size'].sum():,} units", delta_color="off")
+    q3.metric("Accept on Certificate", f"{queue['skipped'].sum():,}")
+    st.dataframe(
+        queue.assign(supplier=queue['supplier_id'].map(supplier_names))[
+            ['lot_id', 'supplier', 'part', 'lot_size', 'level', 'aql', 'sample_size', 'accept_number', 'reject_number', 'skipped']],
+        column_config={
+            "lot_id": "Lot",
+            "supplier": "Supplier",
+            "part": "Part",
+            "lot_size": st.column_config.NumberColumn("Lot Size", format="%d"),
+            "level": "Inspection",
+            "aql": st.column_config.NumberColumn("AQL %", format="%.2f"),
+            "sample_size": st.column_config.NumberColumn("Sample", format="%d"),
+            "accept_number": st.column_config.NumberColumn("Ac", format="%d"),
+            "reject_number": st.column_config.NumberColumn("Re", format="%d"),
+            "skipped": st.column_config.CheckboxColumn("Skip Lot"),
+        },
+        hide_index=True,
+        use_container_width=True
+    )
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("##### ⚠️ Recent Lot Rejections")
+        rejected = iqc[~iqc['accepted']].sort_values('receipt_date', ascending=False).head(20)
+        st.dataframe(
+            rejected.assign(supplier=rejected['supplier_id'].map(supplier_names))[
+                ['receipt_date', 'lot_id', 'supplier', 'part', 'lot_size', 'sample_size', 'defects_found', 'accept_number']],
+            column_config={
+                "receipt_date": st.column_config.DateColumn("Date"),
+                "lot_id": "Lot",
+                "supplier": "Supplier",
+                "part": "Part",
+                "lot_size": st.column_config.NumberColumn("Lot Size", format="%d"),
+                "sample_size": st.column_config.NumberColumn("Sample", format="%d"),
+                "defects_found": st.column_config.NumberColumn("Defects", format="%d"),
+                "accept_number": st.column_config.NumberColumn("Ac", format="%d"),
+            },
+            hide_index=True,
+            use_container_width=True,
+            height=320
+        )
+    with col2:
+        st.markdown("##### 🔎 Supplier-Part Sampling Status")
+        st.dataframe(
+            plans.assign(supplier=plans['supplier_id'].map(supplier_names))
+                 .sort_values(['level', 'acceptance_rate'], key=lambda c: c.map(INSPECTION_LEVELS.index) if c.name == 'level' else c,
+                              ascending=[False, True])[
+                ['supplier', 'part', 'aql', 'level', 'lots', 'inspected', 'rejected', 'acceptance_rate', 'effort_saved']],
+            column_config={
+                "supplier": "Supplier",
+                "part": "Part",
+                "aql": st.column_config.NumberColumn("AQL %", format="%.2f"),
+                "level": "Inspection",
+                "lots": st.column_config.NumberColumn("Lots", format="%d"),
+                "inspected": st.column_config.NumberColumn("Inspected", format="%d"),
+                "rejected": st.column_config.NumberColumn("Rejected", format="%d"),
+                "acceptance_rate": st.column_config.NumberColumn("Accept %", format="%.1f"),
+                "effort_saved": st.column_config.NumberColumn("Effort Saved %", format="%.0f"),
+            },
+            hide_index=True,
+            use_container_width=True,
+            height=320
+        )
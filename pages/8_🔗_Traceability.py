@@ -6,13 +6,16 @@ Track components through manufacturing lifecycle with genealogy trees
 import streamlit as st
 import pandas as pd
 import graphviz
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from components.styles import (
     get_telit_css, render_header, render_section_header, render_alert_card,
     TELIT_LOGO_SVG, TELIT_BLUE, TELIT_DARK, TELIT_ORANGE, TELIT_GREEN, TELIT_YELLOW, TELIT_RED, TELIT_GRAY
 )
-from components.fake_data import get_component_genealogy, TELIT_PRODUCTS
+from components.fake_data import (
+    get_component_genealogy, get_recall_impact, get_supplier_part_lots, get_unit_test_results, format_serial,
+    TRACE_SEARCH_TYPES
+)
 
 # Page config
 st.set_page_config(page_title="Traceability - Telit Supply Chain", page_icon="🔗", layout="wide")
@@ -31,14 +34,22 @@ with st.sidebar:
     """, unsafe_allow_html=True)
     
     st.markdown("<br>", unsafe_allow_html=True)
-    batch_id = st.text_input("Batch/Lot Number", "BATCH-2024-001")
-    product_filter = st.selectbox("Product", [p['name'] for p in TELIT_PRODUCTS])
+    search_type = st.selectbox("Search By", list(TRACE_SEARCH_TYPES))
+    identifier = st.text_input(search_type, get_component_genealogy()['batch_id'] if search_type == "Lot ID" else "")
 
 # Header
 st.markdown(render_header("Component Traceability", "Track components from raw materials to customer delivery"), unsafe_allow_html=True)
 
 # Get data
-genealogy = get_component_genealogy(batch_id)
+if not identifier.strip():
+    st.info(f"Enter a {search_type.lower()} in the sidebar to trace its genealogy.")
+    st.stop()
+genealogy = get_component_genealogy(identifier, search_type)
+if not genealogy['found']:
+    st.warning(f"No {search_type.lower()} matching '{identifier}' in the genealogy records.")
+    st.stop()
+st.caption(f"{search_type} lookup resolved {len(genealogy['lots']):,} lot(s), {len(genealogy['components']):,} "
+           f"component lot(s) and {len(genealogy['shipments']):,} shipment line(s) in {genealogy['lookup_ms']:.1f} ms")
 
 # =============================================================================
 # KPI CARDS
@@ -48,7 +59,7 @@ col1, col2, col3, col4 = st.columns(4)
 with col1:
     st.markdown(f"""
         <div class="kpi-card">
-            <div class="kpi-label">Batch ID</div>
+            <div class="kpi-label">Lot ID</div>
             <div class="kpi-value" style="font-size: 1.3rem;">{genealogy['batch_id']}</div>
             <div style="font-size: 12px; color: {TELIT_GRAY};">{genealogy['product']}</div>
         </div>
@@ -77,7 +88,7 @@ with col4:
         <div class="kpi-card">
             <div class="kpi-label">Components Tracked</div>
             <div class="kpi-value">{len(genealogy['components'])}</div>
-            <div style="font-size: 12px; color: {TELIT_GRAY};">Unique part types</div>
+            <div style="font-size: 12px; color: {TELIT_GRAY};">{len(set(c['name'] for c in genealogy['components']))} part numbers</div>
         </div>
     """, unsafe_allow_html=True)
 
@@ -86,7 +97,7 @@ st.markdown("<br>", unsafe_allow_html=True)
 # =============================================================================
 # TABS
 # =============================================================================
-tab1, tab2, tab3 = st.tabs(["🌳 Genealogy Tree", "📋 Component Details", "🔄 Recall Simulation"])
+tab1, tab2, tab3, tab4 = st.tabs(["🌳 Genealogy Tree", "📋 Component Details", "🔄 Recall Simulation", "📊 Test Results"])
 
 with tab1:
     st.markdown(render_section_header("Component Genealogy Tree"), unsafe_allow_html=True)
@@ -97,26 +108,26 @@ with tab1:
     tree.attr('node', shape='box', style='rounded,filled', fontname='Arial', fontsize='10')
     
     # Finished product (root)
-    tree.node('product', f"Finished Product\\n{genealogy['product']}\\nBatch: {genealogy['batch_id']}\\nQty: {genealogy['quantity']:,}",
+    tree.node('product', f"Finished Product\\n{genealogy['product']}\\nLot: {genealogy['batch_id']}\\nQty: {genealogy['quantity']:,}",
               fillcolor='#e8f5e9', color='#4caf50', fontsize='11')
     
-    # Components
-    for i, comp in enumerate(genealogy['components']):
+    # Component lots and the supplier lots they came from (first 12 for multi-lot traces)
+    for i, comp in enumerate(genealogy['components'][:12]):
         comp_id = f"comp_{i}"
-        tree.node(comp_id, f"{comp['name']}\\nLot: {comp['lot']}\\nQty: {comp['quantity']:,}\\nSupplier: {comp['supplier']}",
+        tree.node(comp_id, f"{comp['name']}\\nLot: {comp['lot']}\\nQty: {comp['quantity']:,}",
                   fillcolor='#e3f2fd', color='#2196f3')
         tree.edge(comp_id, 'product')
         
-        # Raw materials
         raw_id = f"raw_{i}"
-        tree.node(raw_id, f"Raw Material\\n{comp['supplier']}",
+        tree.node(raw_id, f"{comp['supplier']}\\nSupplier Lot: {comp['supplier_lot']}",
                   fillcolor='#fff3e0', color='#ff9800', fontsize='9')
         tree.edge(raw_id, comp_id)
     
-    # Customers
-    for i, cust in enumerate(genealogy['shipped_to']):
+    # Shipments to customers
+    for i, cust in enumerate(genealogy['shipped_to'][:8]):
         cust_id = f"cust_{i}"
-        tree.node(cust_id, f"Customer\\n{cust}",
+        lines = genealogy['shipments'][genealogy['shipments']['customer'] == cust]
+        tree.node(cust_id, f"Customer\\n{cust}\\n{len(lines)} shipment(s), {lines['quantity'].sum():,} units",
                   fillcolor='#f3e5f5', color='#9c27b0')
         tree.edge('product', cust_id)
     
@@ -126,14 +137,20 @@ with tab1:
     st.markdown("<br>", unsafe_allow_html=True)
     st.markdown(render_section_header("Traceability Timeline"), unsafe_allow_html=True)
     
+    received = sorted(c['received'] for c in genealogy['components'])
+    lots, shipments = genealogy['lots'], genealogy['shipments']
     timeline_events = [
-        ("2024-12-10", "Raw Materials", "Components received from suppliers", TELIT_ORANGE),
-        ("2024-12-12", "Incoming QC", "Quality inspection completed - 100% pass", TELIT_GREEN),
-        ("2024-12-15", "Production", f"Batch {genealogy['batch_id']} manufactured", TELIT_BLUE),
-        ("2024-12-16", "Testing", f"{genealogy['test_results']['yield']}% yield achieved", TELIT_GREEN),
-        ("2024-12-17", "Packaging", "Units packaged and labeled", TELIT_BLUE),
-        ("2024-12-18", "Shipment", f"Shipped to {len(genealogy['shipped_to'])} customers", TELIT_DARK),
+        (received[0] if received else "—", "Raw Materials",
+         f"{len(received)} component lots received from {len(set(c['supplier'] for c in genealogy['components']))} suppliers", TELIT_ORANGE),
+        (genealogy['production_date'], "Production",
+         f"{len(lots):,} lot(s) built on {', '.join(lots['line'].unique()[:3])}", TELIT_BLUE),
+        (f"{lots['produced'].max():%Y-%m-%d}", "Testing", f"{genealogy['test_results']['yield']}% yield achieved", TELIT_GREEN),
     ]
+    if len(shipments):
+        timeline_events.append((f"{shipments['shipped'].min():%Y-%m-%d}", "Shipment",
+                                f"{len(shipments):,} shipment(s) to {len(genealogy['shipped_to'])} customers", TELIT_DARK))
+    else:
+        timeline_events.append(("—", "Shipment", "Not yet shipped", TELIT_GRAY))
     
     for date, stage, description, color in timeline_events:
         st.markdown(f"""
@@ -159,7 +176,9 @@ with tab2:
             "name": "Component",
             "supplier": "Supplier",
             "lot": "Lot Number",
-            "quantity": st.column_config.NumberColumn("Quantity", format="%d"),
+            "supplier_lot": "Supplier Lot",
+            "received": "Received",
+            "quantity": st.column_config.NumberColumn("Quantity Used", format="%d"),
         },
         hide_index=True,
         use_container_width=True
@@ -171,7 +190,7 @@ with tab2:
     st.markdown(render_section_header("Component Details"), unsafe_allow_html=True)
     
     cols = st.columns(2)
-    for i, comp in enumerate(genealogy['components']):
+    for i, comp in enumerate(genealogy['components'][:12]):
         with cols[i % 2]:
             st.markdown(f"""
                 <div style="background: white; border-radius: 12px; padding: 16px; margin-bottom: 12px; box-shadow: 0 2px 8px rgba(0,0,0,0.06);">
@@ -186,8 +205,8 @@ with tab2:
                         <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 8px; font-size: 12px;">
                             <div><span style="color: {TELIT_GRAY};">Supplier:</span> <strong>{comp['supplier']}</strong></div>
                             <div><span style="color: {TELIT_GRAY};">Quantity:</span> <strong>{comp['quantity']:,}</strong></div>
-                            <div><span style="color: {TELIT_GRAY};">Received:</span> <strong>2024-12-10</strong></div>
-                            <div><span style="color: {TELIT_GRAY};">IQC Status:</span> <strong style="color: {TELIT_GREEN};">PASS</strong></div>
+                            <div><span style="color: {TELIT_GRAY};">Received:</span> <strong>{comp['received']}</strong></div>
+                            <div><span style="color: {TELIT_GRAY};">Supplier Lot:</span> <strong>{comp['supplier_lot']}</strong></div>
                         </div>
                     </div>
                 </div>
@@ -207,31 +226,43 @@ with tab3:
     col1, col2 = st.columns(2)
     
     with col1:
-        affected_component = st.selectbox("Affected Component", [c['name'] for c in genealogy['components']])
-        affected_lot = st.text_input("Affected Lot Number", genealogy['components'][0]['lot'])
+        affected_component = st.selectbox("Affected Component", sorted(set(c['name'] for c in genealogy['components'])))
+        lots_of_part = [c for c in genealogy['components'] if c['name'] == affected_component]
+        affected_lot = st.text_input("Affected Lot Number", lots_of_part[0]['lot'])
     
     with col2:
         recall_date = st.date_input("Recall Date", datetime.now())
-        recall_scope = st.selectbox("Recall Scope", ["Single Lot", "All Lots from Supplier", "Date Range"])
+        recall_scope = st.selectbox("Recall Scope", ["Single Lot", "Same Part & Supplier (Date Range)"])
+        if recall_scope != "Single Lot":
+            received = next((c['received'] for c in lots_of_part if c['lot'] == affected_lot.strip().upper()),
+                            lots_of_part[0]['received'])
+            received = datetime.strptime(received, "%Y-%m-%d")
+            receipt_range = st.date_input("Received Between",
+                                          (received - timedelta(days=30), received + timedelta(days=30)))
     
     if st.button("🔍 Run Recall Impact Analysis", type="primary"):
         st.markdown("<br>", unsafe_allow_html=True)
         
-        # Simulated results
+        suspect = [affected_lot]
+        if recall_scope != "Single Lot" and len(receipt_range) == 2:
+            suspect = get_supplier_part_lots(affected_lot, *receipt_range) or suspect
+        impact = get_recall_impact(suspect)
+        st.caption(f"{len(suspect):,} component lot(s) in recall scope")
+        
         col1, col2, col3 = st.columns(3)
         
         with col1:
             st.markdown(f"""
                 <div style="background: {TELIT_RED}10; border-radius: 12px; padding: 20px; text-align: center;">
-                    <div style="font-size: 36px; font-weight: 700; color: {TELIT_RED};">5,000</div>
-                    <div style="color: {TELIT_DARK};">Units Affected</div>
+                    <div style="font-size: 36px; font-weight: 700; color: {TELIT_RED};">{impact['units']:,}</div>
+                    <div style="color: {TELIT_DARK};">Units Affected ({len(impact['lots']):,} lots)</div>
                 </div>
             """, unsafe_allow_html=True)
         
         with col2:
             st.markdown(f"""
                 <div style="background: {TELIT_ORANGE}10; border-radius: 12px; padding: 20px; text-align: center;">
-                    <div style="font-size: 36px; font-weight: 700; color: {TELIT_ORANGE};">2</div>
+                    <div style="font-size: 36px; font-weight: 700; color: {TELIT_ORANGE};">{len(impact['customers'])}</div>
                     <div style="color: {TELIT_DARK};">Customers Impacted</div>
                 </div>
             """, unsafe_allow_html=True)
@@ -239,23 +270,70 @@ with tab3:
         with col3:
             st.markdown(f"""
                 <div style="background: {TELIT_YELLOW}10; border-radius: 12px; padding: 20px; text-align: center;">
-                    <div style="font-size: 36px; font-weight: 700; color: {TELIT_YELLOW};">$125K</div>
-                    <div style="color: {TELIT_DARK};">Estimated Cost</div>
+                    <div style="font-size: 36px; font-weight: 700; color: {TELIT_YELLOW};">${impact['value'] / 1000:,.0f}K</div>
+                    <div style="color: {TELIT_DARK};">Product Value Exposed</div>
                 </div>
             """, unsafe_allow_html=True)
         
         st.markdown("<br>", unsafe_allow_html=True)
         st.markdown(render_section_header("Affected Shipments"), unsafe_allow_html=True)
         
-        affected_shipments = pd.DataFrame([
-            {"Shipment": "SHP-2024-1001", "Customer": "Automotive OEM Alpha", "Quantity": 3000, "Status": "In Field", "Action": "Notify Customer"},
-            {"Shipment": "SHP-2024-1002", "Customer": "Fleet Management Inc", "Quantity": 2000, "Status": "In Warehouse", "Action": "Hold & Inspect"},
-        ])
-        
-        st.dataframe(affected_shipments, hide_index=True, use_container_width=True)
+        affected_shipments = impact['shipments'].assign(
+            Action=lambda d: d['status'].map({"In Field": "Notify Customer"}).fillna("Hold & Inspect"))
+        st.dataframe(
+            affected_shipments[['shipment_id', 'customer', 'customer_po', 'lot_id', 'shipped', 'quantity', 'status', 'Action']],
+            column_config={
+                "shipment_id": "Shipment",
+                "customer": "Customer",
+                "customer_po": "Customer PO",
+                "lot_id": "Lot",
+                "shipped": st.column_config.DateColumn("Shipped"),
+                "quantity": st.column_config.NumberColumn("Quantity", format="%d"),
+                "status": "Status",
+            },
+            hide_index=True,
+            use_container_width=True
+        )
         
+        in_field = int(impact['shipments'].loc[impact['shipments']['status'] == "In Field", 'quantity'].sum())
         st.markdown(render_alert_card(
-            "Recommended action: Initiate customer notification for 3,000 units in field and hold 2,000 units in warehouse for inspection.",
+            f"Recommended action: Initiate customer notification for {in_field:,} units in field, hold "
+            f"{impact['units_shipped'] - in_field:,} recently shipped units and quarantine "
+            f"{impact['units_unshipped']:,} units still in stock.",
             "warning", "📋"
         ), unsafe_allow_html=True)
 
+with tab4:
+    st.markdown(render_section_header("Unit Test Results"), unsafe_allow_html=True)
+    
+    # Start from the searched unit, or the first unit of the most recent lot traced
+    lots = genealogy['lots']
+    default_serial = identifier if TRACE_SEARCH_TYPES[search_type] == "serial" else \
+        format_serial(lots.loc[lots['produced'].idxmax(), 'serial_first'])
+    serial = st.text_input("Unit serial number", default_serial)
+    results = get_unit_test_results(serial)
+    
+    if results.empty:
+        st.info(f"No test results recorded for {serial}.")
+    else:
+        failed = int((~results['passed']).sum())
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Measurements", len(results))
+        c2.metric("Stations", results['station'].nunique())
+        c3.metric("Result", "PASS" if failed == 0 else f"FAIL ({failed})")
+        
+        st.dataframe(
+            results.assign(result=results['passed'].map({True: "✅ Pass", False: "❌ Fail"})).drop(columns=['passed']),
+            column_config={
+                "time": st.column_config.DatetimeColumn("Tested", format="YYYY-MM-DD HH:mm:ss"),
+                "line": "Line",
+                "station": "Station",
+                "parameter": "Parameter",
+                "value": st.column_config.NumberColumn("Value", format="%.3f"),
+                "lsl": st.column_config.NumberColumn("LSL", format="%.2f"),
+                "usl": st.column_config.NumberColumn("USL", format="%.2f"),
+                "result": "Result",
+            },
+            hide_index=True,
+            use_container_width=True
+        )